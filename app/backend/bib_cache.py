@@ -0,0 +1,126 @@
+"""
+Shared cache of parsed BibTeX files.
+
+Parsing .bib files with bibtexparser is one of the slowest operations in the
+backend, and the same import files are parsed by step input loading, query
+search, previews and entry counts. Parsed entries are kept in an in-memory
+LRU keyed by (path, size, mtime) and in pickle sidecars keyed by the file's
+content hash, so an unchanged file is parsed once and survives restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import bibtexparser
+
+SCREENING_DIR = Path(__file__).resolve().parent.parent.parent / "screening"
+DEFAULT_BIB_CACHE_DIR = SCREENING_DIR / ".cache" / "bibtex"
+BIB_CACHE_ENV = "BIB_CACHE_DIR"
+# Parsed files kept in memory.
+BIB_CACHE_MAX_FILES = 64
+# Bump when the parsing setup changes so sidecars are rebuilt.
+BIB_CACHE_VERSION = 1
+
+_lock = threading.Lock()
+_memory: OrderedDict[tuple[str, int, int], list[dict]] = OrderedDict()
+
+
+def get_bib_cache_dir() -> Path:
+    env_path = os.getenv(BIB_CACHE_ENV, "").strip()
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return DEFAULT_BIB_CACHE_DIR
+
+
+def _sidecar_path(content_hash: str) -> Path:
+    return get_bib_cache_dir() / f"{content_hash}.pickle"
+
+
+def _load_sidecar(content_hash: str) -> list[dict] | None:
+    path = _sidecar_path(content_hash)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != BIB_CACHE_VERSION
+        or payload.get("parser") != bibtexparser.__version__
+    ):
+        return None
+    entries = payload.get("entries")
+    return entries if isinstance(entries, list) else None
+
+
+def _save_sidecar(content_hash: str, entries: list[dict]) -> None:
+    path = _sidecar_path(content_hash)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {"version": BIB_CACHE_VERSION, "parser": bibtexparser.__version__, "entries": entries},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        tmp_path.replace(path)
+    except OSError:
+        pass
+
+
+def _parse(path: Path) -> list[dict]:
+    data = path.read_bytes()
+    content_hash = hashlib.sha256(data).hexdigest()
+    entries = _load_sidecar(content_hash)
+    if entries is None:
+        entries = bibtexparser.loads(data.decode("utf-8")).entries
+        _save_sidecar(content_hash, entries)
+    return entries
+
+
+def load_bib_entries(path: Path) -> list[dict]:
+    """
+    Return the entries of a .bib file (as bibtexparser.load would).
+
+    Each call returns fresh entry dicts, so callers may modify them.
+    """
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        entries = _memory.get(key)
+        if entries is not None:
+            _memory.move_to_end(key)
+    if entries is None:
+        entries = _parse(path)
+        with _lock:
+            _memory[key] = entries
+            _memory.move_to_end(key)
+            while len(_memory) > BIB_CACHE_MAX_FILES:
+                _memory.popitem(last=False)
+    return [dict(entry) for entry in entries]
+
+
+def count_bib_file_entries(path: Path) -> int:
+    """Number of entries in a .bib file (served from the cache when possible)."""
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        entries = _memory.get(key)
+    if entries is not None:
+        return len(entries)
+    return len(load_bib_entries(path))
+
+
+def clear_bib_cache() -> None:
+    """Drop the in-memory cache (sidecars stay valid by content hash)."""
+    with _lock:
+        _memory.clear()
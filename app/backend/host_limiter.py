@@ -0,0 +1,257 @@
+"""
+Per-host politeness limits for outgoing HTTP requests.
+
+HostLimiter keeps, per host:
+
+- a concurrency cap on requests in flight;
+- a token bucket for request starts (sustained rate = one request per
+  interval, short bursts up to the bucket size);
+- a pause after throttling or errors, taken from the Retry-After header
+  when the server sends one, otherwise an exponential backoff;
+- a circuit breaker: after several failures in a row (throttled, blocked
+  or unreachable) the host is skipped for a cooldown instead of being asked
+  again, then one trial request decides whether it is closed again. With
+  wait_when_open (batch scripts) requests wait for that instead of failing.
+
+It is thread-safe and shared by PDF fetch and the BibTeX fetcher scripts.
+limited_urlopen() applies it to a urllib request; host_limiter_httpx has
+the httpx transport. This module only uses the standard library so the
+fetcher scripts run without the backend's dependencies.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+DEFAULT_PER_HOST_CONCURRENCY = 2
+DEFAULT_PER_HOST_INTERVAL_SEC = 0.5
+DEFAULT_PER_HOST_BURST = 2
+# Hosts with stricter published rate limits or that challenge bursts
+# (minimum seconds between requests, no bursts).
+HOST_MIN_INTERVAL_SEC: dict[str, float] = {
+    "api.semanticscholar.org": 1.0,
+    "export.arxiv.org": 3.0,
+    "dl.acm.org": 2.0,
+    "ieeexplore.ieee.org": 1.0,
+}
+# Backoff after a failed request without Retry-After: base * 2^(failures - 1).
+DEFAULT_BACKOFF_BASE_SEC = 1.0
+MAX_BACKOFF_SEC = 60.0
+# Longer waits (e.g. a Retry-After of an hour) open the circuit instead of
+# holding a worker.
+MAX_PAUSE_SEC = 60.0
+# Consecutive failures that open the circuit, and its first cooldown
+# (doubled on each trip in a row).
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SEC = 30.0
+MAX_CIRCUIT_COOLDOWN_SEC = 600.0
+# Poll interval of waiting requests while another one is the trial request.
+CIRCUIT_POLL_SEC = 0.5
+# Responses that mean "slow down".
+THROTTLE_STATUSES = {429, 503}
+# Responses counted as failures (bot challenges, gateway errors).
+FAILURE_STATUSES = THROTTLE_STATUSES | {403, 500, 502, 504}
+
+
+class HostCircuitOpen(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"Too many failed requests to {host}; paused for {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class _HostState:
+    def __init__(self, concurrency: int, interval: float, burst: int):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.lock = threading.Lock()
+        self.rate = 1.0 / interval if interval > 0 else 0.0
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.failures = 0
+        self.open_until = 0.0
+        self.trips_in_row = 0
+        self.probing = False
+
+
+class HostLimiter:
+    def __init__(
+        self,
+        per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+        per_host_interval_sec: float = DEFAULT_PER_HOST_INTERVAL_SEC,
+        host_intervals: dict[str, float] | None = None,
+        per_host_burst: int = DEFAULT_PER_HOST_BURST,
+        backoff_base_sec: float = DEFAULT_BACKOFF_BASE_SEC,
+        wait_when_open: bool = False,
+    ):
+        self.per_host_concurrency = max(int(per_host_concurrency), 1)
+        self.per_host_interval_sec = max(float(per_host_interval_sec), 0.0)
+        self.per_host_burst = max(int(per_host_burst), 1)
+        self.host_intervals = HOST_MIN_INTERVAL_SEC if host_intervals is None else host_intervals
+        self.backoff_base_sec = max(float(backoff_base_sec), 0.0)
+        self.wait_when_open = wait_when_open
+        self._hosts: dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        self.wait_sec = 0.0
+        self.throttled = 0
+        self.circuit_trips = 0
+        self.rejected = 0
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                if host in self.host_intervals:
+                    interval = max(self.per_host_interval_sec, self.host_intervals[host])
+                    burst = 1
+                else:
+                    interval = self.per_host_interval_sec
+                    burst = self.per_host_burst
+                state = _HostState(self.per_host_concurrency, interval, burst)
+                self._hosts[host] = state
+            return state
+
+    def acquire(self, host: str) -> None:
+        """
+        Block until a request to ``host`` may start; pair with record() and
+        release(). Raises HostCircuitOpen if the host's circuit is open,
+        unless wait_when_open is set.
+        """
+        started = time.monotonic()
+        state = self._state(host)
+        while True:
+            retry_in = self._check_circuit(host, state)
+            if retry_in is None:
+                break
+            if not self.wait_when_open:
+                with self._lock:
+                    self.rejected += 1
+                raise HostCircuitOpen(host, retry_in)
+            # Wait for the cooldown (or for another thread's trial request).
+            time.sleep(max(retry_in, CIRCUIT_POLL_SEC))
+        state.slots.acquire()
+        with state.lock:
+            now = time.monotonic()
+            wait = 0.0
+            if state.rate > 0:
+                state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+                # Tokens below zero reserve later start times.
+                state.tokens -= 1.0
+                wait = max(-state.tokens / state.rate, 0.0)
+            start_at = max(now + wait, state.paused_until)
+        if start_at > now:
+            time.sleep(start_at - now)
+        with self._lock:
+            self.wait_sec += time.monotonic() - started
+
+    def _check_circuit(self, host: str, state: _HostState) -> float | None:
+        """None if a request may be sent, else seconds until the circuit half-opens."""
+        with state.lock:
+            if not state.open_until:
+                return None
+            now = time.monotonic()
+            if now >= state.open_until and not state.probing:
+                # Half-open: let this one request through as a trial.
+                state.probing = True
+                return None
+            return max(state.open_until - now, 0.0)
+
+    def record(self, host: str, status: int | None, retry_after: str | None = None) -> None:
+        """Record the outcome of a request (``status`` None = no response)."""
+        state = self._state(host)
+        failed = status is None or status in FAILURE_STATUSES
+        throttled = status in THROTTLE_STATUSES
+        with state.lock:
+            now = time.monotonic()
+            if not failed:
+                state.failures = 0
+                state.open_until = 0.0
+                state.trips_in_row = 0
+                state.probing = False
+                return
+            state.failures += 1
+            pause = parse_retry_after(retry_after) if throttled else None
+            # "Retry-After: 0" would retry at once and trip the circuit; back off instead.
+            if not pause and status != 403:
+                pause = min(self.backoff_base_sec * 2 ** (state.failures - 1), MAX_BACKOFF_SEC)
+            pause = pause or 0.0
+            trip = state.probing or state.failures >= CIRCUIT_FAILURE_THRESHOLD or pause > MAX_PAUSE_SEC
+            if trip:
+                cooldown = min(CIRCUIT_COOLDOWN_SEC * 2 ** state.trips_in_row, MAX_CIRCUIT_COOLDOWN_SEC)
+                state.open_until = now + max(cooldown, pause)
+                state.trips_in_row += 1
+                state.failures = 0
+                state.probing = False
+            else:
+                state.paused_until = max(state.paused_until, now + pause)
+        with self._lock:
+            if throttled:
+                self.throttled += 1
+            if trip:
+                self.circuit_trips += 1
+
+    def release(self, host: str) -> None:
+        self._state(host).slots.release()
+
+    def summary(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            "per_host_concurrency": self.per_host_concurrency,
+            "per_host_interval_sec": self.per_host_interval_sec,
+            "per_host_burst": self.per_host_burst,
+            "hosts": len(hosts),
+            "wait_sec": round(self.wait_sec, 2),
+            "throttled": self.throttled,
+            "circuit_trips": self.circuit_trips,
+            "rejected": self.rejected,
+            "open_hosts": sorted(host for host, state in hosts.items() if state.open_until > now),
+        }
+
+
+@contextmanager
+def limited_urlopen(limiter: HostLimiter, request: urllib.request.Request | str, timeout: float):
+    """urllib.request.urlopen() under a HostLimiter (a context manager like urlopen)."""
+    url = request.full_url if isinstance(request, urllib.request.Request) else request
+    host = urlparse(url).hostname or ""
+    limiter.acquire(host)
+    try:
+        try:
+            resp = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as exc:
+            limiter.record(host, exc.code, exc.headers.get("Retry-After") if exc.headers else None)
+            raise
+        except OSError:
+            limiter.record(host, None)
+            raise
+        limiter.record(host, resp.status)
+        with resp:
+            yield resp
+    finally:
+        limiter.release(host)
@@ -0,0 +1,56 @@
+"""
+httpx transport applying a HostLimiter (see host_limiter).
+
+HostLimitedTransport limits every request an httpx.Client sends (including
+each redirect hop) and holds the host slot until the response body has
+been read or closed.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import httpx
+
+from host_limiter import HostLimiter
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class HostLimitedTransport(httpx.BaseTransport):
+    """httpx transport that applies a HostLimiter to every request."""
+
+    def __init__(self, limiter: HostLimiter, transport: httpx.BaseTransport | None = None):
+        self.limiter = limiter
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.limiter.acquire(host)
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self.limiter.record(host, None)
+            self.limiter.release(host)
+            raise
+        self.limiter.record(host, response.status_code, response.headers.get("Retry-After"))
+        response.stream = _ReleasingStream(response.stream, lambda: self.limiter.release(host))
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
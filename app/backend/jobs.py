@@ -0,0 +1,214 @@
+"""
+Background step jobs.
+
+Step runs are queued and executed by a fixed pool of worker threads so the
+/run request returns immediately with a job ID. A job can be cancelled while
+queued or running; running handlers notice through their progress callback.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import traceback
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Callable
+
+# Number of steps that may run at the same time.
+DEFAULT_STEP_JOB_WORKERS = 2
+# Finished jobs kept in memory for status queries.
+MAX_FINISHED_JOBS = 200
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation was requested."""
+
+
+class JobConflictError(RuntimeError):
+    """Raised when a step already has a queued or running job."""
+
+
+@dataclass
+class StepJob:
+    project_id: str
+    step_id: str
+    target: Callable[[StepJob], None]
+    resume: bool = False
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled("Cancelled")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "project_id": self.project_id,
+            "step_id": self.step_id,
+            "resume": self.resume,
+            "status": self.status.value,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+        }
+
+
+def get_step_job_workers() -> int:
+    raw = os.getenv("STEP_JOB_WORKERS", "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_STEP_JOB_WORKERS
+    except ValueError:
+        value = DEFAULT_STEP_JOB_WORKERS
+    return max(value, 1)
+
+
+class JobManager:
+    """FIFO job queue served by a bounded pool of worker threads."""
+
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or get_step_job_workers()
+        self._queue: queue.Queue[StepJob] = queue.Queue()
+        self._jobs: dict[str, StepJob] = {}
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+
+    def _ensure_workers(self) -> None:
+        # Started lazily so importing the module has no side effects.
+        if self._threads:
+            return
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"step-job-worker-{number}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(
+        self,
+        project_id: str,
+        step_id: str,
+        target: Callable[[StepJob], None],
+        resume: bool = False,
+        on_queued: Callable[[StepJob], None] | None = None,
+    ) -> StepJob:
+        """
+        Queue ``target(job)``. ``on_queued`` runs before any worker can pick
+        the job up (e.g. to record the job ID); if it raises, the job is dropped.
+        """
+        with self._lock:
+            if self._active_job_locked(project_id, step_id) is not None:
+                raise JobConflictError(f"Step already has an active job: {step_id}")
+            job = StepJob(project_id=project_id, step_id=step_id, target=target, resume=resume)
+            self._jobs[job.id] = job
+            self._prune_locked()
+            self._ensure_workers()
+        if on_queued is not None:
+            try:
+                on_queued(job)
+            except Exception:
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+                raise
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> StepJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, project_id: str | None = None) -> list[StepJob]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        if project_id is not None:
+            jobs = [job for job in jobs if job.project_id == project_id]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def active_job(self, project_id: str, step_id: str) -> StepJob | None:
+        with self._lock:
+            return self._active_job_locked(project_id, step_id)
+
+    def cancel(self, job_id: str) -> StepJob | None:
+        """
+        Request cancellation. Queued jobs are cancelled at once; running jobs
+        stop at their next progress report.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_JOB_STATUSES:
+                return job
+            job.cancel_event.set()
+            if job.status == JobStatus.QUEUED:
+                job.status = JobStatus.CANCELLED
+                job.finished_at = datetime.now()
+                job.error = "Cancelled"
+            return job
+
+    def _active_job_locked(self, project_id: str, step_id: str) -> StepJob | None:
+        for job in self._jobs.values():
+            if job.project_id == project_id and job.step_id == step_id and job.status in ACTIVE_JOB_STATUSES:
+                return job
+        return None
+
+    def _prune_locked(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status not in ACTIVE_JOB_STATUSES]
+        if len(finished) <= MAX_FINISHED_JOBS:
+            return
+        finished.sort(key=lambda job: job.finished_at or job.created_at)
+        for job in finished[: len(finished) - MAX_FINISHED_JOBS]:
+            del self._jobs[job.id]
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                with self._lock:
+                    if job.status != JobStatus.QUEUED:
+                        continue
+                    job.status = JobStatus.RUNNING
+                    job.started_at = datetime.now()
+                try:
+                    job.target(job)
+                    status, error = JobStatus.COMPLETED, None
+                except JobCancelled:
+                    status, error = JobStatus.CANCELLED, "Cancelled"
+                except Exception as e:
+                    traceback.print_exc()
+                    status, error = JobStatus.FAILED, str(getattr(e, "detail", None) or e)
+                with self._lock:
+                    job.status = status
+                    job.error = error
+                    job.finished_at = datetime.now()
+            finally:
+                self._queue.task_done()
+
+
+job_manager = JobManager()
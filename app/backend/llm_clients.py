@@ -0,0 +1,230 @@
+"""
+Shared LLM clients, the event loop they run on, and local server probes.
+
+Creating an AsyncOpenAI client (and an event loop to drive it) per run throws
+away the connection pool, TLS sessions and keep-alive connections each time.
+LLMClientPool keeps one long-lived event loop in a background thread and one
+client per (base URL, API key, retry setting) with tuned httpx limits.
+Synchronous code (step handlers, scripts) submits coroutines with run();
+clients are handed out for that loop only.
+
+probe_local_server() checks an OpenAI-compatible server by listing its
+models; it backs the connectivity check API and endpoint health checks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+from typing import Any, Coroutine, TypeVar
+
+import httpx
+from openai import AsyncOpenAI
+
+# Connections per client; keep-alive connections are kept for reuse.
+DEFAULT_LLM_MAX_CONNECTIONS = 256
+KEEPALIVE_EXPIRY_SEC = 120.0
+CONNECT_TIMEOUT_SEC = 10.0
+# Reasoning models can take minutes for one response.
+REQUEST_TIMEOUT_SEC = 600.0
+PROBE_TIMEOUT_SEC = 5.0
+
+T = TypeVar("T")
+
+
+def get_llm_max_connections() -> int:
+    raw = os.getenv("LLM_MAX_CONNECTIONS", "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_LLM_MAX_CONNECTIONS
+    except ValueError:
+        value = DEFAULT_LLM_MAX_CONNECTIONS
+    return max(value, 1)
+
+
+def parse_base_urls(value: str | list[str] | None) -> list[str]:
+    """Base URLs from a config value (list, or a string separated by commas/whitespace)."""
+    if not value:
+        return []
+    parts = value if isinstance(value, list) else value.replace(",", " ").split()
+    urls: list[str] = []
+    for part in parts:
+        url = str(part).strip()
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def build_models_url(base_url: str) -> str:
+    """Build a models endpoint URL from a base URL."""
+    cleaned = base_url.rstrip("/")
+    if cleaned.endswith("/v1"):
+        return f"{cleaned}/models"
+    return f"{cleaned}/v1/models"
+
+
+async def probe_local_server(base_url: str, timeout: float = PROBE_TIMEOUT_SEC) -> dict:
+    """Check connectivity to a local LLM server (OpenAI-compatible)."""
+    models_url = build_models_url(base_url)
+
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.get(models_url)
+
+        if response.status_code != 200:
+            return {
+                "connected": False,
+                "url": base_url,
+                "models": [],
+                "error": f"HTTP {response.status_code}",
+            }
+
+        data = response.json()
+        models = []
+        if isinstance(data, dict) and "data" in data:
+            for model in data["data"]:
+                models.append(
+                    {
+                        "id": model.get("id", "unknown"),
+                        "owned_by": model.get("owned_by", "unknown"),
+                    }
+                )
+
+        return {
+            "connected": True,
+            "url": base_url,
+            "models": models,
+            "error": None,
+        }
+    except httpx.TimeoutException:
+        return {
+            "connected": False,
+            "url": base_url,
+            "models": [],
+            "error": "接続タイムアウト（VPN接続を確認してください）",
+        }
+    except httpx.ConnectError:
+        return {
+            "connected": False,
+            "url": base_url,
+            "models": [],
+            "error": "接続できません（VPN接続を確認してください）",
+        }
+    except Exception as e:
+        return {
+            "connected": False,
+            "url": base_url,
+            "models": [],
+            "error": str(e),
+        }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class LLMClientPool:
+    """Process-wide AsyncOpenAI clients served from one background event loop."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._clients: dict[tuple[str | None, str, int], AsyncOpenAI] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The pool's event loop, started on first use."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-client-loop", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run ``coro`` on the pool's loop and wait for its result (blocking)."""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LLMClientPool.run() called from the pool's own event loop")
+
+        async def guarded() -> tuple[T | None, BaseException | None]:
+            # SystemExit / KeyboardInterrupt escaping a task would stop the
+            # shared loop; hand them back to the caller's thread instead.
+            try:
+                return await coro, None
+            except (SystemExit, KeyboardInterrupt) as e:
+                return None, e
+
+        future = asyncio.run_coroutine_threadsafe(guarded(), loop)
+        try:
+            result, exit_error = future.result()
+        except BaseException:
+            # e.g. KeyboardInterrupt while waiting: stop the coroutine too.
+            future.cancel()
+            raise
+        if exit_error is not None:
+            raise exit_error
+        return result
+
+    def get_client(self, base_url: str | None, api_key: str, max_retries: int = 2) -> AsyncOpenAI:
+        """
+        Client for ``base_url`` (None = OpenAI). Clients are shared when
+        called on the pool's loop; on any other loop a new client is made,
+        since httpx connections cannot move between loops.
+        """
+        if asyncio.get_running_loop() is not self._loop:
+            return self._create_client(base_url, api_key, max_retries)
+        key = (base_url, hashlib.sha256(api_key.encode("utf-8")).hexdigest(), max_retries)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._create_client(base_url, api_key, max_retries)
+            self._clients[key] = client
+        return client
+
+    @staticmethod
+    def _create_client(base_url: str | None, api_key: str, max_retries: int) -> AsyncOpenAI:
+        max_connections = get_llm_max_connections()
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SEC,
+            ),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT_SEC, connect=CONNECT_TIMEOUT_SEC),
+            # HTTP/2 needs the optional h2 package; local servers usually speak HTTP/1.1 only.
+            http2=_http2_available() and (base_url is None or base_url.startswith("https://")),
+        )
+        return AsyncOpenAI(base_url=base_url, api_key=api_key, max_retries=max_retries, http_client=http_client)
+
+    def close(self) -> None:
+        """Close all clients and stop the loop (e.g. on shutdown)."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        async def close_clients() -> None:
+            for client in clients:
+                await client.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout=10)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=10)
+            loop.close()
+
+
+llm_client_pool = LLMClientPool()
@@ -2,6 +2,8 @@
 Screening Pipeline App Backend - FastAPI
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -15,12 +17,27 @@ from routers import (
     llm_router,
     imports_router,
     pdf_library_router,
+    jobs_router,
 )
+from routers.steps import recover_interrupted_steps
+from llm_clients import llm_client_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Steps still marked running were interrupted by a previous shutdown.
+    recovered = recover_interrupted_steps()
+    if recovered:
+        print(f"[jobs] Marked interrupted steps as failed: {', '.join(recovered)}")
+    yield
+    llm_client_pool.close()
+
 
 app = FastAPI(
     title="Screening Pipeline App",
     version="2.0.0",
     description="Paper screening pipeline for systematic reviews",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -42,6 +59,7 @@ app.include_router(rules_router, prefix="/api")
 app.include_router(llm_router, prefix="/api")
 app.include_router(imports_router, prefix="/api")
 app.include_router(pdf_library_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
 
 
 @app.get("/api/health")
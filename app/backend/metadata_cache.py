@@ -0,0 +1,170 @@
+"""
+On-disk cache of open-access metadata API responses.
+
+PDF fetch asks OpenAlex, Semantic Scholar and Unpaywall about every DOI it
+has no PDF for yet. The JSON responses are stored here per provider and
+normalized DOI (in the shared PDF library, so all projects benefit), with a
+time-to-live per provider. A 404 is cached as well ("negative" entry, with
+its own shorter TTL), since most missing PDFs belong to DOIs the APIs do not
+know. Other errors (rate limits, server errors, timeouts) are never cached.
+
+Responses fetched in bulk ahead of the per-entry lookups are also kept in
+memory until they are looked up, so they are used even when reading the
+disk cache is turned off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from pdf_library import get_pdf_library_dir
+
+METADATA_CACHE_DIRNAME = "metadata_cache"
+DAY_SEC = 24 * 60 * 60
+# How long a successful response is reused, per provider.
+PROVIDER_TTL_SEC: dict[str, float] = {
+    "openalex": 30 * DAY_SEC,
+    "semantic_scholar": 30 * DAY_SEC,
+    # Open-access locations change more often (embargoes ending).
+    "unpaywall": 7 * DAY_SEC,
+}
+DEFAULT_TTL_SEC = 7 * DAY_SEC
+# How long a 404 is reused (newly registered DOIs show up later).
+NEGATIVE_TTL_SEC = 3 * DAY_SEC
+
+
+def get_metadata_cache_dir() -> Path:
+    return get_pdf_library_dir() / METADATA_CACHE_DIRNAME
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    data: Any
+    fetched_at: float
+
+    @property
+    def found(self) -> bool:
+        return self.status == 200
+
+
+class MetadataCache:
+    """
+    Response cache with one JSON file per provider and DOI. Thread-safe;
+    counts hits and misses for the step details.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        ttls: dict[str, float] | None = None,
+        negative_ttl: float = NEGATIVE_TTL_SEC,
+        read: bool = True,
+    ):
+        self.directory = Path(directory) if directory is not None else get_metadata_cache_dir()
+        self.ttls = PROVIDER_TTL_SEC if ttls is None else ttls
+        self.negative_ttl = negative_ttl
+        # With read=False responses are refreshed (and stored) but not reused.
+        self.read = read
+        self._lock = threading.Lock()
+        self._prefetched: dict[tuple[str, str], CachedResponse] = {}
+        self.counts: dict[str, dict[str, int]] = {}
+
+    def _path(self, provider: str, doi: str) -> Path:
+        digest = hashlib.sha256(doi.encode("utf-8")).hexdigest()
+        return self.directory / provider / digest[:2] / f"{digest[2:]}.json"
+
+    def _count(self, provider: str, outcome: str) -> None:
+        with self._lock:
+            counts = self.counts.setdefault(
+                provider, {"hits": 0, "negative_hits": 0, "prefetched": 0, "misses": 0}
+            )
+            counts[outcome] += 1
+
+    def get(self, provider: str, doi: str) -> CachedResponse | None:
+        """Fresh cached response for ``doi``, or None (counted as a miss)."""
+        with self._lock:
+            # Each prefetched response is looked up once per run.
+            cached = self._prefetched.pop((provider, doi), None)
+        if cached is not None:
+            self._count(provider, "prefetched")
+            return cached
+        cached = self._load(provider, doi) if self.read else None
+        if cached is None:
+            self._count(provider, "misses")
+        else:
+            self._count(provider, "hits" if cached.found else "negative_hits")
+        return cached
+
+    def contains(self, provider: str, doi: str) -> bool:
+        """Whether get() would answer from the cache (not counted)."""
+        with self._lock:
+            if (provider, doi) in self._prefetched:
+                return True
+        return self.read and self._load(provider, doi) is not None
+
+    def prefetched(self, provider: str, doi: str, status: int, data: Any = None) -> None:
+        """Store a response fetched in bulk and keep it until get() returns it."""
+        if status not in (200, 404):
+            return
+        with self._lock:
+            self._prefetched[(provider, doi)] = CachedResponse(status=status, data=data, fetched_at=time.time())
+        self.put(provider, doi, status, data)
+
+    def _load(self, provider: str, doi: str) -> CachedResponse | None:
+        path = self._path(provider, doi)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+            cached = CachedResponse(
+                status=int(stored["status"]),
+                data=stored.get("data"),
+                fetched_at=float(stored["fetched_at"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # Guard against hash collisions.
+        if stored.get("doi") != doi:
+            return None
+        ttl = self.ttls.get(provider, DEFAULT_TTL_SEC) if cached.found else self.negative_ttl
+        if time.time() - cached.fetched_at > ttl:
+            return None
+        return cached
+
+    def put(self, provider: str, doi: str, status: int, data: Any = None) -> None:
+        """Store a 200 response body or a 404 (``data`` None)."""
+        if status not in (200, 404):
+            return
+        path = self._path(provider, doi)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"provider": provider, "doi": doi, "status": status, "fetched_at": time.time(), "data": data},
+                    f,
+                    ensure_ascii=False,
+                )
+            tmp_path.replace(path)
+        except OSError:
+            pass
+
+    def summary(self) -> dict:
+        with self._lock:
+            providers = {name: dict(counts) for name, counts in sorted(self.counts.items())}
+        hits = sum(counts["hits"] + counts["negative_hits"] for counts in providers.values())
+        prefetched = sum(counts["prefetched"] for counts in providers.values())
+        lookups = hits + prefetched + sum(counts["misses"] for counts in providers.values())
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "prefetched": prefetched,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "providers": providers,
+        }
@@ -46,6 +46,9 @@ class StepExecution(BaseModel):
     duration_sec: float | None = None
     error: str | None = None
     progress: StepProgress | None = None
+    job_id: str | None = None
+    # A failed streaming run left a checkpoint and can be resumed.
+    resumable: bool = False
 
 
 class StepStats(BaseModel):
@@ -7,6 +7,7 @@ from .rules import router as rules_router
 from .llm import router as llm_router
 from .imports import router as imports_router
 from .pdf_library import router as pdf_library_router
+from .jobs import router as jobs_router
 
 __all__ = [
     "projects_router",
@@ -18,4 +19,5 @@ __all__ = [
     "llm_router",
     "imports_router",
     "pdf_library_router",
+    "jobs_router",
 ]
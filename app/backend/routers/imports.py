@@ -8,12 +8,12 @@ import shutil
 from datetime import datetime
 from pathlib import Path
 
-import bibtexparser
 from bibtexparser.bibdatabase import BibDatabase
 from bibtexparser.bwriter import BibTexWriter
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 
+from bib_cache import count_bib_file_entries, load_bib_entries
 from models.import_collection import (
     ImportCollection,
     ImportCreate,
@@ -51,9 +51,7 @@ def get_import_dir(import_id: str) -> Path:
 
 
 def count_bib_entries(file_path: Path) -> int:
-    with open(file_path, encoding="utf-8") as f:
-        bib_db = bibtexparser.load(f)
-    return len(bib_db.entries)
+    return count_bib_file_entries(file_path)
 
 def parse_tags(raw: str | None) -> list[str]:
     if not raw:
@@ -350,10 +348,7 @@ def run_import_query_search(
         if not file_path.exists():
             continue
 
-        with open(file_path, encoding="utf-8") as handle:
-            bib_db = bibtexparser.load(handle)
-
-        for entry in bib_db.entries:
+        for entry in load_bib_entries(file_path):
             stats.total_entries += 1
 
             title = clean_bib_text(str(entry.get("title", "")))
@@ -627,7 +622,5 @@ def get_file_entries(import_id: str, filename: str) -> dict:
     if not target_file.exists():
         raise HTTPException(status_code=404, detail=f"File not found: {filename}")
 
-    with open(target_file, encoding="utf-8") as f:
-        bib_db = bibtexparser.load(f)
-
-    return {"entries": bib_db.entries, "count": len(bib_db.entries)}
+    entries = load_bib_entries(target_file)
+    return {"entries": entries, "count": len(entries)}
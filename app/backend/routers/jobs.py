@@ -0,0 +1,35 @@
+"""
+Jobs API - Background step jobs.
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from jobs import job_manager
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("")
+def list_jobs(project_id: str | None = None) -> list[dict]:
+    """List queued, running and recently finished jobs (newest first)."""
+    return [job.to_dict() for job in job_manager.list_jobs(project_id)]
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str) -> dict:
+    """Get job status."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job(job_id: str) -> dict:
+    """Cancel a queued or running job."""
+    from .steps import cancel_job as cancel_step_job
+
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return cancel_step_job(job)
@@ -2,9 +2,12 @@
 LLM API - Local LLM connectivity checks.
 """
 
+import asyncio
+
 from fastapi import APIRouter
 from pydantic import BaseModel
-import httpx
+
+from llm_clients import parse_base_urls, probe_local_server
 
 router = APIRouter(prefix="/llm", tags=["llm"])
 
@@ -14,66 +17,30 @@ class LocalLLMCheckRequest(BaseModel):
     base_url: str
 
 
-def build_models_url(base_url: str) -> str:
-    """Build a models endpoint URL from a base URL."""
-    cleaned = base_url.rstrip("/")
-    if cleaned.endswith("/v1"):
-        return f"{cleaned}/models"
-    return f"{cleaned}/v1/models"
-
-
 @router.post("/check-local")
 async def check_local_server(request: LocalLLMCheckRequest):
-    """Check connectivity to a local LLM server (OpenAI-compatible)."""
-    models_url = build_models_url(request.base_url)
-
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(models_url)
-
-        if response.status_code != 200:
-            return {
-                "connected": False,
-                "url": request.base_url,
-                "models": [],
-                "error": f"HTTP {response.status_code}",
-            }
-
-        data = response.json()
-        models = []
-        if isinstance(data, dict) and "data" in data:
-            for model in data["data"]:
-                models.append(
-                    {
-                        "id": model.get("id", "unknown"),
-                        "owned_by": model.get("owned_by", "unknown"),
-                    }
-                )
-
-        return {
-            "connected": True,
-            "url": request.base_url,
-            "models": models,
-            "error": None,
-        }
-    except httpx.TimeoutException:
-        return {
-            "connected": False,
-            "url": request.base_url,
-            "models": [],
-            "error": "接続タイムアウト（VPN接続を確認してください）",
-        }
-    except httpx.ConnectError:
-        return {
-            "connected": False,
-            "url": request.base_url,
-            "models": [],
-            "error": "接続できません（VPN接続を確認してください）",
-        }
-    except Exception as e:
-        return {
-            "connected": False,
-            "url": request.base_url,
-            "models": [],
-            "error": str(e),
-        }
+    """
+    Check connectivity to local LLM servers (OpenAI-compatible).
+
+    ``base_url`` may list several servers separated by commas or whitespace;
+    each is checked and reported under ``endpoints``. The top-level fields
+    summarize them (connected only if every server answered).
+    """
+    urls = parse_base_urls(request.base_url) or [request.base_url]
+    results = await asyncio.gather(*(probe_local_server(url) for url in urls))
+    if len(results) == 1:
+        return {**results[0], "endpoints": results}
+
+    failed = [result for result in results if not result["connected"]]
+    models: list[dict] = []
+    for result in results:
+        for model in result["models"]:
+            if model not in models:
+                models.append(model)
+    return {
+        "connected": not failed,
+        "url": request.base_url,
+        "models": models,
+        "error": "; ".join(f"{result['url']}: {result['error']}" for result in failed) or None,
+        "endpoints": results,
+    }
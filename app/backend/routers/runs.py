@@ -6,7 +6,8 @@ import json
 from pathlib import Path
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import PlainTextResponse
-import bibtexparser
+
+from bib_cache import load_bib_entries
 
 router = APIRouter()
 
@@ -20,11 +21,8 @@ def parse_bibtex_file(bib_path: Path) -> dict[str, dict]:
     if not bib_path.exists():
         return {}
 
-    with open(bib_path, encoding="utf-8") as f:
-        bib_db = bibtexparser.load(f)
-
     papers = {}
-    for entry in bib_db.entries:
+    for entry in load_bib_entries(bib_path):
         key = entry.get("ID", "")
         papers[key] = {
             "citation_key": key,
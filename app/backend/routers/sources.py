@@ -10,6 +10,8 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 from datetime import datetime
 
+from bib_cache import count_bib_file_entries, load_bib_entries
+
 router = APIRouter(prefix="/projects/{project_id}/sources", tags=["sources"])
 
 PROJECTS_DIR = Path(__file__).parent.parent.parent.parent / "screening" / "projects"
@@ -66,12 +68,7 @@ def save_sources_meta(project_id: str, meta: SourcesMeta) -> None:
 
 def count_bib_entries(file_path: Path) -> int:
     """Count entries in a BibTeX file."""
-    import bibtexparser
-
-    with open(file_path, encoding="utf-8") as f:
-        bib_db = bibtexparser.load(f)
-
-    return len(bib_db.entries)
+    return count_bib_file_entries(file_path)
 
 
 @router.get("")
@@ -303,8 +300,6 @@ def delete_source(project_id: str, category: str, filename: str) -> dict:
 @router.get("/{category}/{filename}/entries")
 def get_source_entries(project_id: str, category: str, filename: str) -> dict:
     """Get entries from a source file."""
-    import bibtexparser
-
     if category not in ("databases", "other"):
         raise HTTPException(status_code=400, detail="Category must be 'databases' or 'other'")
 
@@ -314,10 +309,8 @@ def get_source_entries(project_id: str, category: str, filename: str) -> dict:
     if not target_file.exists():
         raise HTTPException(status_code=404, detail=f"File not found: {filename}")
 
-    with open(target_file, encoding="utf-8") as f:
-        bib_db = bibtexparser.load(f)
-
-    return {"entries": bib_db.entries, "count": len(bib_db.entries)}
+    entries = load_bib_entries(target_file)
+    return {"entries": entries, "count": len(entries)}
 
 
 class SourceFileStat(BaseModel):
@@ -2,19 +2,41 @@
 Steps API - Step execution and status.
 """
 
+import asyncio
+import itertools
 import json
+import threading
+import time
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from typing import Iterable
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 import bibtexparser
 from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.bibdatabase import BibDatabase
 
 import re
+from bib_cache import load_bib_entries
+from jobs import JobConflictError, JobStatus, StepJob, job_manager
+from step_events import SSE_KEEPALIVE_SEC, get_meta_write_interval, step_event_bus
 from models.step import StepMeta, StepStatus, StepExecution, StepProgress, StepInput, StepOutput, StepStats
-from step_handlers.base import Change
+from step_handlers.base import Change, StreamingStepHandler
+from step_handlers.dedup_features import FEATURES_FILENAME
+from step_handlers.dedup_pair_cache import SCORED_PAIRS_FILENAME
+from step_handlers.screening_checkpoint import SCREENING_CHECKPOINT_FILENAME
+from step_handlers.screening_metrics import METRICS_FILENAME, METRICS_SAMPLES_FILENAME
+from step_handlers.query_filter import estimate_recall
+from step_streams import (
+    STREAM_CHECKPOINT_FILENAME,
+    FileStepSink,
+    JsonArrayWriter,
+    count_json_array,
+    iter_json_array,
+    load_stream_checkpoint,
+    write_json_array,
+)
 
 router = APIRouter(prefix="/projects/{project_id}/steps", tags=["steps"])
 
@@ -52,14 +74,24 @@ def load_step_meta(project_id: str, step_id: str) -> StepMeta | None:
     return StepMeta(**data)
 
 
+def publish_step_meta(project_id: str, step_id: str, meta: StepMeta) -> None:
+    """Send the step meta to SSE subscribers of the step."""
+    step_event_bus.publish(project_id, step_id, meta.model_dump(mode="json", by_alias=True))
+
+
 def save_step_meta(project_id: str, step_id: str, meta: StepMeta) -> None:
-    """Save step metadata to disk."""
+    """Save step metadata to disk (and publish it to event subscribers)."""
     step_dir = get_step_dir(project_id, step_id)
     step_dir.mkdir(parents=True, exist_ok=True)
 
+    # Written to a temp file and swapped in, since job threads update the
+    # meta while requests read it.
     meta_file = step_dir / "meta.json"
-    with open(meta_file, "w", encoding="utf-8") as f:
+    tmp_file = step_dir / f"meta.json.{threading.get_ident()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
         json.dump(meta.model_dump(mode="json", by_alias=True), f, indent=2, ensure_ascii=False)
+    tmp_file.replace(meta_file)
+    publish_step_meta(project_id, step_id, meta)
 
 
 @router.get("")
@@ -118,10 +150,51 @@ def get_step(project_id: str, step_id: str) -> dict:
 
     # Return meta with is_latest flag
     result = meta.model_dump(mode="json", by_alias=True)
-    result["is_latest"] = is_latest_step(pipeline, step_id)
+    if meta.execution.status == StepStatus.RUNNING:
+        # meta.json progress is throttled; the last published state is newer.
+        result = step_event_bus.last_event(project_id, step_id) or result
+    result = {**result, "is_latest": is_latest_step(pipeline, step_id)}
     return result
 
 
+@router.get("/{step_id}/events")
+async def stream_step_events(project_id: str, step_id: str, request: Request) -> StreamingResponse:
+    """
+    Server-sent events with the step meta whenever its execution state changes.
+
+    The current meta is sent on connect. Bursts of updates are coalesced, so
+    a slow client only receives the latest state.
+    """
+    async def event_stream():
+        subscriber = step_event_bus.subscribe(project_id, step_id)
+        try:
+            # Read after subscribing, so an update published in between
+            # (e.g. the final "completed" state) is queued, not lost.
+            meta = step_event_bus.last_event(project_id, step_id)
+            if meta is None:
+                stored_meta = load_step_meta(project_id, step_id)
+                meta = stored_meta.model_dump(mode="json", by_alias=True) if stored_meta else None
+            if meta is not None:
+                yield f"data: {json.dumps(meta, ensure_ascii=False)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                while not subscriber.queue.empty():
+                    event = subscriber.queue.get_nowait()
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            step_event_bus.unsubscribe(project_id, step_id, subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 def load_input_entries(project_id: str, input_from: str | dict) -> tuple[list[dict], StepInput]:
     """
     Load input entries from sources or a previous step.
@@ -161,14 +234,13 @@ def load_input_entries(project_id: str, input_from: str | dict) -> tuple[list[di
                         file_database_map = {}
                 for bib_file in import_dir.glob("*.bib"):
                     source_database = file_database_map.get(bib_file.name)
-                    with open(bib_file, encoding="utf-8") as f:
-                        bib_db = bibtexparser.load(f)
-                        for entry in bib_db.entries:
-                            entry["_source_import"] = import_id
-                            entry["_source_file"] = bib_file.name
-                            if source_database:
-                                entry["_source_database"] = source_database
-                        entries.extend(bib_db.entries)
+                    file_entries = load_bib_entries(bib_file)
+                    for entry in file_entries:
+                        entry["_source_import"] = import_id
+                        entry["_source_file"] = bib_file.name
+                        if source_database:
+                            entry["_source_database"] = source_database
+                    entries.extend(file_entries)
 
             return entries, StepInput(
                 from_source="sources",
@@ -202,14 +274,13 @@ def load_input_entries(project_id: str, input_from: str | dict) -> tuple[list[di
 
             for bib_file in category_dir.glob("*.bib"):
                 source_database = source_database_map.get((category, bib_file.name))
-                with open(bib_file, encoding="utf-8") as f:
-                    bib_db = bibtexparser.load(f)
-                    for entry in bib_db.entries:
-                        entry["_source_file"] = bib_file.name
-                        entry["_source_category"] = category
-                        if source_database:
-                            entry["_source_database"] = source_database
-                    entries.extend(bib_db.entries)
+                file_entries = load_bib_entries(bib_file)
+                for entry in file_entries:
+                    entry["_source_file"] = bib_file.name
+                    entry["_source_category"] = category
+                    if source_database:
+                        entry["_source_database"] = source_database
+                entries.extend(file_entries)
 
         return entries, StepInput(
             from_source="sources",
@@ -285,6 +356,91 @@ def load_input_entries(project_id: str, input_from: str | dict) -> tuple[list[di
         )
 
 
+def input_source_step(input_from: str | dict) -> str | None:
+    """Return the step an input is read from (None for sources)."""
+    source_step = input_from.get("step") if isinstance(input_from, dict) else input_from
+    if not source_step or source_step == "sources":
+        return None
+    return source_step
+
+
+def require_completed_input(project_id: str, input_from: str | dict) -> None:
+    """
+    Raise 409 if the step an input is read from has not completed.
+
+    A running step's outputs are still being appended to, and a failed or
+    cancelled run leaves them partial. Steps without meta.json are read as
+    before.
+    """
+    source_step = input_source_step(input_from)
+    if source_step is None:
+        return
+    source_meta = load_step_meta(project_id, source_step)
+    if source_meta is not None and source_meta.execution.status != StepStatus.COMPLETED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Input not ready: step '{source_step}' is {source_meta.execution.status.value}",
+        )
+
+
+def require_no_active_readers(project_id: str, step_id: str) -> None:
+    """
+    Raise 409 if a queued or running job reads this step's outputs.
+
+    Streaming steps iterate their input file lazily, so rewriting it under
+    them would mix the old and new contents.
+    """
+    from .pipeline import load_pipeline
+
+    for step in load_pipeline(project_id).steps:
+        if input_source_step(step.input_from) != step_id:
+            continue
+        if job_manager.active_job(project_id, step.id) is not None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Step output is in use: step '{step.id}' is reading it",
+            )
+
+
+def require_step_idle(project_id: str, step_id: str) -> None:
+    """
+    Raise 409 while the step has a queued or running job.
+
+    Streaming runs rewrite input.json and the output files as they go, so
+    the files are incomplete until the run finishes.
+    """
+    if job_manager.active_job(project_id, step_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Step is running: {step_id}")
+
+
+def open_input_entries(project_id: str, input_from: str | dict) -> tuple[Iterable[dict], StepInput]:
+    """
+    Like load_input_entries, but iterates a previous step's JSON output lazily.
+
+    Sources (BibTeX imports) are still parsed in full.
+    """
+    if input_from == "sources":
+        return load_input_entries(project_id, input_from)
+
+    if isinstance(input_from, dict):
+        source_step = input_from.get("step")
+        output_name = input_from.get("output", "passed")
+    else:
+        source_step = input_from
+        output_name = "passed"
+
+    output_json_file = PROJECTS_DIR / project_id / "steps" / source_step / "outputs" / f"{output_name}.json"
+    if not output_json_file.exists():
+        return load_input_entries(project_id, input_from)
+
+    return iter_json_array(output_json_file), StepInput(
+        from_source=source_step,
+        output=output_name,
+        file=str(output_json_file.relative_to(PROJECTS_DIR / project_id)),
+        count=count_json_array(output_json_file),
+    )
+
+
 def save_output_entries(project_id: str, step_id: str, output_name: str, entries: list[dict]) -> Path:
     """Save entries to a BibTeX file."""
     output_dir = PROJECTS_DIR / project_id / "steps" / step_id / "outputs"
@@ -294,8 +450,7 @@ def save_output_entries(project_id: str, step_id: str, output_name: str, entries
     output_json_file = output_dir / f"{output_name}.json"
 
     # Save full entries in JSON for downstream steps (keeps source metadata fields).
-    with open(output_json_file, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
+    write_json_array(output_json_file, entries)
 
     # Create BibTeX database
     db = BibDatabase()
@@ -329,8 +484,7 @@ def save_input_entries(project_id: str, step_id: str, entries: list[dict]) -> Pa
     step_dir.mkdir(parents=True, exist_ok=True)
 
     input_file = step_dir / "input.json"
-    with open(input_file, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
+    write_json_array(input_file, entries)
 
     return input_file
 
@@ -406,6 +560,21 @@ def save_clusters(project_id: str, step_id: str, clusters: list[dict]) -> None:
         json.dump({"clusters": clusters}, f, indent=2, ensure_ascii=False)
 
 
+# Detail keys that are persisted elsewhere (clusters.json, outputs, changes files).
+STEP_DETAILS_EXCLUDED_KEYS = ("clusters", "mode_outputs", "mode_changes")
+
+
+def save_step_details(project_id: str, step_id: str, details: dict) -> None:
+    """Save handler run details (stats, diagnostics) to JSON file."""
+    step_dir = get_step_dir(project_id, step_id)
+    step_dir.mkdir(parents=True, exist_ok=True)
+
+    payload = {k: v for k, v in details.items() if k not in STEP_DETAILS_EXCLUDED_KEYS}
+    details_file = step_dir / "details.json"
+    with open(details_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
+
+
 def summarize_changes(changes: list) -> tuple[dict[str, int], dict[str, int] | None]:
     """Summarize action/decision counts from changes."""
     action_counts = {"keep": 0, "remove": 0, "modify": 0}
@@ -426,9 +595,102 @@ def summarize_changes(changes: list) -> tuple[dict[str, int], dict[str, int] | N
     return action_counts, decision_counts if has_decision else None
 
 
-@router.post("/{step_id}/run")
-def run_step(project_id: str, step_id: str) -> StepMeta:
-    """Run a step."""
+# Extra copies written by streaming runs, matching the files execute_step writes
+# for these step types in the non-streaming path.
+STREAM_OUTPUT_COPIES = {
+    "ai-screening": {name: [f"ai_{name}"] for name in ("passed", "excluded", "uncertain")},
+}
+STREAM_CHANGE_COPIES = {
+    "ai-screening": {"changes.jsonl": ["changes_ai.jsonl"]},
+}
+
+
+def run_streaming_handler(
+    project_id: str,
+    step_id: str,
+    step_type: str,
+    handler: StreamingStepHandler,
+    handler_config: dict,
+    input_entries: Iterable[dict],
+    input_count: int,
+    progress_callback,
+    resume: bool = False,
+) -> tuple[dict, FileStepSink]:
+    """
+    Run a streaming handler, appending input.json, outputs and changes as
+    entries are processed. On failure the files written so far are closed
+    as valid JSON and kept; BibTeX files are only written on success.
+
+    With ``resume`` the run continues after the last checkpoint of an
+    interrupted run: files are cut back to that point and the already
+    processed input entries are skipped (after checking they are unchanged).
+    """
+    step_dir = get_step_dir(project_id, step_id)
+    checkpoint = load_stream_checkpoint(step_dir) if resume else None
+    if resume and checkpoint is None:
+        raise HTTPException(status_code=409, detail=f"Resume checkpoint not found: {step_id}")
+    skip = int(checkpoint["entries"]) if checkpoint else 0
+
+    input_entries = iter(input_entries)
+    if skip:
+        input_file = step_dir / "input.json"
+        done_entries = itertools.islice(input_entries, skip)
+        kept_entries = iter_json_array(input_file) if input_file.exists() else iter(())
+        matches = sum(
+            1 for source_entry, kept_entry in zip(done_entries, kept_entries)
+            if source_entry == kept_entry
+        )
+        if matches != skip:
+            raise HTTPException(
+                status_code=409,
+                detail="Step input changed since the interrupted run; run the step again",
+            )
+
+    sink = FileStepSink(
+        step_dir,
+        output_copies=STREAM_OUTPUT_COPIES.get(step_type),
+        change_copies=STREAM_CHANGE_COPIES.get(step_type),
+        resume_from=checkpoint,
+    )
+    for definition in handler.output_definitions:
+        sink.open_output(definition.name)
+    for output_name in handler.extra_outputs:
+        sink.open_output(output_name)
+    sink.open_changes()
+    for filename in handler.extra_change_files:
+        sink.open_changes(filename)
+    input_writer = JsonArrayWriter(step_dir / "input.json", keep=skip)
+
+    def tee_input() -> Iterable[dict]:
+        for entry in input_entries:
+            input_writer.append(entry)
+            yield entry
+
+    def report_progress(completed: int, total: int, message: str | None = None) -> None:
+        # The handler only sees the remaining entries when resuming.
+        progress_callback(skip + completed, skip + total, message)
+
+    succeeded = False
+    try:
+        details = handler.run_stream(
+            tee_input(),
+            input_count - skip,
+            handler_config,
+            sink,
+            progress_callback=report_progress if skip else progress_callback,
+        )
+        succeeded = True
+    finally:
+        input_writer.close()
+        sink.close(write_bibtex=succeeded)
+    details = details if isinstance(details, dict) else {}
+    if skip:
+        details["resumed_from_entry"] = skip
+    return details, sink
+
+
+def find_step_definition(project_id: str, step_id: str):
+    """Return the pipeline step definition and handler class, or raise 404/400."""
     from step_handlers import get_handler
     from .pipeline import load_pipeline
 
@@ -446,9 +708,147 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
     if handler_class is None:
         raise HTTPException(status_code=400, detail=f"Unknown step type: {step_def.type}")
 
+    return step_def, handler_class
+
+
+def submit_step_job(project_id: str, step_id: str, resume: bool = False) -> StepMeta:
+    """Queue a step run and mark the step as running (message "Queued")."""
+    step_def, _ = find_step_definition(project_id, step_id)
+
     existing_meta = load_step_meta(project_id, step_id)
-    if existing_meta and existing_meta.execution.status == StepStatus.RUNNING:
+    if job_manager.active_job(project_id, step_id) is not None:
         raise HTTPException(status_code=409, detail=f"Step is already running: {step_id}")
+    require_completed_input(project_id, step_def.input_from)
+    require_no_active_readers(project_id, step_id)
+
+    queued_at = datetime.now()
+    queued_meta = StepMeta(
+        step_id=step_id,
+        step_type=step_def.type,
+        name=step_def.name,
+        input=existing_meta.input if resume and existing_meta else None,
+        stats=existing_meta.stats if resume and existing_meta else StepStats(),
+        execution=StepExecution(
+            status=StepStatus.RUNNING,
+            started_at=queued_at,
+            progress=StepProgress(
+                completed=0,
+                total=0,
+                percent=0.0,
+                message="Queued",
+                updated_at=queued_at,
+            ),
+        ),
+    )
+
+    def record_queued(job: StepJob) -> None:
+        queued_meta.execution.job_id = job.id
+        save_step_meta(project_id, step_id, queued_meta)
+
+    try:
+        job_manager.submit(
+            project_id,
+            step_id,
+            lambda job: execute_step(project_id, step_id, job),
+            resume=resume,
+            on_queued=record_queued,
+        )
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return queued_meta
+
+
+@router.post("/{step_id}/run")
+def run_step(project_id: str, step_id: str) -> StepMeta:
+    """Queue a step run. Returns immediately; poll the step or job for status."""
+    return submit_step_job(project_id, step_id)
+
+
+@router.post("/{step_id}/resume")
+def resume_step(project_id: str, step_id: str) -> StepMeta:
+    """Resume an interrupted or cancelled streaming run from its last checkpoint."""
+    meta = load_step_meta(project_id, step_id)
+    if meta is None or meta.execution.status != StepStatus.FAILED or not meta.execution.resumable:
+        raise HTTPException(status_code=409, detail=f"Step has no resumable run: {step_id}")
+    if load_stream_checkpoint(get_step_dir(project_id, step_id)) is None:
+        raise HTTPException(status_code=409, detail=f"Resume checkpoint not found: {step_id}")
+    return submit_step_job(project_id, step_id, resume=True)
+
+
+@router.post("/{step_id}/cancel")
+def cancel_step(project_id: str, step_id: str) -> dict:
+    """Cancel the queued or running job of a step."""
+    job = job_manager.active_job(project_id, step_id)
+    if job is None:
+        raise HTTPException(status_code=409, detail=f"Step has no active job: {step_id}")
+    return cancel_job(job)
+
+
+def cancel_job(job: StepJob) -> dict:
+    """Cancel a job; a job that never started is marked failed right away."""
+    job_manager.cancel(job.id)
+    if job.status == JobStatus.CANCELLED and job.started_at is None:
+        mark_step_failed(job.project_id, job.step_id, "Cancelled")
+    return job.to_dict()
+
+
+def mark_step_failed(project_id: str, step_id: str, error: str) -> StepMeta | None:
+    """Mark a running step as failed, flagging it resumable if a checkpoint exists."""
+    meta = load_step_meta(project_id, step_id)
+    if meta is None:
+        return None
+    completed_at = datetime.now()
+    started_at = meta.execution.started_at
+    meta.execution.status = StepStatus.FAILED
+    meta.execution.completed_at = completed_at
+    meta.execution.duration_sec = (completed_at - started_at).total_seconds() if started_at else None
+    meta.execution.error = error
+    meta.execution.resumable = is_step_resumable(project_id, step_id, meta.step_type)
+    save_step_meta(project_id, step_id, meta)
+    return meta
+
+
+def is_step_resumable(project_id: str, step_id: str, step_type: str) -> bool:
+    from step_handlers import get_handler
+
+    handler_class = get_handler(step_type)
+    if handler_class is None or not issubclass(handler_class, StreamingStepHandler):
+        return False
+    checkpoint = load_stream_checkpoint(get_step_dir(project_id, step_id))
+    return bool(checkpoint and checkpoint.get("entries"))
+
+
+def recover_interrupted_steps() -> list[str]:
+    """
+    Mark steps left RUNNING by a previous server process as failed (resumable
+    when a streaming checkpoint exists). Called once at startup.
+    """
+    recovered = []
+    if not PROJECTS_DIR.exists():
+        return recovered
+    for meta_file in sorted(PROJECTS_DIR.glob("*/steps/*/meta.json")):
+        project_id = meta_file.parent.parent.parent.name
+        step_id = meta_file.parent.name
+        try:
+            meta = load_step_meta(project_id, step_id)
+        except Exception:
+            continue
+        if meta is None or meta.execution.status != StepStatus.RUNNING:
+            continue
+        if job_manager.active_job(project_id, step_id) is not None:
+            continue
+        mark_step_failed(project_id, step_id, "Interrupted: the server stopped while this step was running")
+        recovered.append(f"{project_id}/{step_id}")
+    return recovered
+
+
+def execute_step(project_id: str, step_id: str, job: StepJob) -> StepMeta:
+    """Run a queued step job to completion, saving meta, outputs and changes."""
+    try:
+        step_def, handler_class = find_step_definition(project_id, step_id)
+    except HTTPException as e:
+        mark_step_failed(project_id, step_id, str(e.detail))
+        raise
 
     # Mark as running
     started_at = datetime.now()
@@ -460,6 +860,7 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
         execution=StepExecution(
             status=StepStatus.RUNNING,
             started_at=started_at,
+            job_id=job.id,
             progress=StepProgress(
                 completed=0,
                 total=0,
@@ -472,9 +873,19 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
     save_step_meta(project_id, step_id, running_meta)
 
     try:
-        # Load input entries
-        input_entries, input_meta = load_input_entries(project_id, step_def.input_from)
-        save_input_entries(project_id, step_id, input_entries)
+        handler = handler_class()
+        streaming = isinstance(handler, StreamingStepHandler)
+
+        # Load input entries (iterated lazily by streaming handlers)
+        if job.resume and not streaming:
+            raise HTTPException(status_code=409, detail=f"Step type cannot be resumed: {step_def.type}")
+        # Checked again here: the input step may have been re-run since this job was queued.
+        require_completed_input(project_id, step_def.input_from)
+        if streaming:
+            input_entries, input_meta = open_input_entries(project_id, step_def.input_from)
+        else:
+            input_entries, input_meta = load_input_entries(project_id, step_def.input_from)
+            save_input_entries(project_id, step_id, input_entries)
 
         running_meta.input = input_meta
         running_meta.stats = StepStats(
@@ -486,8 +897,15 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
         save_step_meta(project_id, step_id, running_meta)
 
         last_progress = {"completed": -1, "total": -1, "message": None}
+        # Every progress change is published to subscribers; meta.json is
+        # only rewritten every meta_write_interval seconds.
+        meta_write_interval = get_meta_write_interval()
+        last_meta_write = {"at": 0.0}
 
         def report_progress(completed: int, total: int, message: str | None = None) -> None:
+            # Handlers report progress regularly, so this is where a
+            # cancelled job stops.
+            job.raise_if_cancelled()
             total_value = max(int(total or 0), 0)
             completed_value = max(int(completed or 0), 0)
             if total_value > 0:
@@ -516,89 +934,130 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
                 message=message or "Running",
                 updated_at=now,
             )
-            save_step_meta(project_id, step_id, running_meta)
+            if time.monotonic() - last_meta_write["at"] >= meta_write_interval:
+                save_step_meta(project_id, step_id, running_meta)
+                last_meta_write["at"] = time.monotonic()
+            else:
+                publish_step_meta(project_id, step_id, running_meta)
             last_progress["completed"] = completed_value
             last_progress["total"] = total_value
             last_progress["message"] = message
 
         report_progress(0, input_meta.count, "Processing entries")
 
-        # Create handler and run
-        handler = handler_class()
+        # Run handler
         handler_config = dict(step_def.config or {})
-        if step_def.type == "pdf-fetch":
-            handler_config["_project_id"] = project_id
-            handler_config["_step_id"] = step_id
-        result = handler.run(input_entries, handler_config, progress_callback=report_progress)
-        report_progress(input_meta.count, input_meta.count, "Finalizing outputs")
+        handler_config["_project_id"] = project_id
+        handler_config["_step_id"] = step_id
+        # Step directory for per-step caches such as the dedup feature table.
+        handler_config["_step_dir"] = str(get_step_dir(project_id, step_id))
+        # Continuing an interrupted run (handlers may merge its statistics).
+        handler_config["_resume"] = job.resume
 
-        # Save outputs
         outputs = {}
-        for output_name, entries in result.outputs.items():
-            output_file = save_output_entries(project_id, step_id, output_name, entries)
-            outputs[output_name] = StepOutput(
-                file=str(output_file.relative_to(PROJECTS_DIR / project_id)),
-                count=len(entries),
-                description=next(
-                    (od.description for od in handler_class.output_definitions if od.name == output_name),
-                    "",
-                ),
+        if streaming:
+            # Outputs and changes are appended to disk while the handler runs.
+            details, sink = run_streaming_handler(
+                project_id,
+                step_id,
+                step_def.type,
+                handler,
+                handler_config,
+                input_entries,
+                input_meta.count,
+                report_progress,
+                resume=job.resume,
             )
+            report_progress(input_meta.count, input_meta.count, "Finalizing outputs")
+            step_dir = get_step_dir(project_id, step_id)
+            for od in handler_class.output_definitions:
+                outputs[od.name] = StepOutput(
+                    file=str((step_dir / "outputs" / f"{od.name}.bib").relative_to(PROJECTS_DIR / project_id)),
+                    count=sink.output_count(od.name),
+                    description=od.description,
+                )
+            action_counts = dict(sink.change_counts.get("changes.jsonl", {"keep": 0, "remove": 0, "modify": 0}))
+            decision_totals = sink.decision_counts.get("changes.jsonl", {})
+            decision_counts = dict(decision_totals) if any(decision_totals.values()) else None
+            output_total = sum(output.count for output in outputs.values())
+        else:
+            result = handler.run(input_entries, handler_config, progress_callback=report_progress)
+            report_progress(input_meta.count, input_meta.count, "Finalizing outputs")
+            details = result.details if isinstance(result.details, dict) else {}
+
+            # Save outputs
+            for output_name, entries in result.outputs.items():
+                output_file = save_output_entries(project_id, step_id, output_name, entries)
+                outputs[output_name] = StepOutput(
+                    file=str(output_file.relative_to(PROJECTS_DIR / project_id)),
+                    count=len(entries),
+                    description=next(
+                        (od.description for od in handler_class.output_definitions if od.name == output_name),
+                        "",
+                    ),
+                )
+                if step_def.type == "ai-screening":
+                    save_output_entries(project_id, step_id, f"ai_{output_name}", entries)
+            if step_def.type == "pdf-fetch":
+                mode_outputs = details.get("mode_outputs", {})
+                if isinstance(mode_outputs, dict):
+                    for mode_name, entries in mode_outputs.items():
+                        if not isinstance(entries, list):
+                            continue
+                        save_output_entries(project_id, step_id, f"mode_{mode_name}_passed", entries)
+
+            # Save changes
             if step_def.type == "ai-screening":
-                save_output_entries(project_id, step_id, f"ai_{output_name}", entries)
+                save_changes(project_id, step_id, result.changes, filename="changes_ai.jsonl")
+                save_changes(project_id, step_id, result.changes, filename="changes.jsonl")
+            elif step_def.type == "pdf-fetch":
+                mode_changes = details.get("mode_changes", {})
+                if isinstance(mode_changes, dict):
+                    for mode_name, mode_change_list in mode_changes.items():
+                        if not isinstance(mode_change_list, list):
+                            continue
+                        save_changes(
+                            project_id,
+                            step_id,
+                            mode_change_list,
+                            filename=f"changes_{mode_name}.jsonl",
+                        )
+                save_changes(project_id, step_id, result.changes, filename="changes.jsonl")
+            else:
+                save_changes(project_id, step_id, result.changes)
+
+            action_counts, decision_counts = summarize_changes(result.changes)
+            output_total = sum(len(entries) for entries in result.outputs.values())
+
         if step_def.type == "ai-screening":
             for output_name in ("passed", "excluded", "uncertain"):
                 human_file = PROJECTS_DIR / project_id / "steps" / step_id / "outputs" / f"human_{output_name}.bib"
                 if not human_file.exists():
                     save_output_entries(project_id, step_id, f"human_{output_name}", [])
-        elif step_def.type == "pdf-fetch":
-            details = result.details if isinstance(result.details, dict) else {}
-            mode_outputs = details.get("mode_outputs", {})
-            if isinstance(mode_outputs, dict):
-                for mode_name, entries in mode_outputs.items():
-                    if not isinstance(entries, list):
-                        continue
-                    save_output_entries(project_id, step_id, f"mode_{mode_name}_passed", entries)
-
-        # Save changes
-        if step_def.type == "ai-screening":
-            save_changes(project_id, step_id, result.changes, filename="changes_ai.jsonl")
-            save_changes(project_id, step_id, result.changes, filename="changes.jsonl")
             save_changes(project_id, step_id, [], filename="changes_human.jsonl")
-        elif step_def.type == "pdf-fetch":
-            details = result.details if isinstance(result.details, dict) else {}
-            mode_changes = details.get("mode_changes", {})
-            if isinstance(mode_changes, dict):
-                for mode_name, mode_change_list in mode_changes.items():
-                    if not isinstance(mode_change_list, list):
-                        continue
-                    save_changes(
-                        project_id,
-                        step_id,
-                        mode_change_list,
-                        filename=f"changes_{mode_name}.jsonl",
-                    )
-            save_changes(project_id, step_id, result.changes, filename="changes.jsonl")
-        else:
-            save_changes(project_id, step_id, result.changes)
 
         # Save clusters if provided
-        if isinstance(result.details, dict) and isinstance(result.details.get("clusters"), list):
-            save_clusters(project_id, step_id, result.details["clusters"])
+        if isinstance(details.get("clusters"), list):
+            save_clusters(project_id, step_id, details["clusters"])
+        save_step_details(project_id, step_id, details)
 
         completed_at = datetime.now()
         duration = (completed_at - started_at).total_seconds()
 
         # Calculate stats (counts derived from changes)
-        action_counts, decision_counts = summarize_changes(result.changes)
         if step_def.type == "pdf-fetch":
-            details = result.details if isinstance(result.details, dict) else {}
-            stats = details.get("stats", {}) if isinstance(details, dict) else {}
+            stats = details.get("stats", {}) if isinstance(details.get("stats"), dict) else {}
             total_output = input_meta.count
-            passed_count = int(stats.get("passed_count", action_counts["keep"]))
-            removed_count = int(stats.get("removed_count", action_counts["remove"]))
+            if streaming:
+                # Handler stats only cover the entries of this run when it
+                # was resumed; the passed output covers the whole input.
+                passed_count = sink.output_count("passed")
+                removed_count = input_meta.count - passed_count
+            else:
+                passed_count = int(stats.get("passed_count", action_counts["keep"]))
+                removed_count = int(stats.get("removed_count", action_counts["remove"]))
         else:
-            total_output = sum(len(entries) for entries in result.outputs.values())
+            total_output = output_total
             if decision_counts:
                 passed_count = decision_counts["include"]
                 removed_count = decision_counts["exclude"]
@@ -623,6 +1082,7 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
                 started_at=started_at,
                 completed_at=completed_at,
                 duration_sec=duration,
+                job_id=job.id,
                 progress=StepProgress(
                     completed=input_meta.count,
                     total=input_meta.count,
@@ -662,6 +1122,8 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
                 duration_sec=duration,
                 error=str(e.detail),
                 progress=progress,
+                job_id=job.id,
+                resumable=is_step_resumable(project_id, step_id, step_def.type),
             ),
         )
         save_step_meta(project_id, step_id, meta)
@@ -693,11 +1155,12 @@ def run_step(project_id: str, step_id: str) -> StepMeta:
                 duration_sec=duration,
                 error=str(e),
                 progress=progress,
+                job_id=job.id,
+                resumable=is_step_resumable(project_id, step_id, step_def.type),
             ),
         )
         save_step_meta(project_id, step_id, meta)
-
-        raise HTTPException(status_code=500, detail=str(e))
+        raise
 
 
 @router.post("/{step_id}/reset")
@@ -723,6 +1186,9 @@ def reset_step(project_id: str, step_id: str) -> dict:
             detail="Only the latest step can be reset. Intermediate steps cannot be reset because subsequent steps depend on them."
         )
 
+    if job_manager.active_job(project_id, step_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Step is running; cancel it before resetting: {step_id}")
+
     step_dir = get_step_dir(project_id, step_id)
 
     # Remove outputs
@@ -736,6 +1202,19 @@ def reset_step(project_id: str, step_id: str) -> dict:
     if changes_file.exists():
         changes_file.unlink()
 
+    # Remove decisions kept from an interrupted AI screening run
+    screening_checkpoint = step_dir / SCREENING_CHECKPOINT_FILENAME
+    if screening_checkpoint.exists():
+        screening_checkpoint.unlink()
+
+    # Remove request metrics of the last run
+    for filename in (METRICS_FILENAME, METRICS_SAMPLES_FILENAME):
+        (step_dir / filename).unlink(missing_ok=True)
+
+    # Remove run details, the streaming checkpoint and cached dedup features/pairs
+    for filename in ("details.json", STREAM_CHECKPOINT_FILENAME, FEATURES_FILENAME, SCORED_PAIRS_FILENAME):
+        (step_dir / filename).unlink(missing_ok=True)
+
     # Remove meta.json to fully reset
     meta_file = step_dir / "meta.json"
     if meta_file.exists():
@@ -748,6 +1227,7 @@ def reset_step(project_id: str, step_id: str) -> dict:
         name=step_def.name,
         execution=StepExecution(status=StepStatus.PENDING),
     )
+    publish_step_meta(project_id, step_id, meta)
 
     result = meta.model_dump(mode="json", by_alias=True)
     result["is_latest"] = True
@@ -779,10 +1259,14 @@ def delete_step(project_id: str, step_id: str) -> dict:
             detail="Only the latest step can be deleted. Intermediate steps cannot be deleted because subsequent steps depend on them."
         )
 
+    if job_manager.active_job(project_id, step_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Step is running; cancel it before deleting: {step_id}")
+
     # Remove step directory
     step_dir = get_step_dir(project_id, step_id)
     if step_dir.exists():
         shutil.rmtree(step_dir)
+    step_event_bus.forget(project_id, step_id)
 
     # Remove from pipeline
     pipeline.steps.pop(step_index)
@@ -796,6 +1280,8 @@ def get_step_output(project_id: str, step_id: str, output_name: str) -> dict:
     """Get a step output (BibTeX entries as JSON)."""
     import bibtexparser
 
+    require_step_idle(project_id, step_id)
+
     step_dir = get_step_dir(project_id, step_id)
     output_json_file = step_dir / "outputs" / f"{output_name}.json"
     output_file = step_dir / "outputs" / f"{output_name}.bib"
@@ -834,6 +1320,7 @@ def download_step_output(project_id: str, step_id: str, output_name: str):
 @router.get("/{step_id}/input/download")
 def download_step_input(project_id: str, step_id: str):
     """Download step input as a BibTeX file."""
+    require_step_idle(project_id, step_id)
     step_dir = get_step_dir(project_id, step_id)
     input_file = step_dir / "input.json"
 
@@ -868,6 +1355,7 @@ def download_step_input(project_id: str, step_id: str):
 @router.get("/{step_id}/input")
 def get_step_input(project_id: str, step_id: str) -> dict:
     """Get a step input (original entries as JSON)."""
+    require_step_idle(project_id, step_id)
     step_dir = get_step_dir(project_id, step_id)
     input_file = step_dir / "input.json"
 
@@ -898,6 +1386,54 @@ def get_step_changes(project_id: str, step_id: str) -> list[dict]:
     return changes
 
 
+@router.get("/{step_id}/metrics")
+def get_step_metrics(project_id: str, step_id: str) -> dict:
+    """Get request telemetry of the last AI screening run (from metrics.json)."""
+    step_dir = get_step_dir(project_id, step_id)
+    metrics_file = step_dir / METRICS_FILENAME
+
+    if not metrics_file.exists():
+        raise HTTPException(status_code=404, detail="Metrics not found")
+
+    with open(metrics_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@router.get("/{step_id}/audit")
+def get_step_audit(project_id: str, step_id: str) -> dict:
+    """
+    Estimate the recall of a query-filter step from the first downstream
+    ai-screening step that screened its output (including the audit sample).
+    """
+    from .pipeline import load_pipeline
+
+    pipeline = load_pipeline(project_id)
+    step_def = next((s for s in pipeline.steps if s.id == step_id), None)
+    if step_def is None:
+        raise HTTPException(status_code=404, detail=f"Step not found: {step_id}")
+    if step_def.type != "query-filter":
+        raise HTTPException(status_code=400, detail="Audit is only supported for query-filter")
+
+    # Steps fed (directly or indirectly) by this step, in pipeline order.
+    downstream = {step_id}
+    screening_step = None
+    for s in pipeline.steps:
+        source = s.input_from.get("step") if isinstance(s.input_from, dict) else s.input_from
+        if source not in downstream:
+            continue
+        downstream.add(s.id)
+        if s.type == "ai-screening" and (get_step_dir(project_id, s.id) / "changes.jsonl").exists():
+            screening_step = s
+            break
+
+    filter_changes = load_changes_file(get_step_dir(project_id, step_id))
+    screening_changes = load_changes_file(get_step_dir(project_id, screening_step.id)) if screening_step else []
+    return {
+        "screening_step": screening_step.id if screening_step else None,
+        **estimate_recall(filter_changes, screening_changes),
+    }
+
+
 @router.get("/{step_id}/changes/ai")
 def get_step_ai_changes(project_id: str, step_id: str) -> list[dict]:
     """Get AI step changes (from changes_ai.jsonl)."""
@@ -918,9 +1454,23 @@ def get_step_clusters(project_id: str, step_id: str) -> dict:
         return json.load(f)
 
 
+@router.get("/{step_id}/details")
+def get_step_details(project_id: str, step_id: str) -> dict:
+    """Get handler run details (from details.json)."""
+    step_dir = get_step_dir(project_id, step_id)
+    details_file = step_dir / "details.json"
+
+    if not details_file.exists():
+        return {}
+
+    with open(details_file, encoding="utf-8") as f:
+        return json.load(f)
+
+
 @router.post("/{step_id}/clusters")
 def update_step_clusters(project_id: str, step_id: str, payload: dict) -> dict:
     """Update step clusters and regenerate outputs/changes from manual decisions."""
+    require_step_idle(project_id, step_id)
     meta = load_step_meta(project_id, step_id)
     if meta is None:
         raise HTTPException(status_code=404, detail="Step meta not found")
@@ -1067,6 +1617,7 @@ def get_step_review(project_id: str, step_id: str) -> dict:
 
 @router.post("/{step_id}/review")
 def update_step_review(project_id: str, step_id: str, payload: dict) -> dict:
+    require_step_idle(project_id, step_id)
     meta = load_step_meta(project_id, step_id)
     if meta is None:
         raise HTTPException(status_code=404, detail="Step meta not found")
@@ -1166,6 +1717,7 @@ def update_step_review(project_id: str, step_id: str, payload: dict) -> dict:
 
 @router.post("/{step_id}/output-mode")
 def apply_output_mode(project_id: str, step_id: str, payload: dict) -> dict:
+    require_step_idle(project_id, step_id)
     meta = load_step_meta(project_id, step_id)
     if meta is None:
         raise HTTPException(status_code=404, detail="Step meta not found")
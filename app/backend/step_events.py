@@ -0,0 +1,85 @@
+"""
+In-memory event bus for step execution updates.
+
+Job threads publish the step's execution state (status, progress, error) on
+every progress report; the SSE endpoint forwards it to subscribed clients.
+The last event per step is kept so a new subscriber gets the current state
+right away. Progress therefore no longer has to go through meta.json, which
+is only rewritten at a throttled interval while a step runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from dataclasses import dataclass
+
+# Minimum seconds between meta.json progress writes while a step runs.
+DEFAULT_META_WRITE_INTERVAL_SEC = 2.0
+# Seconds between keep-alive comments on idle SSE streams.
+SSE_KEEPALIVE_SEC = 15.0
+
+
+def get_meta_write_interval() -> float:
+    raw = os.getenv("STEP_META_WRITE_INTERVAL_SEC", "").strip()
+    try:
+        value = float(raw) if raw else DEFAULT_META_WRITE_INTERVAL_SEC
+    except ValueError:
+        value = DEFAULT_META_WRITE_INTERVAL_SEC
+    return max(value, 0.0)
+
+
+@dataclass
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+
+
+class StepEventBus:
+    """Fan-out of step events from worker threads to asyncio subscribers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[tuple[str, str], list[_Subscriber]] = {}
+        self._last_events: dict[tuple[str, str], dict] = {}
+
+    def publish(self, project_id: str, step_id: str, event: dict) -> None:
+        key = (project_id, step_id)
+        with self._lock:
+            self._last_events[key] = event
+            subscribers = list(self._subscribers.get(key, []))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.queue.put_nowait, event)
+            except RuntimeError:
+                # Event loop already closed; the subscriber is going away.
+                pass
+
+    def last_event(self, project_id: str, step_id: str) -> dict | None:
+        with self._lock:
+            return self._last_events.get((project_id, step_id))
+
+    def subscribe(self, project_id: str, step_id: str) -> _Subscriber:
+        """Register a subscriber; must be called from the consuming event loop."""
+        subscriber = _Subscriber(loop=asyncio.get_running_loop(), queue=asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault((project_id, step_id), []).append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, project_id: str, step_id: str, subscriber: _Subscriber) -> None:
+        key = (project_id, step_id)
+        with self._lock:
+            subscribers = self._subscribers.get(key, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+            if not subscribers:
+                self._subscribers.pop(key, None)
+
+    def forget(self, project_id: str, step_id: str) -> None:
+        """Drop the cached last event (e.g. after a step is reset or deleted)."""
+        with self._lock:
+            self._last_events.pop((project_id, step_id), None)
+
+
+step_event_bus = StepEventBus()
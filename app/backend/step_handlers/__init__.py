@@ -5,7 +5,7 @@ Each step type registers itself here. The registry is used by the API
 to list available step types and execute steps.
 """
 
-from .base import StepHandler, StepResult, OutputDefinition, StepTypeInfo
+from .base import StepHandler, StreamingStepHandler, StepSink, StepResult, OutputDefinition, StepTypeInfo
 
 # Registry of step handlers
 STEP_HANDLERS: dict[str, type[StepHandler]] = {}
@@ -46,4 +46,6 @@ from . import ai_screening
 from . import dedup_title
 from . import dedup_author
 from . import pdf_fetch
+from . import query_filter
+from . import embedding_rank
 # from . import normalize
@@ -8,15 +8,24 @@ import asyncio
 import json
 import logging
 import os
+import sqlite3
 import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Iterable
 
-logger = logging.getLogger(__name__)
-
-from openai import AsyncOpenAI
-
-from .base import StepHandler, StepResult, OutputDefinition, Change, ProgressCallback
+from llm_clients import llm_client_pool, parse_base_urls
+from .base import StreamingStepHandler, StepSink, OutputDefinition, Change, ProgressCallback
 from . import register_step_type
+from .llm_cache import LLMResponseCache, content_hash, screening_cache_key
+from .llm_concurrency import DEFAULT_MAX_RETRIES, ConcurrencyLimiter, RetryPolicy, classify_error
+from .llm_endpoints import EndpointBalancer
+from .screening_checkpoint import ScreeningCheckpoint
+from .screening_metrics import METRICS_SAMPLES_FILENAME, ScreeningMetrics
+
+logger = logging.getLogger(__name__)
 
 # Local LLM server settings
 LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://192.168.50.100:8000/v1")
@@ -50,6 +59,11 @@ REASON_CODES = {
     "uns_unclear_output": "Cannot determine output type from abstract",
     "uns_need_fulltext": "Need full text to make decision",
 }
+REASON_CODES_HASH = content_hash(json.dumps(REASON_CODES, sort_keys=True, ensure_ascii=False))
+
+# Bump when the prompt or response parsing changes, so cached responses
+# from the previous prompt are not reused.
+PROMPT_VERSION = 2
 
 
 def get_available_rules() -> list[dict]:
@@ -74,178 +88,704 @@ def load_rules(rules_id: str) -> str:
         return f.read()
 
 
-async def screen_paper(
-    client: AsyncOpenAI,
-    model: str,
-    rules: str,
-    entry: dict,
-    semaphore: asyncio.Semaphore,
-) -> dict:
-    """Screen a single paper using LLM."""
-    entry_key = entry.get("ID", "unknown")
-    title = entry.get("title", "").replace("{", "").replace("}", "")
-    abstract = entry.get("abstract", "")
-    author = entry.get("author", "")
-    year = entry.get("year", "")
-
-    # No abstract -> uncertain
-    if not abstract:
-        return {
-            "key": entry_key,
-            "decision": "uncertain",
-            "confidence": 0.0,
-            "reason_codes": [{
-                "code": "uns_need_fulltext",
-                "evidence": "No abstract",
-                "explanation": "アブストラクトが無く、判断根拠が確認できないため。",
-            }],
-            "reason": "アブストラクトが存在しないため判定不可。フルテキストの確認が必要。",
-            "tokens_used": 0,
-            "latency_ms": 0,
-        }
-
-    # Build reason codes description for prompt
-    reason_codes_desc = "\n".join(
-        f"- {code}: {desc}" for code, desc in REASON_CODES.items()
-    )
+DECISIONS = ("include", "exclude", "uncertain")
 
-    prompt = f"""あなたは学術論文のスクリーニングを行うアシスタントです。
-以下のスクリーニング基準に基づいて、論文を判定してください。
+REASON_CODES_DESC = "\n".join(
+    f"- {code}: {desc}" for code, desc in REASON_CODES.items()
+)
 
-## スクリーニング基準
-{rules}
-
-## 使用可能な理由コード
-{reason_codes_desc}
-
-## 論文情報
-タイトル: {title}
-著者: {author}
-年: {year}
-アブストラクト: {abstract}
-
-## 出力形式
-以下のJSON形式で出力してください。他の文字は含めないでください。
-
-{{
+RESULT_FORMAT = """{
     "decision": "include" または "exclude" または "uncertain",
     "confidence": 0.0〜1.0の数値（include/excludeは0.7以上、uncertainは0.3-0.69）,
     "reason_codes": [
-        {{
+        {
             "code": "上記の理由コードから選択",
             "evidence": "アブストラクトから該当箇所を短く引用（英語のまま、20語以内）",
             "explanation": "その引用がこの理由コードに該当すると判断した理由（日本語で1文）"
-        }}
+        }
     ],
     "reason": "判定理由の詳細説明（日本語で2-3文）"
-}}
+}"""
 
-注意:
+RESULT_NOTES = """注意:
 - reason_codesは該当するものを全て列挙（1-3個程度）
 - evidenceはアブストラクトの原文から引用
 - explanationでevidenceと理由コードの対応を説明
 - decisionがincludeならin_*コード、excludeならex_*コード、uncertainならuns_*コードを使用
 """
 
-    start_time = time.time()
 
-    async with semaphore:
-        try:
-            response = await client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-            )
+def paper_fields(entry: dict) -> dict:
+    """Paper fields sent to the model."""
+    return {
+        "title": entry.get("title", "").replace("{", "").replace("}", ""),
+        "author": entry.get("author", ""),
+        "year": entry.get("year", ""),
+        "abstract": entry.get("abstract", ""),
+    }
 
-            latency_ms = int((time.time() - start_time) * 1000)
-            tokens_used = response.usage.total_tokens if response.usage else 0
 
-            # Validate response structure
-            if not response.choices:
-                raise ValueError("Empty choices in response")
-            content = response.choices[0].message.content
-            if not content:
-                raise ValueError("Empty content in response")
+@lru_cache(maxsize=16)
+def build_system_prompt(rules: str) -> str:
+    """
+    Fixed part of the screening prompt (instructions, rules, reason codes and
+    output format), sent as the system message.
 
-            # Parse JSON response
-            try:
-                result = json.loads(content)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON response: {e}")
+    It is identical for every paper screened with the same rules, so servers
+    with prefix caching (vLLM automatic prefix caching, OpenAI prompt caching)
+    reuse it across requests; only the paper message differs.
+    """
+    return f"""あなたは学術論文のスクリーニングを行うアシスタントです。
+以下のスクリーニング基準に基づいて、ユーザーが示す論文を判定してください。
 
-            return {
-                "key": entry_key,
-                "decision": result.get("decision", "uncertain"),
-                "confidence": result.get("confidence", 0.5),
-                "reason_codes": result.get("reason_codes", []),
-                "reason": result.get("reason", ""),
-                "tokens_used": tokens_used,
-                "latency_ms": latency_ms,
-            }
+## スクリーニング基準
+{rules}
+
+## 使用可能な理由コード
+{REASON_CODES_DESC}
+
+## 出力形式
+論文1件につき、以下のJSON形式で判定を出力してください。他の文字は含めないでください。
+
+{RESULT_FORMAT}
+
+{RESULT_NOTES}"""
+
+
+def build_paper_message(paper: dict) -> str:
+    """Per-paper part of the screening prompt (user message)."""
+    return f"""## 論文情報
+タイトル: {paper["title"]}
+著者: {paper["author"]}
+年: {paper["year"]}
+アブストラクト: {paper["abstract"]}"""
+
+
+def build_batch_message(papers: list[dict]) -> str:
+    """User message for screening several papers; each result carries the paper number."""
+    paper_blocks = "\n\n".join(
+        f"""### 論文 {number}
+タイトル: {paper["title"]}
+著者: {paper["author"]}
+年: {paper["year"]}
+アブストラクト: {paper["abstract"]}"""
+        for number, paper in enumerate(papers, start=1)
+    )
+    return f"""## 論文情報
+以下の{len(papers)}件の論文をそれぞれ独立に判定してください。
+
+{paper_blocks}
 
-        except Exception as e:
-            latency_ms = int((time.time() - start_time) * 1000)
+## 出力形式（複数論文）
+各論文の判定に論文番号を "paper" として加え、以下のJSON形式でまとめて出力してください。
+resultsには全ての論文について1件ずつ、論文番号の順に判定を入れてください。
+
+{{"results": [{{"paper": 1, "decision": ..., "confidence": ..., "reason_codes": [...], "reason": ...}}, ...]}}"""
+
+
+def screening_messages(rules: str, user_message: str) -> list[dict]:
+    return [
+        {"role": "system", "content": build_system_prompt(rules)},
+        {"role": "user", "content": user_message},
+    ]
+
+
+def usage_tokens(response) -> tuple[int, int, int]:
+    """(total, prompt, cached prompt) tokens reported in ``response.usage``."""
+    usage = response.usage
+    if not usage:
+        return 0, 0, 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) or 0
+    return usage.total_tokens or 0, usage.prompt_tokens or 0, cached
+
+
+def split_tokens(tokens: int, count: int) -> list[int]:
+    """Split a request's token count evenly across ``count`` papers."""
+    return [tokens // count + (1 if number < tokens % count else 0) for number in range(count)]
+
+
+def no_abstract_result(entry_key: str) -> dict:
+    return {
+        "key": entry_key,
+        "decision": "uncertain",
+        "confidence": 0.0,
+        "reason_codes": [{
+            "code": "uns_need_fulltext",
+            "evidence": "No abstract",
+            "explanation": "アブストラクトが無く、判断根拠が確認できないため。",
+        }],
+        "reason": "アブストラクトが存在しないため判定不可。フルテキストの確認が必要。",
+        "tokens_used": 0,
+        "latency_ms": 0,
+    }
+
+
+class ScreeningRequestError(Exception):
+    """A screening request that still failed after its retries."""
+
+    def __init__(self, error: Exception, retries: int, usage: tuple[int, int, int]):
+        super().__init__(str(error))
+        self.error = error
+        self.retries = retries
+        self.usage = usage
+
+
+def api_error_result(entry_key: str, error: Exception, latency_ms: int) -> dict:
+    retries = getattr(error, "retries", 0)
+    tokens_used, prompt_tokens, cached_tokens = getattr(error, "usage", (0, 0, 0))
+    return {
+        "key": entry_key,
+        "decision": "uncertain",
+        "confidence": 0.0,
+        "reason_codes": [{
+            "code": "uns_need_fulltext",
+            "evidence": "API error",
+            "explanation": "APIエラーにより内容確認ができず判断不能のため。",
+        }],
+        "reason": f"APIエラーにより判定不可: {str(error)}",
+        "tokens_used": tokens_used,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "latency_ms": latency_ms,
+        "api_error": True,
+        "retries": retries,
+    }
+
+
+def paper_cache_key(model: str, rules: str, paper: dict) -> str:
+    return screening_cache_key(model, content_hash(rules), REASON_CODES_HASH, PROMPT_VERSION, paper)
+
+
+def stored_result(
+    cache: LLMResponseCache | None,
+    checkpoint: ScreeningCheckpoint | None,
+    cache_key: str | None,
+    entry_key: str,
+) -> dict | None:
+    """Decision from the run checkpoint or the response cache, if any."""
+    if cache_key is None:
+        return None
+    if checkpoint is not None:
+        saved = checkpoint.get(cache_key)
+        if saved is not None:
+            # Tokens were spent by the interrupted run, not this one.
             return {
+                **saved,
                 "key": entry_key,
-                "decision": "uncertain",
-                "confidence": 0.0,
-                "reason_codes": [{
-                    "code": "uns_need_fulltext",
-                    "evidence": "API error",
-                    "explanation": "APIエラーにより内容確認ができず判断不能のため。",
-                }],
-                "reason": f"APIエラーにより判定不可: {str(e)}",
                 "tokens_used": 0,
-                "latency_ms": latency_ms,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "latency_ms": 0,
+                "checkpoint": True,
             }
+    if cache is None:
+        return None
+    cached = cache.get(cache_key)
+    if cached is None:
+        return None
+    return {
+        "key": entry_key,
+        "decision": cached.get("decision", "uncertain"),
+        "confidence": cached.get("confidence", 0.5),
+        "reason_codes": cached.get("reason_codes", []),
+        "reason": cached.get("reason", ""),
+        "tokens_used": 0,
+        "latency_ms": 0,
+        "cache": "hit",
+    }
 
 
-async def screen_papers_async(
+def kept_change_details(step_dir: Path) -> list[dict]:
+    """Change details already in changes.jsonl (cut back to the resume point)."""
+    path = step_dir / "changes.jsonl"
+    if not path.exists():
+        return []
+    details = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                change = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(change, dict) and isinstance(change.get("details"), dict):
+                details.append(change["details"])
+    return details
+
+
+async def run_io(io_executor: Executor | None, func: Callable, *args):
+    """
+    Run blocking file/SQLite I/O on ``io_executor`` (the loop's default
+    executor if None) so it does not stall the shared LLM loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(io_executor, func, *args)
+
+
+def store_result(
+    cache: LLMResponseCache | None,
+    checkpoint: ScreeningCheckpoint | None,
+    cache_key: str | None,
+    screened: dict,
+) -> None:
+    if cache_key is None:
+        return
+    if cache is not None:
+        cache.put(cache_key, {
+            name: screened[name] for name in ("decision", "confidence", "reason_codes", "reason")
+        })
+        screened["cache"] = "miss"
+    if checkpoint is not None:
+        checkpoint.add(cache_key, screened["key"], screened)
+
+
+def response_content(response) -> str:
+    if not response.choices:
+        raise ValueError("Empty choices in response")
+    content = response.choices[0].message.content
+    if not content:
+        raise ValueError("Empty content in response")
+    return content
+
+
+async def request_screening(
+    endpoints: EndpointBalancer,
+    model: str,
+    messages: list[dict],
+    limiter: ConcurrencyLimiter,
+    retry: RetryPolicy,
+    metrics: ScreeningMetrics | None = None,
+) -> tuple[dict, tuple[int, int, int], int]:
+    """
+    Send a screening request to one of ``endpoints`` and parse its JSON object.
+
+    Overload errors (429, 5xx, timeouts) and invalid responses are retried
+    with jittered exponential backoff; the concurrency slot is released
+    while waiting. Every attempt is recorded in ``metrics``. Returns (parsed
+    JSON, (total, prompt, cached) tokens over all attempts, retries). Raises
+    ScreeningRequestError once retries are used up or the error is not
+    retryable.
+    """
+    attempt = 0
+    usage = (0, 0, 0)
+    while True:
+        response = None
+        error = None
+        wait_start = time.monotonic()
+        async with limiter:
+            endpoint = endpoints.acquire()
+            request_start = time.monotonic()
+            try:
+                response = await endpoint.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                )
+            except Exception as e:
+                endpoints.release(endpoint, e)
+                limiter.record_failure(e)
+                error = e
+            else:
+                endpoints.release(endpoint)
+                limiter.record_success(time.monotonic() - request_start)
+        request_end = time.monotonic()
+
+        attempt_usage = (0, 0, 0)
+        result = None
+        if response is not None:
+            attempt_usage = usage_tokens(response)
+            usage = tuple(total + part for total, part in zip(usage, attempt_usage))
+            try:
+                content = response_content(response)
+                try:
+                    result = json.loads(content)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON response: {e}")
+                if not isinstance(result, dict):
+                    raise ValueError("JSON response is not an object")
+            except ValueError as e:
+                error = e
+        if metrics is not None:
+            metrics.record(
+                wait_start,
+                request_start - wait_start,
+                request_end - request_start,
+                attempt_usage,
+                classify_error(error) if error is not None else None,
+            )
+        if error is None:
+            return result, usage, attempt
+
+        if classify_error(error) == "fatal" or attempt >= retry.max_retries:
+            raise ScreeningRequestError(error, attempt, usage)
+        await asyncio.sleep(retry.delay(attempt, error))
+        attempt += 1
+
+
+async def screen_paper(
+    endpoints: EndpointBalancer,
+    model: str,
+    rules: str,
+    entry: dict,
+    limiter: ConcurrencyLimiter,
+    cache: LLMResponseCache | None = None,
+    checkpoint: ScreeningCheckpoint | None = None,
+    retry: RetryPolicy | None = None,
+    metrics: ScreeningMetrics | None = None,
+    io_executor: Executor | None = None,
+) -> dict:
+    """
+    Screen a single paper using LLM.
+
+    A decision stored in ``checkpoint`` (earlier attempt of this run) or
+    ``cache`` for the same model, rules and paper is returned without
+    calling the model (tokens_used and latency_ms are 0). Failed requests
+    are retried per ``retry``; if they still fail the paper is marked
+    uncertain with ``api_error`` set and nothing is stored.
+    """
+    entry_key = entry.get("ID", "unknown")
+    paper = paper_fields(entry)
+    retry = retry or RetryPolicy()
+
+    # No abstract -> uncertain
+    if not paper["abstract"]:
+        return no_abstract_result(entry_key)
+
+    cache_key = paper_cache_key(model, rules, paper) if cache is not None or checkpoint is not None else None
+    hit = await run_io(io_executor, stored_result, cache, checkpoint, cache_key, entry_key)
+    if hit is not None:
+        return hit
+
+    messages = screening_messages(rules, build_paper_message(paper))
+
+    start_time = time.time()
+    try:
+        result, usage, retries = await request_screening(endpoints, model, messages, limiter, retry, metrics)
+    except ScreeningRequestError as e:
+        return api_error_result(entry_key, e, int((time.time() - start_time) * 1000))
+    latency_ms = int((time.time() - start_time) * 1000)
+    tokens_used, prompt_tokens, cached_tokens = usage
+
+    screened = {
+        "key": entry_key,
+        "decision": result.get("decision", "uncertain"),
+        "confidence": result.get("confidence", 0.5),
+        "reason_codes": result.get("reason_codes", []),
+        "reason": result.get("reason", ""),
+        "tokens_used": tokens_used,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "latency_ms": latency_ms,
+        "retries": retries,
+    }
+    await run_io(io_executor, store_result, cache, checkpoint, cache_key, screened)
+    return screened
+
+
+def parse_batch_results(payload: dict, count: int) -> dict[int, dict]:
+    """
+    Parse a batched response into {paper index: result}. Items that are
+    missing, duplicated or malformed are left out (screened singly instead).
+    """
+    items = payload.get("results")
+    if not isinstance(items, list):
+        return {}
+
+    parsed: dict[int, dict] = {}
+    duplicates: set[int] = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("paper")) - 1
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= index < count:
+            continue
+        if item.get("decision") not in DECISIONS or not isinstance(item.get("reason_codes", []), list):
+            continue
+        if index in parsed:
+            duplicates.add(index)
+        parsed[index] = item
+    for index in duplicates:
+        parsed.pop(index, None)
+    return parsed
+
+
+async def screen_paper_batch(
+    endpoints: EndpointBalancer,
+    model: str,
+    rules: str,
     entries: list[dict],
+    limiter: ConcurrencyLimiter,
+    cache: LLMResponseCache | None = None,
+    checkpoint: ScreeningCheckpoint | None = None,
+    retry: RetryPolicy | None = None,
+    metrics: ScreeningMetrics | None = None,
+    io_executor: Executor | None = None,
+) -> list[dict]:
+    """
+    Screen several papers with one request; results are in input order.
+
+    Papers without abstract and stored papers are resolved without the
+    model. Papers whose batched result is missing or invalid are screened
+    again one by one; if the request itself keeps failing with overload
+    errors, all its papers are marked as API errors. The request's tokens
+    are split evenly across its papers (tokens_used per paper).
+    """
+    retry = retry or RetryPolicy()
+    results: list[dict | None] = [None] * len(entries)
+    pending: list[tuple[int, dict, str | None]] = []
+    use_key = cache is not None or checkpoint is not None
+    for position, entry in enumerate(entries):
+        entry_key = entry.get("ID", "unknown")
+        paper = paper_fields(entry)
+        if not paper["abstract"]:
+            results[position] = no_abstract_result(entry_key)
+            continue
+        cache_key = paper_cache_key(model, rules, paper) if use_key else None
+        hit = await run_io(io_executor, stored_result, cache, checkpoint, cache_key, entry_key)
+        if hit is not None:
+            results[position] = hit
+            continue
+        pending.append((position, paper, cache_key))
+
+    if len(pending) == 1:
+        position = pending[0][0]
+        results[position] = await screen_paper(
+            endpoints, model, rules, entries[position], limiter,
+            cache=cache,
+            checkpoint=checkpoint,
+            retry=retry,
+            metrics=metrics,
+            io_executor=io_executor,
+        )
+        pending = []
+
+    if pending:
+        messages = screening_messages(rules, build_batch_message([paper for _, paper, _ in pending]))
+        start_time = time.time()
+        parsed: dict[int, dict] = {}
+        retries = 0
+        request_error = None
+        try:
+            payload, usage, retries = await request_screening(endpoints, model, messages, limiter, retry, metrics)
+            parsed = parse_batch_results(payload, len(pending))
+        except ScreeningRequestError as e:
+            usage = e.usage
+            request_error = e
+        latency_ms = int((time.time() - start_time) * 1000)
+
+        # Every paper in the request carries an equal share of its tokens,
+        # including papers that have to be retried singly.
+        shares = {
+            name: split_tokens(tokens, len(pending))
+            for name, tokens in zip(("tokens_used", "prompt_tokens", "cached_tokens"), usage)
+        }
+        if request_error is not None:
+            if classify_error(request_error.error) == "overload":
+                # Screening the papers singly would only add load.
+                for number, (position, _, _) in enumerate(pending):
+                    screened = api_error_result(entries[position].get("ID", "unknown"), request_error, latency_ms)
+                    for name, values in shares.items():
+                        screened[name] = values[number]
+                    results[position] = screened
+                return results
+            logger.warning("Batched screening request failed, retrying papers singly: %s", request_error)
+
+        for number, (position, _, cache_key) in enumerate(pending):
+            item = parsed.get(number)
+            if item is None:
+                continue
+            screened = {
+                "key": entries[position].get("ID", "unknown"),
+                "decision": item["decision"],
+                "confidence": item.get("confidence", 0.5),
+                "reason_codes": item.get("reason_codes", []),
+                "reason": item.get("reason", ""),
+                "tokens_used": shares["tokens_used"][number],
+                "prompt_tokens": shares["prompt_tokens"][number],
+                "cached_tokens": shares["cached_tokens"][number],
+                "latency_ms": latency_ms,
+                "batch_size": len(pending),
+                "retries": retries,
+            }
+            await run_io(io_executor, store_result, cache, checkpoint, cache_key, screened)
+            results[position] = screened
+
+        fallback = [(number, position) for number, (position, _, _) in enumerate(pending) if results[position] is None]
+        if fallback:
+            singles = await asyncio.gather(*(
+                screen_paper(
+                    endpoints, model, rules, entries[position], limiter,
+                    cache=cache,
+                    checkpoint=checkpoint,
+                    retry=retry,
+                    metrics=metrics,
+                    io_executor=io_executor,
+                )
+                for _, position in fallback
+            ))
+            for (number, position), screened in zip(fallback, singles):
+                for name, values in shares.items():
+                    screened[name] = screened.get(name, 0) + values[number]
+                screened["batch_fallback"] = True
+                results[position] = screened
+
+    return results
+
+
+def create_screening_endpoints(provider: str, local_base_url: str | list[str] | None = None) -> EndpointBalancer:
+    """
+    Endpoints for a run, with clients from the shared pool (reused across
+    runs when called on the pool's loop). ``local_base_url`` may list several
+    local servers. Retries are handled by request_screening (classified,
+    with backoff and feedback to the concurrency limiter), not by the client.
+    """
+    if provider == "local":
+        urls = parse_base_urls(local_base_url) or [LOCAL_LLM_BASE_URL]
+        return EndpointBalancer([
+            (url, llm_client_pool.get_client(url, "dummy", max_retries=0)) for url in urls
+        ])
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not set")
+    return EndpointBalancer([(None, llm_client_pool.get_client(None, api_key, max_retries=0))])
+
+
+async def screen_papers_stream(
+    entries: Iterable[dict],
+    total: int,
     rules: str,
     model: str,
     provider: str,
     concurrency: int,
+    on_result: Callable[[dict, dict], None],
     local_base_url: str | None = None,
     progress_callback: ProgressCallback | None = None,
-) -> list[dict]:
-    """Screen multiple papers in parallel."""
-    # Setup client
-    if provider == "local":
-        base_url = local_base_url or LOCAL_LLM_BASE_URL
-        client = AsyncOpenAI(
-            base_url=base_url,
-            api_key="dummy",
-        )
-    else:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not set")
-        client = AsyncOpenAI(api_key=api_key)
-
-    semaphore = asyncio.Semaphore(concurrency)
-    results = []
-    completed = 0
+    cache: LLMResponseCache | None = None,
+    batch_size: int = 1,
+    limiter: ConcurrencyLimiter | None = None,
+    checkpoint: ScreeningCheckpoint | None = None,
+    retry: RetryPolicy | None = None,
+    endpoints: EndpointBalancer | None = None,
+    metrics: ScreeningMetrics | None = None,
+) -> None:
+    """
+    Screen papers from an iterator, calling ``on_result(entry, result)`` in
+    input order as results become available.
+
+    With ``batch_size`` > 1 consecutive papers are sent together in one
+    request (see screen_paper_batch). Requests in flight are bounded by
+    ``limiter`` (a fixed limit of ``concurrency`` if not given); at most
+    ``2 * concurrency`` requests are scheduled, so memory does not grow with
+    the input size.
 
-    if progress_callback:
-        progress_callback(0, len(entries), "AI screening")
+    Reading ``entries``, ``on_result``, ``progress_callback`` and cache /
+    checkpoint lookups run on an I/O thread of this run, so their disk
+    writes do not stall other runs sharing the LLM loop. The thread is
+    drained before returning, so nothing is written after that.
+    """
+    if endpoints is None:
+        endpoints = create_screening_endpoints(provider, local_base_url)
+    if len(endpoints) > 1:
+        await endpoints.check_health()
+    if limiter is None:
+        limiter = ConcurrencyLimiter(concurrency, adaptive=False)
+    batch_size = max(int(batch_size), 1)
+    completed = 0
+    # One thread keeps sink writes and progress reports in order.
+    io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-screening-io")
 
-    async def process_entry(entry: dict) -> dict:
+    async def process_chunk(chunk: list[dict]) -> list[dict]:
         nonlocal completed
-        result = await screen_paper(client, model, rules, entry, semaphore)
-        completed += 1
+        if len(chunk) == 1:
+            results = [await screen_paper(
+                endpoints, model, rules, chunk[0], limiter,
+                cache=cache,
+                checkpoint=checkpoint,
+                retry=retry,
+                metrics=metrics,
+                io_executor=io_executor,
+            )]
+        else:
+            results = await screen_paper_batch(
+                endpoints, model, rules, chunk, limiter,
+                cache=cache,
+                checkpoint=checkpoint,
+                retry=retry,
+                metrics=metrics,
+                io_executor=io_executor,
+            )
+        completed += len(chunk)
+        if progress_callback:
+            await run_io(io_executor, progress_callback, completed, total, "AI screening")
+        return results
+
+    window = max(int(concurrency), 1) * 2
+    pending: deque[tuple[list[dict], asyncio.Task]] = deque()
+
+    def emit_results(chunk: list[dict], results: list[dict]) -> None:
+        for entry, result in zip(chunk, results):
+            on_result(entry, result)
+
+    async def emit_head() -> None:
+        head_chunk, head_task = pending.popleft()
+        await run_io(io_executor, emit_results, head_chunk, await head_task)
+
+    def submit(chunk: list[dict]) -> None:
+        pending.append((chunk, asyncio.create_task(process_chunk(chunk))))
+
+    entries = iter(entries)
+    try:
         if progress_callback:
-            progress_callback(completed, len(entries), "AI screening")
-        return result
+            await run_io(io_executor, progress_callback, 0, total, "AI screening")
+        chunk: list[dict] = []
+        while (entry := await run_io(io_executor, next, entries, None)) is not None:
+            chunk.append(entry)
+            if len(chunk) < batch_size:
+                continue
+            submit(chunk)
+            chunk = []
+            while len(pending) >= window:
+                await emit_head()
+        if chunk:
+            submit(chunk)
+        while pending:
+            await emit_head()
+    finally:
+        for _, task in pending:
+            task.cancel()
+        # Wait off the loop for I/O already handed to the thread.
+        await asyncio.get_running_loop().run_in_executor(None, io_executor.shutdown)
 
-    tasks = [process_entry(entry) for entry in entries]
-    results = await asyncio.gather(*tasks)
 
+async def screen_papers_async(
+    entries: list[dict],
+    rules: str,
+    model: str,
+    provider: str,
+    concurrency: int,
+    local_base_url: str | None = None,
+    progress_callback: ProgressCallback | None = None,
+) -> list[dict]:
+    """Screen multiple papers in parallel."""
+    results: list[dict] = []
+    await screen_papers_stream(
+        entries=entries,
+        total=len(entries),
+        rules=rules,
+        model=model,
+        provider=provider,
+        concurrency=concurrency,
+        on_result=lambda _entry, result: results.append(result),
+        local_base_url=local_base_url,
+        progress_callback=progress_callback,
+    )
     return results
 
 
 @register_step_type
-class AIScreeningHandler(StepHandler):
+class AIScreeningHandler(StreamingStepHandler):
     """Screen papers using AI/LLM."""
 
     step_type = "ai-screening"
@@ -317,7 +857,26 @@ class AIScreeningHandler(StepHandler):
                     "minimum": 1,
                     "maximum": 1000,
                     "default": LOCAL_CONCURRENCY,
-                    "description": "Number of parallel API requests",
+                    "description": "Number of parallel API requests (upper limit in adaptive mode)",
+                },
+                "concurrency_mode": {
+                    "type": "string",
+                    "enum": ["adaptive", "fixed"],
+                    "default": "adaptive",
+                    "description": "adaptive: grow/shrink parallel requests from latency and 429/5xx errors; fixed: always use concurrency",
+                },
+                "min_concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 1000,
+                    "default": 1,
+                    "description": "Lower limit of parallel requests in adaptive mode",
+                },
+                "latency_target_ms": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "default": 0,
+                    "description": "Adaptive mode: reduce parallel requests when latency exceeds this (0 = twice the lowest observed latency)",
                 },
                 "output_mode": {
                     "type": "string",
@@ -328,7 +887,26 @@ class AIScreeningHandler(StepHandler):
                 "local_base_url": {
                     "type": "string",
                     "default": LOCAL_LLM_BASE_URL,
-                    "description": "Base URL for local LLM server (used when provider=local)",
+                    "description": "Base URL for local LLM server (used when provider=local); separate several servers with commas to balance requests across them",
+                },
+                "batch_size": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 50,
+                    "default": 1,
+                    "description": "Papers sent together in one request (invalid batch results are retried one by one)",
+                },
+                "max_retries": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "maximum": 20,
+                    "default": DEFAULT_MAX_RETRIES,
+                    "description": "Retries for 429/5xx, timeouts and invalid responses (jittered exponential backoff)",
+                },
+                "use_cache": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Reuse stored decisions for papers already screened with the same model and rules",
                 },
             },
             "x-provider-defaults": provider_defaults,
@@ -336,13 +914,15 @@ class AIScreeningHandler(StepHandler):
             "required": ["rules"],
         }
 
-    def run(
+    def run_stream(
         self,
-        input_entries: list[dict],
+        input_entries: Iterable[dict],
+        total_entries: int,
         config: dict,
+        sink: StepSink,
         progress_callback: ProgressCallback | None = None,
-    ) -> StepResult:
-        """Run AI screening on input entries."""
+    ) -> dict:
+        """Run AI screening, emitting each decision as soon as it is in order."""
         rules_id = config.get("rules", "decompile_v4")
         provider = config.get("provider", "local")
         local_base_url = config.get("local_base_url")
@@ -362,75 +942,87 @@ class AIScreeningHandler(StepHandler):
         else:
             concurrency = config.get("concurrency", OPENAI_CONCURRENCY)
 
+        batch_size = max(int(config.get("batch_size", 1) or 1), 1)
+        limiter = ConcurrencyLimiter(
+            concurrency,
+            min_limit=config.get("min_concurrency", 1),
+            adaptive=config.get("concurrency_mode", "adaptive") == "adaptive",
+            latency_target_ms=config.get("latency_target_ms") or None,
+        )
+
         # Load rules
         rules = load_rules(rules_id)
 
-        # Run async screening
-        # Handle case where event loop may already be running (e.g., in FastAPI)
-        coro = screen_papers_async(
-            entries=input_entries,
-            rules=rules,
-            model=model,
-            provider=provider,
-            concurrency=concurrency,
-            local_base_url=local_base_url if provider == "local" else None,
-            progress_callback=progress_callback,
-        )
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop and loop.is_running():
-            # Already in async context - create new loop in thread
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, coro)
-                results = future.result()
-        else:
-            results = asyncio.run(coro)
-
-        # Categorize results
-        passed = []
-        excluded = []
-        uncertain = []
-        changes = []
-
-        # Create lookup for entries
-        entry_map = {e.get("ID", ""): e for e in input_entries}
-
-        total_tokens = 0
-        total_latency = 0
-        skipped_keys = []
-
-        for result in results:
-            key = result["key"]
-            entry = entry_map.get(key)
-            if not entry:
-                skipped_keys.append(key)
-                continue
+        retry = RetryPolicy(max_retries=max(int(config.get("max_retries", DEFAULT_MAX_RETRIES)), 0))
+        checkpoint = None
+        if config.get("_step_dir"):
+            checkpoint = ScreeningCheckpoint.for_step_dir(config["_step_dir"])
 
+        cache = None
+        if config.get("use_cache", True):
+            try:
+                cache = LLMResponseCache()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("LLM response cache unavailable: %s", e)
+
+        counts = {"passed": 0, "excluded": 0, "uncertain": 0}
+        totals = {
+            "input": 0,
+            "tokens": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "latency_ms": 0,
+            "model_papers": 0,
+            "batch_fallbacks": 0,
+            "api_errors": 0,
+            "retries": 0,
+            "restored": 0,
+        }
+        cache_counts = {"hit": 0, "miss": 0}
+
+        def count_result(result: dict) -> str:
+            """Add a result to the run totals; returns its output name."""
             decision = result["decision"]
-            total_tokens += result.get("tokens_used", 0)
-            total_latency += result.get("latency_ms", 0)
+            totals["input"] += 1
+            if result.get("cache") in cache_counts:
+                cache_counts[result["cache"]] += 1
+            totals["tokens"] += result.get("tokens_used", 0)
+            totals["prompt_tokens"] += result.get("prompt_tokens", 0)
+            totals["cached_tokens"] += result.get("cached_tokens", 0)
+            if result.get("tokens_used", 0) or result.get("latency_ms", 0):
+                totals["model_papers"] += 1
+            if result.get("batch_fallback"):
+                totals["batch_fallbacks"] += 1
+            if result.get("api_error"):
+                totals["api_errors"] += 1
+            if result.get("checkpoint"):
+                totals["restored"] += 1
+            totals["retries"] += result.get("retries", 0)
+            totals["latency_ms"] += result.get("latency_ms", 0)
 
             if decision == "include":
-                passed.append(entry)
-                action = "keep"
+                output_name = "passed"
             elif decision == "exclude":
-                excluded.append(entry)
-                action = "remove"
+                output_name = "excluded"
             else:
-                uncertain.append(entry)
-                action = "keep"  # uncertain goes to uncertain output but action is "keep"
+                output_name = "uncertain"
+            counts[output_name] += 1
+            return output_name
+
+        def emit(entry: dict, result: dict) -> None:
+            decision = result["decision"]
+            output_name = count_result(result)
+            # uncertain goes to uncertain output but action is "keep"
+            action = "remove" if decision == "exclude" else "keep"
+            sink.write_entry(output_name, entry)
 
             # Extract first reason code for the reason field
             reason_codes = result.get("reason_codes", [])
             primary_code = reason_codes[0]["code"] if reason_codes else f"ai_{decision}"
 
-            changes.append(
+            sink.write_change(
                 Change(
-                    key=key,
+                    key=result["key"],
                     action=action,
                     reason=primary_code,
                     details={
@@ -440,36 +1032,111 @@ class AIScreeningHandler(StepHandler):
                         "reasoning": result.get("reason", ""),
                         "model": model,
                         "tokens_used": result.get("tokens_used", 0),
+                        "prompt_tokens": result.get("prompt_tokens", 0),
+                        "cached_tokens": result.get("cached_tokens", 0),
                         "latency_ms": result.get("latency_ms", 0),
+                        "cached": result.get("cache") == "hit",
+                        "batch_size": result.get("batch_size", 1),
+                        "batch_fallback": result.get("batch_fallback", False),
+                        "api_error": result.get("api_error", False),
+                        "retries": result.get("retries", 0),
                     },
                 )
             )
+            sink.commit()
+
+        if config.get("_resume") and config.get("_step_dir"):
+            # The kept part of changes.jsonl holds the entries screened before
+            # the interruption; count them so the details cover the whole input.
+            for details in kept_change_details(Path(config["_step_dir"])):
+                cache_state = None
+                if details.get("cached"):
+                    cache_state = "hit"
+                elif cache is not None and details.get("latency_ms") and not details.get("api_error"):
+                    # Answered by the model and stored in the cache.
+                    cache_state = "miss"
+                count_result({**details, "cache": cache_state})
+
+        endpoints: list[EndpointBalancer] = []
+        metrics = ScreeningMetrics()
+        if config.get("_step_dir"):
+            if config.get("_resume"):
+                metrics.restore(config["_step_dir"])
+            else:
+                # Samples of an older run must not be merged into a later resume.
+                (Path(config["_step_dir"]) / METRICS_SAMPLES_FILENAME).unlink(missing_ok=True)
 
-        # Log warning if any results were skipped due to ID mismatch
-        if skipped_keys:
-            logger.warning(
-                f"Skipped {len(skipped_keys)} results due to ID mismatch: {skipped_keys[:5]}"
-                + (f" (and {len(skipped_keys) - 5} more)" if len(skipped_keys) > 5 else "")
+        async def run_screening() -> None:
+            # Clients are looked up on the shared LLM loop, so they and their
+            # connections are reused across runs.
+            endpoints.append(create_screening_endpoints(provider, local_base_url if provider == "local" else None))
+            await screen_papers_stream(
+                entries=input_entries,
+                total=total_entries,
+                rules=rules,
+                model=model,
+                provider=provider,
+                concurrency=concurrency,
+                on_result=emit,
+                progress_callback=progress_callback,
+                cache=cache,
+                batch_size=batch_size,
+                limiter=limiter,
+                checkpoint=checkpoint,
+                retry=retry,
+                endpoints=endpoints[0],
+                metrics=metrics,
             )
 
-        return StepResult(
-            outputs={
-                "passed": passed,
-                "excluded": excluded,
-                "uncertain": uncertain,
-            },
-            changes=changes,
-            details={
-                "total_input": len(input_entries),
-                "passed_count": len(passed),
-                "excluded_count": len(excluded),
-                "uncertain_count": len(uncertain),
-                "skipped_count": len(skipped_keys),
-                "model": model,
-                "provider": provider,
-                "concurrency": concurrency,
-                "total_tokens": total_tokens,
-                "total_latency_ms": total_latency,
-                "rules_id": rules_id,
+        try:
+            llm_client_pool.run(run_screening())
+        finally:
+            if cache is not None:
+                cache.close()
+            if checkpoint is not None:
+                checkpoint.close()
+            # Saved for cancelled and failed runs too, but a run answered
+            # entirely from the cache keeps the previous run's telemetry.
+            metrics_summary = metrics.summary()
+            if config.get("_step_dir") and metrics.new_requests:
+                metrics.save(config["_step_dir"], metrics_summary)
+
+        # Keep the checkpoint while papers still need a rerun.
+        if checkpoint is not None and totals["api_errors"] == 0:
+            checkpoint.remove()
+
+        return {
+            "total_input": totals["input"],
+            "passed_count": counts["passed"],
+            "excluded_count": counts["excluded"],
+            "uncertain_count": counts["uncertain"],
+            "model": model,
+            "provider": provider,
+            "concurrency": concurrency,
+            "concurrency_control": limiter.summary(),
+            "endpoints": endpoints[0].summary() if endpoints else [],
+            # Full telemetry with the timeline is in metrics.json.
+            "metrics": {name: value for name, value in metrics_summary.items() if name != "timeline"},
+            "total_tokens": totals["tokens"],
+            "total_latency_ms": totals["latency_ms"],
+            "prompt_tokens": totals["prompt_tokens"],
+            # Prompt tokens served from the server's prefix cache.
+            "cached_prompt_tokens": totals["cached_tokens"],
+            "prompt_cache_ratio": (
+                round(totals["cached_tokens"] / totals["prompt_tokens"], 3) if totals["prompt_tokens"] else 0
+            ),
+            "batch_size": batch_size,
+            "batch_fallback_count": totals["batch_fallbacks"],
+            # Tokens per paper that was sent to the model (cache hits and
+            # papers without abstract excluded).
+            "tokens_per_paper": round(totals["tokens"] / totals["model_papers"], 1) if totals["model_papers"] else 0,
+            "rules_id": rules_id,
+            "api_error_count": totals["api_errors"],
+            "retry_count": totals["retries"],
+            "restored_from_checkpoint": totals["restored"],
+            "cache": {
+                "enabled": cache is not None,
+                "hits": cache_counts["hit"],
+                "misses": cache_counts["miss"],
             },
-        )
+        }
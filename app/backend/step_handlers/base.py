@@ -6,7 +6,7 @@ Each step type should inherit from StepHandler and implement the run() method.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
 
 @dataclass
@@ -91,3 +91,101 @@ class StepHandler(ABC):
         Returns a list of error messages (empty if valid).
         """
         return []
+
+
+class StepSink:
+    """
+    Receives results from a streaming handler as they are produced.
+
+    Output entries and changes are emitted one at a time; the runner decides
+    where they go (files appended incrementally, or memory for run()).
+    """
+
+    def write_entry(self, output_name: str, entry: dict) -> None:
+        raise NotImplementedError
+
+    def write_change(self, change: Change, filename: str = "changes.jsonl") -> None:
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        """
+        Mark one input entry as fully processed.
+
+        Handlers call this after emitting everything for an entry (in input
+        order); an interrupted run can be resumed after the last commit.
+        """
+
+
+class MemoryStepSink(StepSink):
+    """Collects emitted entries and changes in memory."""
+
+    def __init__(self) -> None:
+        self.outputs: dict[str, list[dict]] = {}
+        self.changes: dict[str, list[Change]] = {}
+
+    def write_entry(self, output_name: str, entry: dict) -> None:
+        self.outputs.setdefault(output_name, []).append(entry)
+
+    def write_change(self, change: Change, filename: str = "changes.jsonl") -> None:
+        self.changes.setdefault(filename, []).append(change)
+
+
+class StreamingStepHandler(StepHandler):
+    """
+    Handler that processes entries one at a time and emits results to a sink.
+
+    The step runner feeds entries as an iterator and appends outputs and
+    changes to disk as they arrive, so memory stays flat and partial results
+    survive a crash. run() is still available and collects everything in
+    memory.
+    """
+
+    # Auxiliary outputs / change files the handler emits besides
+    # output_definitions and changes.jsonl (created even if left empty).
+    extra_outputs: list[str] = []
+    extra_change_files: list[str] = []
+
+    @abstractmethod
+    def run_stream(
+        self,
+        input_entries: Iterable[dict],
+        total_entries: int,
+        config: dict,
+        sink: StepSink,
+        progress_callback: ProgressCallback | None = None,
+    ) -> dict[str, Any]:
+        """
+        Process entries and emit outputs/changes to ``sink``.
+
+        Outputs named in output_definitions are the step outputs; other names
+        (and change files other than changes.jsonl) are auxiliary files.
+        Call ``sink.commit()`` once per input entry, in input order, after
+        its results are emitted so interrupted runs can be resumed.
+
+        Returns:
+            Run details (same role as StepResult.details)
+        """
+        pass
+
+    def run(
+        self,
+        input_entries: list[dict],
+        config: dict,
+        progress_callback: ProgressCallback | None = None,
+    ) -> StepResult:
+        sink = MemoryStepSink()
+        details = self.run_stream(
+            input_entries,
+            len(input_entries),
+            config,
+            sink,
+            progress_callback=progress_callback,
+        )
+        return StepResult(
+            outputs={
+                definition.name: sink.outputs.get(definition.name, [])
+                for definition in self.output_definitions
+            },
+            changes=sink.changes.get("changes.jsonl", []),
+            details=details,
+        )
@@ -6,8 +6,6 @@ Clusters entries by author similarity and keeps a representative entry per clust
 
 from __future__ import annotations
 
-import re
-
 from .base import StepHandler, StepResult, OutputDefinition, Change, ProgressCallback
 from . import register_step_type
 from .dedup_utils import (
@@ -15,34 +13,23 @@ from .dedup_utils import (
     title_similarity,
     pick_representative,
     cluster_by_threshold,
+    blocking_candidate_pairs,
+    jaccard_prefix_pairs,
+    blocking_recall,
+    parse_blocking_mode,
+    parse_max_postings,
+    resolve_worker_count,
+    BLOCKING_MODES,
+    DEFAULT_MAX_POSTINGS,
 )
 
+from .dedup_features import load_entry_features
 
-def normalize_author_token(token: str) -> str:
-    cleaned = re.sub(r"[^a-z0-9]+", "", token.lower())
-    return cleaned
-
-
-def extract_last_names(author_field: str) -> set[str]:
-    if not author_field:
-        return set()
-    parts = re.split(r"\s+and\s+|;", author_field)
-    last_names: set[str] = set()
-    for part in parts:
-        cleaned_part = part.strip()
-        if not cleaned_part:
-            continue
-        if "," in cleaned_part:
-            last_part = cleaned_part.split(",", 1)[0].strip()
-        else:
-            tokens = [t for t in cleaned_part.split() if t]
-            if not tokens:
-                continue
-            last_part = tokens[-1]
-        last_name = normalize_author_token(last_part)
-        if last_name:
-            last_names.add(last_name)
-    return last_names
+# "name_index" finds candidates through an inverted last-name index with
+# prefix filtering; unlike capped token blocking it never drops a pair that
+# reaches the threshold.
+AUTHOR_BLOCKING_MODES = (*BLOCKING_MODES, "name_index")
+DEFAULT_AUTHOR_BLOCKING = "name_index"
 
 
 def author_similarity(a: set[str], b: set[str]) -> float:
@@ -86,6 +73,29 @@ class DedupAuthorHandler(StepHandler):
                     "default": 0.8,
                     "description": "Author similarity threshold for clustering",
                 },
+                "blocking": {
+                    "type": "string",
+                    "enum": list(AUTHOR_BLOCKING_MODES),
+                    "default": DEFAULT_AUTHOR_BLOCKING,
+                    "description": "Candidate generation: none compares every pair, token only compares entries sharing a last-name token (capped), name_index uses an exact last-name index",
+                },
+                "blocking_max_postings": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": DEFAULT_MAX_POSTINGS,
+                    "description": "Skip last names shared by more entries than this in token blocking",
+                },
+                "workers": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "default": 1,
+                    "description": "Processes used to score pairs (0 = one per CPU core)",
+                },
+                "verify_blocking": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Also run the exhaustive comparison and report blocking recall (slow on large inputs)",
+                },
             },
         }
 
@@ -96,12 +106,56 @@ class DedupAuthorHandler(StepHandler):
         progress_callback: ProgressCallback | None = None,
     ) -> StepResult:
         threshold = float(config.get("similarity_threshold", 0.8))
+        blocking = parse_blocking_mode(
+            config.get("blocking"),
+            modes=AUTHOR_BLOCKING_MODES,
+            default=DEFAULT_AUTHOR_BLOCKING,
+        )
+        verify_blocking = bool(config.get("verify_blocking", False))
+        max_postings = parse_max_postings(config.get("blocking_max_postings"))
+        workers = resolve_worker_count(config.get("workers"))
         total_entries = len(input_entries)
         if progress_callback:
             progress_callback(0, total_entries, "Building author clusters")
-        author_sets = [extract_last_names(entry.get("author", "")) for entry in input_entries]
-        normalized_titles = [normalize_title(entry.get("title", "")) for entry in input_entries]
-        clusters = cluster_by_threshold(author_sets, threshold, author_similarity)
+        features, features_cached = load_entry_features(input_entries, config.get("_step_dir"))
+        author_sets = features.last_names
+        normalized_titles = features.titles
+        if blocking == "name_index":
+            candidate_pairs = jaccard_prefix_pairs(author_sets, threshold)
+        else:
+            candidate_pairs = blocking_candidate_pairs(
+                blocking,
+                author_sets,
+                max_postings=max_postings,
+            )
+        clusters = cluster_by_threshold(
+            author_sets,
+            threshold,
+            author_similarity,
+            candidate_pairs=candidate_pairs,
+            workers=workers,
+            progress_callback=progress_callback,
+        )
+        blocking_details: dict = {
+            "mode": blocking,
+            "max_postings": max_postings,
+            "candidate_pairs": (
+                len(candidate_pairs)
+                if candidate_pairs is not None
+                else total_entries * (total_entries - 1) // 2
+            ),
+        }
+        if verify_blocking and candidate_pairs is not None:
+            if progress_callback:
+                progress_callback(0, total_entries, "Verifying blocking recall")
+            blocking_details["recall_check"] = blocking_recall(
+                author_sets,
+                threshold,
+                author_similarity,
+                candidate_pairs,
+                workers=workers,
+                progress_callback=progress_callback,
+            )
 
         passed: list[dict] = []
         removed: list[dict] = []
@@ -126,11 +180,11 @@ class DedupAuthorHandler(StepHandler):
                     progress_callback(processed_entries, total_entries, "Deduplicating authors")
                 continue
 
-            representative_index = pick_representative(member_indices, input_entries)
+            representative_index = pick_representative(member_indices, input_entries, features=features)
             representative = input_entries[representative_index]
             rep_key = representative.get("ID", "unknown")
             cluster_id = f"cluster-{index}"
-            rep_authors = extract_last_names(representative.get("author", ""))
+            rep_authors = author_sets[representative_index]
             rep_title = normalized_titles[representative_index]
 
             passed.append(representative)
@@ -219,6 +273,9 @@ class DedupAuthorHandler(StepHandler):
             changes=changes,
             details={
                 "similarity_threshold": threshold,
+                "workers": workers,
+                "blocking": blocking_details,
+                "features_cached": features_cached,
                 "clusters": clusters_payload,
                 "total_clusters": len([c for c in clusters if len(c) > 1]),
             },
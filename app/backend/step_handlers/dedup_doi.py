@@ -10,8 +10,8 @@ from . import register_step_type
 from .dedup_utils import (
     parse_database_priority,
     pick_representative,
-    infer_database_name,
 )
+from .dedup_features import load_entry_features
 
 
 @register_step_type
@@ -77,6 +77,7 @@ class DedupDoiHandler(StepHandler):
         case_sensitive = config.get("case_sensitive", False)
         keep_no_doi = config.get("keep_no_doi", True)
         database_priority = parse_database_priority(config.get("database_priority"))
+        features, features_cached = load_entry_features(input_entries, config.get("_step_dir"))
 
         passed = []
         removed = []
@@ -86,8 +87,7 @@ class DedupDoiHandler(StepHandler):
         doi_groups: dict[str, list[int]] = {}
         group_order: list[str] = []
         raw_doi_map: dict[str, str] = {}
-        for idx, entry in enumerate(input_entries):
-            doi = str(entry.get("doi", "")).strip()
+        for idx, doi in enumerate(features.dois):
             if not doi:
                 continue
             normalized_doi = doi if case_sensitive else doi.lower()
@@ -106,6 +106,7 @@ class DedupDoiHandler(StepHandler):
                 input_entries,
                 database_priority=database_priority,
                 prefer_doi=True,
+                features=features,
             )
             representative_entry = input_entries[representative_index]
             representative_index_by_doi[normalized_doi] = representative_index
@@ -117,7 +118,7 @@ class DedupDoiHandler(StepHandler):
 
         for idx, entry in enumerate(input_entries, start=1):
             entry_key = entry.get("ID", "unknown")
-            doi = str(entry.get("doi", "")).strip()
+            doi = features.dois[idx - 1]
 
             # Normalize DOI if case-insensitive
             normalized_doi = doi if case_sensitive else doi.lower()
@@ -143,7 +144,7 @@ class DedupDoiHandler(StepHandler):
             else:
                 representative_index = representative_index_by_doi.get(normalized_doi, idx - 1)
                 representative_key = representative_key_by_doi.get(normalized_doi, entry_key)
-                source_database = infer_database_name(entry)
+                source_database = features.databases[idx - 1]
                 if idx - 1 == representative_index:
                     passed.append(entry)
                     changes.append(Change(
@@ -158,7 +159,6 @@ class DedupDoiHandler(StepHandler):
                     ))
                 else:
                     removed.append(entry)
-                    representative_entry = input_entries[representative_index]
                     changes.append(Change(
                         key=entry_key,
                         action="remove",
@@ -166,7 +166,7 @@ class DedupDoiHandler(StepHandler):
                         details={
                             "doi": raw_doi_map.get(normalized_doi, doi),
                             "original_key": representative_key,
-                            "original_source_database": infer_database_name(representative_entry) or None,
+                            "original_source_database": features.databases[representative_index] or None,
                             "source_database": source_database or None,
                             "message": f"Duplicate DOI: {doi}",
                         },
@@ -187,6 +187,7 @@ class DedupDoiHandler(StepHandler):
                 "duplicate_count": len(removed),
                 "unique_dois": len(doi_groups),
                 "database_priority": list(database_priority.keys()),
+                "features_cached": features_cached,
                 "entries_without_doi": sum(
                     1 for c in changes if c.reason in ("no_doi", "no_doi_removed")
                 ),
@@ -0,0 +1,160 @@
+"""
+Per-entry feature table shared by deduplication steps.
+
+Normalized titles, last-name sets, inferred databases and the scalar fields
+used for representative selection are computed once per input and stored
+column-wise (NumPy arrays for numeric fields). The table is persisted next to
+a step's input.json, keyed by a hash of that file (which the router writes
+from the same entries before the run), so re-running the step with different
+settings skips the normalization pass.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .dedup_utils import (
+    normalize_title,
+    extract_last_names,
+    infer_database_name,
+    parse_year,
+    completeness_score,
+    has_doi,
+)
+
+FEATURES_FILENAME = "features.npz"
+INPUT_FILENAME = "input.json"
+# Bump when feature extraction changes so persisted tables are rebuilt.
+FEATURES_VERSION = 1
+
+# Last names are stored joined by this separator (names are [a-z0-9]+).
+_LAST_NAME_SEPARATOR = " "
+
+
+def input_fingerprint(entries: list[dict]) -> str:
+    """Content hash of the input entries."""
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(json.dumps(entry, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def step_input_fingerprint(step_dir: str | Path, entries: list[dict]) -> str:
+    """
+    Hash of the step's input.json (much cheaper than serializing the entries
+    again); falls back to input_fingerprint() when the file is missing.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(Path(step_dir) / INPUT_FILENAME, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError:
+        return input_fingerprint(entries)
+    return "file:" + digest.hexdigest()
+
+
+@dataclass
+class EntryFeatures:
+    """Column-oriented features for a list of entries (row i = entry i)."""
+
+    fingerprint: str
+    titles: list[str]
+    last_names: list[frozenset[str]]
+    databases: list[str]
+    dois: list[str]
+    years: np.ndarray
+    completeness: np.ndarray
+    has_doi: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    @classmethod
+    def build(cls, entries: list[dict], fingerprint: str = "") -> EntryFeatures:
+        return cls(
+            fingerprint=fingerprint,
+            titles=[normalize_title(entry.get("title", "")) for entry in entries],
+            last_names=[frozenset(extract_last_names(entry.get("author", ""))) for entry in entries],
+            databases=[infer_database_name(entry) for entry in entries],
+            dois=[str(entry.get("doi", "")).strip() for entry in entries],
+            years=np.array([parse_year(entry) for entry in entries], dtype=np.int32),
+            completeness=np.array([completeness_score(entry) for entry in entries], dtype=np.int8),
+            has_doi=np.array([has_doi(entry) for entry in entries], dtype=np.int8),
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                version=np.array(FEATURES_VERSION, dtype=np.int32),
+                fingerprint=np.array(self.fingerprint),
+                titles=np.array(self.titles, dtype=np.str_),
+                last_names=np.array(
+                    [_LAST_NAME_SEPARATOR.join(sorted(names)) for names in self.last_names],
+                    dtype=np.str_,
+                ),
+                databases=np.array(self.databases, dtype=np.str_),
+                dois=np.array(self.dois, dtype=np.str_),
+                years=self.years,
+                completeness=self.completeness,
+                has_doi=self.has_doi,
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, fingerprint: str) -> EntryFeatures | None:
+        """Load a persisted table, or None if missing, stale or unreadable."""
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != FEATURES_VERSION or str(data["fingerprint"]) != fingerprint:
+                    return None
+                return cls(
+                    fingerprint=fingerprint,
+                    titles=data["titles"].tolist(),
+                    last_names=[
+                        frozenset(names.split(_LAST_NAME_SEPARATOR)) if names else frozenset()
+                        for names in data["last_names"].tolist()
+                    ],
+                    databases=data["databases"].tolist(),
+                    dois=data["dois"].tolist(),
+                    years=data["years"],
+                    completeness=data["completeness"],
+                    has_doi=data["has_doi"],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def load_entry_features(entries: list[dict], step_dir: str | Path | None = None) -> tuple[EntryFeatures, bool]:
+    """
+    Return the feature table for ``entries`` and whether it came from disk.
+
+    With ``step_dir`` the table is read from / written to features.npz there;
+    without it nothing is persisted and the fingerprint is left empty.
+    """
+    if not step_dir:
+        return EntryFeatures.build(entries), False
+
+    fingerprint = step_input_fingerprint(step_dir, entries)
+    path = Path(step_dir) / FEATURES_FILENAME
+    features = EntryFeatures.load(path, fingerprint)
+    if features is not None and len(features) == len(entries):
+        return features, True
+
+    features = EntryFeatures.build(entries, fingerprint)
+    try:
+        features.save(path)
+    except OSError:
+        pass
+    return features, False
@@ -0,0 +1,111 @@
+"""
+Persisted scored-pair lists for threshold re-clustering.
+
+A dedup run scores candidate pairs down to a floor below its threshold and
+stores them (with similarities) in the step directory. A later run with the
+same input, backend and blocking settings (and the same feature and
+similarity versions) and any threshold at or above that floor re-clusters
+from the stored pairs without calling the similarity function. At most MAX_STORED_PAIRS pairs are stored; beyond that the floor is
+raised to fit, and runs below the raised floor score again.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+SCORED_PAIRS_FILENAME = "scored_pairs.npz"
+# Pairs are kept down to this similarity (or the run's own floor if lower),
+# so later runs can lower the threshold to here without rescoring.
+PAIR_CACHE_FLOOR = 0.7
+# Stored pair limit (about 20 bytes each); with blocking=none a large input
+# can have many pairs above the floor.
+MAX_STORED_PAIRS = 2_000_000
+
+
+def pair_cache_floor(min_similarity: float) -> float:
+    return min(min_similarity, PAIR_CACHE_FLOOR)
+
+
+def _encode_key(key: dict) -> str:
+    return json.dumps(key, sort_keys=True, default=str)
+
+
+def load_scored_pairs(
+    step_dir: str | Path | None,
+    key: dict,
+    min_similarity: float,
+) -> tuple[list[tuple[int, int, float]], dict] | None:
+    """
+    Return stored pairs reaching ``min_similarity`` plus the stored info dict,
+    or None when nothing usable is stored (different key, or stored floor
+    above ``min_similarity``).
+    """
+    if not step_dir:
+        return None
+    path = Path(step_dir) / SCORED_PAIRS_FILENAME
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["key"]) != _encode_key(key) or float(data["floor"]) > min_similarity:
+                return None
+            info = json.loads(str(data["info"]))
+            left = data["left"]
+            right = data["right"]
+            similarity = data["similarity"]
+    except (OSError, KeyError, ValueError):
+        return None
+
+    keep = similarity >= min_similarity
+    scored = list(zip(
+        left[keep].tolist(),
+        right[keep].tolist(),
+        similarity[keep].tolist(),
+    ))
+    return scored, info
+
+
+def save_scored_pairs(
+    step_dir: str | Path | None,
+    key: dict,
+    floor: float,
+    scored: list[tuple[int, int, float]],
+    info: dict | None = None,
+) -> None:
+    if not step_dir:
+        return
+    similarity = np.array([sim for _, _, sim in scored], dtype=np.float64)
+    keep = None
+    if len(similarity) > MAX_STORED_PAIRS:
+        # Raise the floor just above the best pair that does not fit.
+        excluded = np.partition(similarity, len(similarity) - MAX_STORED_PAIRS - 1)[
+            len(similarity) - MAX_STORED_PAIRS - 1
+        ]
+        floor = max(floor, float(np.nextafter(excluded, np.inf)))
+        keep = similarity >= floor
+        similarity = similarity[keep]
+    left = np.array([i for i, _, _ in scored], dtype=np.int32)
+    right = np.array([j for _, j, _ in scored], dtype=np.int32)
+    if keep is not None:
+        left = left[keep]
+        right = right[keep]
+    path = Path(step_dir) / SCORED_PAIRS_FILENAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                key=np.array(_encode_key(key)),
+                info=np.array(json.dumps(info or {}, default=str)),
+                floor=np.array(floor, dtype=np.float64),
+                left=left,
+                right=right,
+                similarity=similarity,
+            )
+        tmp_path.replace(path)
+    except OSError:
+        pass
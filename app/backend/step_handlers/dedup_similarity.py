@@ -0,0 +1,196 @@
+"""
+Batched title similarity backends for deduplication steps.
+
+The default backend scores pairs one at a time with difflib.SequenceMatcher.
+The "ngram" backend encodes every normalized title once as a character-bigram
+count vector and scores many pairs per call with NumPy (Dice coefficient over
+bigram multisets), which tracks the SequenceMatcher ratio closely at a small
+fraction of the cost.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Callable, Sequence
+
+import numpy as np
+
+from .dedup_utils import title_similarity
+
+SIMILARITY_BACKENDS = ("sequence_matcher", "ngram")
+DEFAULT_SIMILARITY_BACKEND = "sequence_matcher"
+# Bump when title_similarity or NgramTitleSimilarity scores change so stored
+# scored pairs are recomputed.
+SIMILARITY_VERSION = 1
+
+# Pairs scored within this margin below the threshold are compared with
+# SequenceMatcher in the backend report.
+COMPARISON_MARGIN = 0.1
+MAX_COMPARED_PAIRS = 5000
+MAX_REPORTED_DIFFERENCES = 20
+# Candidate pairs the backend scored below the comparison floor that are
+# sampled and checked with SequenceMatcher (missed duplicates).
+BELOW_FLOOR_SAMPLE_PAIRS = 2000
+BELOW_FLOOR_SAMPLE_SEED = 0
+
+
+def parse_similarity_backend(raw: str | None) -> str:
+    value = str(raw or DEFAULT_SIMILARITY_BACKEND).strip().lower()
+    return value if value in SIMILARITY_BACKENDS else DEFAULT_SIMILARITY_BACKEND
+
+
+class NgramTitleSimilarity:
+    """Character n-gram Dice similarity over a fixed list of titles."""
+
+    def __init__(self, titles: Sequence[str], ngram_size: int = 2):
+        self.ngram_size = ngram_size
+        vocabulary: dict[str, int] = {}
+        rows: list[dict[int, int]] = []
+        for title in titles:
+            counts: dict[int, int] = {}
+            for offset in range(len(title) - ngram_size + 1):
+                gram_id = vocabulary.setdefault(title[offset:offset + ngram_size], len(vocabulary))
+                counts[gram_id] = counts.get(gram_id, 0) + 1
+            rows.append(counts)
+
+        # normalize_title limits titles to [a-z0-9 ], so the bigram vocabulary
+        # stays small enough for a dense uint8 matrix.
+        self.vectors = np.zeros((len(rows), max(len(vocabulary), 1)), dtype=np.uint8)
+        for row_idx, counts in enumerate(rows):
+            if counts:
+                self.vectors[row_idx, list(counts.keys())] = np.minimum(list(counts.values()), 255)
+        self.totals = self.vectors.sum(axis=1, dtype=np.int32)
+
+    def score_pairs(self, pairs: list[tuple[int, int]]) -> np.ndarray:
+        if not pairs:
+            return np.zeros(0, dtype=np.float64)
+        index = np.asarray(pairs, dtype=np.int64)
+        left = index[:, 0]
+        right = index[:, 1]
+        overlap = np.minimum(self.vectors[left], self.vectors[right]).sum(axis=1, dtype=np.int32)
+        denominator = self.totals[left] + self.totals[right]
+        scores = np.zeros(len(pairs), dtype=np.float64)
+        np.divide(2.0 * overlap, denominator, out=scores, where=denominator > 0)
+        return scores
+
+
+def sample_unscored_pairs(
+    count: int,
+    candidate_pairs: list[tuple[int, int]] | None,
+    scored: set[tuple[int, int]],
+    sample_size: int,
+    rng: random.Random,
+) -> tuple[list[tuple[int, int]], int]:
+    """
+    Random candidate pairs (all pairs if ``candidate_pairs`` is None) that are
+    not in ``scored``. Returns the sample and the number of such pairs.
+    """
+    if candidate_pairs is not None:
+        population = [pair for pair in candidate_pairs if pair not in scored]
+        if len(population) <= sample_size:
+            return population, len(population)
+        return rng.sample(population, sample_size), len(population)
+
+    population_size = count * (count - 1) // 2 - len(scored)
+    if population_size <= sample_size:
+        pairs = [(i, j) for i in range(count) for j in range(i + 1, count) if (i, j) not in scored]
+        return pairs, population_size
+    sample: set[tuple[int, int]] = set()
+    attempts = 0
+    while len(sample) < sample_size and attempts < sample_size * 10:
+        attempts += 1
+        i, j = sorted(rng.sample(range(count), 2))
+        if (i, j) not in scored:
+            sample.add((i, j))
+    return sorted(sample), population_size
+
+
+def pair_difference(
+    entries: Sequence[dict],
+    i: int,
+    j: int,
+    backend_score: float,
+    reference: float,
+    decision_differs: bool,
+) -> dict:
+    return {
+        "left_id": entries[i].get("ID", "unknown"),
+        "right_id": entries[j].get("ID", "unknown"),
+        "left_title": entries[i].get("title", ""),
+        "right_title": entries[j].get("title", ""),
+        "backend_similarity": float(backend_score),
+        "sequence_matcher_similarity": reference,
+        "difference": float(backend_score) - reference,
+        "decision_differs": decision_differs,
+    }
+
+
+def compare_with_sequence_matcher(
+    titles: Sequence[str],
+    scored_pairs: list[tuple[int, int, float]],
+    threshold: float,
+    entries: Sequence[dict],
+    batch_similarity_fn: Callable[[list[tuple[int, int]]], Sequence[float]] | None = None,
+    candidate_pairs: list[tuple[int, int]] | None = None,
+    sample_size: int = BELOW_FLOOR_SAMPLE_PAIRS,
+) -> dict:
+    """
+    Report where batched backend scores differ from the SequenceMatcher ratio.
+
+    The top pairs the backend scored near or above the threshold are
+    compared, since those can merge clusters wrongly. With
+    ``batch_similarity_fn`` a random sample of the remaining candidate pairs
+    (``candidate_pairs``, or all pairs if None) is compared as well: a pair
+    SequenceMatcher scores at or above the threshold there is a duplicate the
+    backend missed, reported as a false negative.
+    """
+    compared = sorted(scored_pairs, key=lambda item: -item[2])[:MAX_COMPARED_PAIRS]
+    differences: list[dict] = []
+    total_abs_diff = 0.0
+    max_abs_diff = 0.0
+    disagreements = 0
+
+    for i, j, backend_score in compared:
+        reference = title_similarity(titles[i], titles[j])
+        diff = backend_score - reference
+        total_abs_diff += abs(diff)
+        max_abs_diff = max(max_abs_diff, abs(diff))
+        disagree = (backend_score >= threshold) != (reference >= threshold)
+        if disagree:
+            disagreements += 1
+        differences.append(pair_difference(entries, i, j, backend_score, reference, disagree))
+
+    differences.sort(key=lambda item: (not item["decision_differs"], -abs(item["difference"])))
+
+    report = {
+        "compared_pairs": len(compared),
+        "comparison_floor": max(threshold - COMPARISON_MARGIN, 0.0),
+        "mean_abs_difference": total_abs_diff / len(compared) if compared else 0.0,
+        "max_abs_difference": max_abs_diff,
+        "decision_disagreements": disagreements,
+        "largest_differences": differences[:MAX_REPORTED_DIFFERENCES],
+    }
+    if batch_similarity_fn is None:
+        return report
+
+    sample, population = sample_unscored_pairs(
+        len(titles),
+        candidate_pairs,
+        {(i, j) for i, j, _ in scored_pairs},
+        sample_size,
+        random.Random(BELOW_FLOOR_SAMPLE_SEED),
+    )
+    missed: list[dict] = []
+    for (i, j), backend_score in zip(sample, batch_similarity_fn(sample) if sample else []):
+        reference = title_similarity(titles[i], titles[j])
+        if reference >= threshold:
+            missed.append(pair_difference(entries, i, j, backend_score, reference, True))
+    missed.sort(key=lambda item: -item["sequence_matcher_similarity"])
+    report["below_floor"] = {
+        "candidate_pairs": population,
+        "sampled_pairs": len(sample),
+        "false_negatives": len(missed),
+        "false_negative_rate": len(missed) / len(sample) if sample else 0.0,
+        "false_negative_examples": missed[:MAX_REPORTED_DIFFERENCES],
+    }
+    return report
@@ -12,9 +12,28 @@ from .dedup_utils import (
     normalize_title,
     title_similarity,
     pick_representative,
-    cluster_by_threshold,
+    score_pairs_sharded,
+    cluster_pairs,
+    blocking_candidate_pairs,
+    blocking_recall,
+    parse_blocking_mode,
+    parse_max_postings,
+    resolve_worker_count,
+    BLOCKING_MODES,
+    DEFAULT_MAX_POSTINGS,
     parse_database_priority,
 )
+from .dedup_features import FEATURES_VERSION, load_entry_features
+from .dedup_pair_cache import load_scored_pairs, save_scored_pairs, pair_cache_floor
+from .dedup_similarity import (
+    NgramTitleSimilarity,
+    compare_with_sequence_matcher,
+    parse_similarity_backend,
+    COMPARISON_MARGIN,
+    DEFAULT_SIMILARITY_BACKEND,
+    SIMILARITY_BACKENDS,
+    SIMILARITY_VERSION,
+)
 
 
 @register_step_type
@@ -50,6 +69,35 @@ class DedupTitleHandler(StepHandler):
                     "default": 0.9,
                     "description": "Title similarity threshold for clustering",
                 },
+                "similarity_backend": {
+                    "type": "string",
+                    "enum": list(SIMILARITY_BACKENDS),
+                    "default": DEFAULT_SIMILARITY_BACKEND,
+                    "description": "sequence_matcher: difflib ratio per pair, ngram: batched character-bigram similarity (NumPy)",
+                },
+                "blocking": {
+                    "type": "string",
+                    "enum": list(BLOCKING_MODES),
+                    "default": "none",
+                    "description": "Candidate generation: none compares every pair, token only compares entries sharing a title token",
+                },
+                "blocking_max_postings": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "default": DEFAULT_MAX_POSTINGS,
+                    "description": "Skip title words shared by more entries than this when blocking",
+                },
+                "workers": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "default": 1,
+                    "description": "Processes used to score pairs (0 = one per CPU core)",
+                },
+                "verify_blocking": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Also run the exhaustive comparison and report blocking recall (slow on large inputs)",
+                },
                 "database_priority": {
                     "type": "string",
                     "default": "",
@@ -65,12 +113,130 @@ class DedupTitleHandler(StepHandler):
         progress_callback: ProgressCallback | None = None,
     ) -> StepResult:
         threshold = float(config.get("similarity_threshold", 0.9))
+        blocking = parse_blocking_mode(config.get("blocking"))
+        verify_blocking = bool(config.get("verify_blocking", False))
+        max_postings = parse_max_postings(config.get("blocking_max_postings"))
+        workers = resolve_worker_count(config.get("workers"))
+        similarity_backend = parse_similarity_backend(config.get("similarity_backend"))
         database_priority = parse_database_priority(config.get("database_priority"))
         total_entries = len(input_entries)
         if progress_callback:
             progress_callback(0, total_entries, "Building title clusters")
-        normalized_titles = [normalize_title(entry.get("title", "")) for entry in input_entries]
-        clusters = cluster_by_threshold(normalized_titles, threshold, title_similarity)
+        features, features_cached = load_entry_features(input_entries, config.get("_step_dir"))
+        normalized_titles = features.titles
+        batch_scorer = None
+        score_floor = threshold
+        if similarity_backend == "ngram":
+            batch_scorer = NgramTitleSimilarity(normalized_titles).score_pairs
+            # Keep near-threshold pairs as well for the backend comparison report.
+            score_floor = max(threshold - COMPARISON_MARGIN, 0.0)
+
+        def build_candidate_pairs() -> list[tuple[int, int]] | None:
+            return blocking_candidate_pairs(
+                blocking,
+                [title.split() for title in normalized_titles],
+                max_postings=max_postings,
+            )
+
+        # Scored pairs depend on everything except the threshold, so a rerun
+        # with only a new threshold re-clusters from the stored list. The
+        # versions cover title normalization and the similarity functions.
+        pair_cache_key = {
+            "input": features.fingerprint,
+            "features_version": FEATURES_VERSION,
+            "similarity_version": SIMILARITY_VERSION,
+            "similarity_backend": similarity_backend,
+            "blocking": blocking,
+            "max_postings": max_postings if blocking == "token" else None,
+        }
+        step_dir = config.get("_step_dir")
+        candidate_pairs = None
+        cached_pairs = load_scored_pairs(step_dir, pair_cache_key, score_floor)
+        if cached_pairs is not None:
+            scored, pair_cache_info = cached_pairs
+            candidate_pair_count = int(pair_cache_info["candidate_pairs"])
+        else:
+            candidate_pairs = build_candidate_pairs()
+            candidate_pair_count = (
+                len(candidate_pairs)
+                if candidate_pairs is not None
+                else total_entries * (total_entries - 1) // 2
+            )
+            stored_floor = pair_cache_floor(score_floor)
+            scored = score_pairs_sharded(
+                normalized_titles,
+                stored_floor,
+                title_similarity,
+                candidate_pairs=candidate_pairs,
+                batch_similarity_fn=batch_scorer,
+                workers=workers,
+                progress_callback=progress_callback,
+                progress_message="Scoring title pairs",
+            )
+            save_scored_pairs(
+                step_dir,
+                pair_cache_key,
+                stored_floor,
+                scored,
+                info={"candidate_pairs": candidate_pair_count},
+            )
+            scored = [item for item in scored if item[2] >= score_floor]
+
+        clusters = cluster_pairs(
+            total_entries,
+            ((i, j) for i, j, similarity in scored if similarity >= threshold),
+        )
+        blocking_details: dict = {
+            "mode": blocking,
+            "max_postings": max_postings,
+            "candidate_pairs": candidate_pair_count,
+        }
+        if verify_blocking and blocking != "none":
+            if candidate_pairs is None:
+                candidate_pairs = build_candidate_pairs()
+            if progress_callback:
+                progress_callback(0, total_entries, "Verifying blocking recall")
+            blocking_details["recall_check"] = blocking_recall(
+                normalized_titles,
+                threshold,
+                title_similarity,
+                candidate_pairs,
+                batch_similarity_fn=batch_scorer,
+                workers=workers,
+                progress_callback=progress_callback,
+            )
+        backend_details: dict = {"name": similarity_backend}
+        if batch_scorer is not None:
+            if candidate_pairs is None and blocking != "none":
+                candidate_pairs = build_candidate_pairs()
+            backend_details["comparison"] = compare_with_sequence_matcher(
+                normalized_titles,
+                scored,
+                threshold,
+                input_entries,
+                batch_similarity_fn=batch_scorer,
+                candidate_pairs=candidate_pairs,
+            )
+
+        scored_lookup = {(i, j): similarity for i, j, similarity in scored}
+
+        def member_similarities(representative_index: int, member_indices: list[int]) -> list[float]:
+            # Reuse scores from the pair list where the argument order matches
+            # (SequenceMatcher's ratio is not symmetric); score the rest.
+            values = [
+                scored_lookup.get((representative_index, idx)) if representative_index < idx else None
+                for idx in member_indices
+            ]
+            missing = [pos for pos, value in enumerate(values) if value is None]
+            if missing:
+                missing_pairs = [(representative_index, member_indices[pos]) for pos in missing]
+                if batch_scorer is not None:
+                    fresh = batch_scorer(missing_pairs)
+                else:
+                    fresh = [title_similarity(normalized_titles[i], normalized_titles[j]) for i, j in missing_pairs]
+                for pos, value in zip(missing, fresh):
+                    values[pos] = value
+            return [float(value) for value in values]
 
         passed: list[dict] = []
         removed: list[dict] = []
@@ -100,11 +266,11 @@ class DedupTitleHandler(StepHandler):
                 input_entries,
                 database_priority=database_priority,
                 prefer_doi=True,
+                features=features,
             )
             representative = input_entries[representative_index]
             rep_key = representative.get("ID", "unknown")
             cluster_id = f"cluster-{index}"
-            rep_norm = normalized_titles[representative_index]
 
             passed.append(representative)
             changes.append(Change(
@@ -118,10 +284,10 @@ class DedupTitleHandler(StepHandler):
             ))
 
             cluster_members_payload = []
-            member_similarity = [
-                (title_similarity(rep_norm, normalized_titles[idx]), idx)
-                for idx in member_indices
-            ]
+            member_similarity = list(zip(
+                member_similarities(representative_index, member_indices),
+                member_indices,
+            ))
             member_similarity.sort(key=lambda item: item[0])
 
             for similarity, idx in member_similarity:
@@ -175,7 +341,12 @@ class DedupTitleHandler(StepHandler):
             changes=changes,
             details={
                 "similarity_threshold": threshold,
+                "workers": workers,
                 "database_priority": list(database_priority.keys()),
+                "blocking": blocking_details,
+                "similarity_backend": backend_details,
+                "features_cached": features_cached,
+                "scored_pairs_cached": cached_pairs is not None,
                 "clusters": clusters_payload,
                 "total_clusters": len([c for c in clusters if len(c) > 1]),
             },
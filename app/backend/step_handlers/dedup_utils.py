@@ -5,12 +5,34 @@ Shared helpers for deduplication step handlers.
 from __future__ import annotations
 
 import difflib
+import math
+import multiprocessing
+import os
 import re
-from typing import Callable, Iterable, TypeVar
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence, TypeVar
 from urllib.parse import urlparse
 
+if TYPE_CHECKING:
+    from .dedup_features import EntryFeatures
+
 T = TypeVar("T")
 
+# Scores a batch of (i, j) index pairs at once (see dedup_similarity).
+BatchSimilarityFn = Callable[[list[tuple[int, int]]], Sequence[float]]
+DEFAULT_BATCH_SIZE = 4096
+
+# Process-pool scoring: below this many pairs the pool start-up costs more
+# than it saves, so scoring stays in-process.
+MIN_PARALLEL_PAIRS = 20_000
+SHARDS_PER_WORKER = 4
+
+# Candidate generation modes for pairwise clustering.
+# "none" compares every pair; "token" only compares entries sharing a token.
+BLOCKING_MODES = ("none", "token")
+DEFAULT_MAX_POSTINGS = 200
+
 
 def normalize_title(title: str) -> str:
     if not title:
@@ -26,6 +48,33 @@ def title_similarity(a: str, b: str) -> float:
     return difflib.SequenceMatcher(None, a, b).ratio()
 
 
+def normalize_author_token(token: str) -> str:
+    cleaned = re.sub(r"[^a-z0-9]+", "", token.lower())
+    return cleaned
+
+
+def extract_last_names(author_field: str) -> set[str]:
+    if not author_field:
+        return set()
+    parts = re.split(r"\s+and\s+|;", author_field)
+    last_names: set[str] = set()
+    for part in parts:
+        cleaned_part = part.strip()
+        if not cleaned_part:
+            continue
+        if "," in cleaned_part:
+            last_part = cleaned_part.split(",", 1)[0].strip()
+        else:
+            tokens = [t for t in cleaned_part.split() if t]
+            if not tokens:
+                continue
+            last_part = tokens[-1]
+        last_name = normalize_author_token(last_part)
+        if last_name:
+            last_names.add(last_name)
+    return last_names
+
+
 def completeness_score(entry: dict) -> int:
     fields = ["title", "author", "year", "abstract", "doi", "journal", "booktitle"]
     return sum(1 for field in fields if entry.get(field))
@@ -125,7 +174,12 @@ def parse_database_priority(raw: str | list[str] | None) -> dict[str, int]:
 def database_priority_rank(entry: dict, database_priority: dict[str, int] | None = None) -> int:
     if not database_priority:
         return 10_000
-    source_db = infer_database_name(entry)
+    return database_rank(infer_database_name(entry), database_priority)
+
+
+def database_rank(source_db: str, database_priority: dict[str, int] | None = None) -> int:
+    if not database_priority:
+        return 10_000
     return database_priority.get(source_db, len(database_priority) + 10_000)
 
 
@@ -138,7 +192,20 @@ def pick_representative(
     entries: list[dict],
     database_priority: dict[str, int] | None = None,
     prefer_doi: bool = True,
+    features: EntryFeatures | None = None,
 ) -> int:
+    if features is not None:
+        # Same ordering as below, read from the precomputed feature table.
+        return min(
+            member_indices,
+            key=lambda idx: (
+                -int(features.years[idx]),
+                database_rank(features.databases[idx], database_priority),
+                -int(features.has_doi[idx]) if prefer_doi else 0,
+                -int(features.completeness[idx]),
+                idx,
+            ),
+        )
     return sorted(
         member_indices,
         key=lambda idx: (
@@ -151,12 +218,174 @@ def pick_representative(
     )[0]
 
 
-def cluster_by_threshold(
-    values: list[T],
+def exhaustive_pairs(count: int) -> Iterator[tuple[int, int]]:
+    for i in range(count):
+        for j in range(i + 1, count):
+            yield i, j
+
+
+def token_blocking_pairs(
+    token_sets: list[Iterable[str]],
+    max_postings: int | None = DEFAULT_MAX_POSTINGS,
+) -> list[tuple[int, int]]:
+    """
+    Generate candidate pairs (i < j) for entries that share at least one token.
+
+    Tokens whose posting list is longer than ``max_postings`` behave like stop
+    words and are not used for blocking. An entry whose tokens are all that
+    common is still paired through its rarest token so it is never isolated.
+    """
+    postings: dict[str, list[int]] = {}
+    entry_tokens: list[set[str]] = []
+    for idx, tokens in enumerate(token_sets):
+        unique_tokens = {token for token in tokens if token}
+        entry_tokens.append(unique_tokens)
+        for token in unique_tokens:
+            postings.setdefault(token, []).append(idx)
+
+    def is_capped(token: str) -> bool:
+        return max_postings is not None and len(postings[token]) > max_postings
+
+    pairs: set[tuple[int, int]] = set()
+    for token, members in postings.items():
+        if len(members) < 2 or is_capped(token):
+            continue
+        for offset, i in enumerate(members):
+            for j in members[offset + 1:]:
+                pairs.add((i, j))
+
+    for idx, tokens in enumerate(entry_tokens):
+        if not tokens or not all(is_capped(token) for token in tokens):
+            continue
+        rarest = min(tokens, key=lambda token: (len(postings[token]), token))
+        for other in postings[rarest]:
+            if other != idx:
+                pairs.add((min(idx, other), max(idx, other)))
+
+    return sorted(pairs)
+
+
+def jaccard_prefix_pairs(
+    token_sets: list[set[str]],
     threshold: float,
+) -> list[tuple[int, int]] | None:
+    """
+    Candidate pairs for Jaccard similarity >= ``threshold`` via an inverted index.
+
+    Tokens are ordered rarest first and each set is only indexed and probed
+    through its prefix of ``|s| - ceil(threshold * |s|) + 1`` tokens; any
+    pair reaching the threshold shares a token in both prefixes, so no
+    matching pair is lost. Common tokens sort last and mostly fall outside
+    the prefixes, which keeps posting lists short. Pairs whose sizes differ
+    by more than the threshold allows are skipped as well.
+
+    Returns None when ``threshold`` <= 0 (every pair matches).
+    """
+    if threshold <= 0:
+        return None
+
+    frequency: dict[str, int] = {}
+    for tokens in token_sets:
+        for token in tokens:
+            frequency[token] = frequency.get(token, 0) + 1
+
+    index: dict[str, list[int]] = {}
+    pairs: set[tuple[int, int]] = set()
+    for idx, tokens in enumerate(token_sets):
+        size = len(tokens)
+        if not size:
+            continue
+        ordered = sorted(tokens, key=lambda token: (frequency[token], token))
+        # The epsilon keeps float error from shortening the prefix.
+        prefix_length = size - math.ceil(threshold * size - 1e-9) + 1
+        for token in ordered[:prefix_length]:
+            postings = index.setdefault(token, [])
+            for other in postings:
+                other_size = len(token_sets[other])
+                if min(size, other_size) >= threshold * max(size, other_size) - 1e-9:
+                    pairs.add((other, idx))
+            postings.append(idx)
+
+    return sorted(pairs)
+
+
+def blocking_candidate_pairs(
+    mode: str,
+    token_sets: list[Iterable[str]],
+    max_postings: int | None = DEFAULT_MAX_POSTINGS,
+) -> list[tuple[int, int]] | None:
+    """Return candidate pairs for a blocking mode (None means all pairs)."""
+    if mode == "token":
+        return token_blocking_pairs(token_sets, max_postings=max_postings)
+    return None
+
+
+def parse_blocking_mode(
+    raw: str | None,
+    modes: Sequence[str] = BLOCKING_MODES,
+    default: str = "none",
+) -> str:
+    value = str(raw or default).strip().lower()
+    return value if value in modes else default
+
+
+def parse_max_postings(raw: int | str | None) -> int:
+    if raw is None or raw == "":
+        return DEFAULT_MAX_POSTINGS
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_POSTINGS
+    # There is no "no cap" value: without it every entry sharing a common
+    # word is paired, which brings back the O(n^2) pair list.
+    return value if value > 0 else DEFAULT_MAX_POSTINGS
+
+
+def iter_pair_batches(
+    pairs: Iterable[tuple[int, int]],
+    batch_size: int,
+) -> Iterator[list[tuple[int, int]]]:
+    iterator = iter(pairs)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def score_pairs(
+    values: list[T],
+    min_similarity: float,
     similarity_fn: Callable[[T, T], float],
-) -> list[list[int]]:
-    parent = list(range(len(values)))
+    candidate_pairs: Iterable[tuple[int, int]] | None = None,
+    batch_similarity_fn: BatchSimilarityFn | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> list[tuple[int, int, float]]:
+    """
+    Score candidate pairs (all pairs when None) and keep those reaching
+    ``min_similarity``. ``batch_similarity_fn`` scores a whole batch of index
+    pairs at once and takes precedence over the per-pair ``similarity_fn``.
+    """
+    pairs = exhaustive_pairs(len(values)) if candidate_pairs is None else candidate_pairs
+    scored: list[tuple[int, int, float]] = []
+
+    if batch_similarity_fn is None:
+        for i, j in pairs:
+            similarity = similarity_fn(values[i], values[j])
+            if similarity >= min_similarity:
+                scored.append((i, j, similarity))
+        return scored
+
+    for batch in iter_pair_batches(pairs, batch_size):
+        for (i, j), similarity in zip(batch, batch_similarity_fn(batch)):
+            if similarity >= min_similarity:
+                scored.append((i, j, float(similarity)))
+    return scored
+
+
+def cluster_pairs(count: int, pairs: Iterable[tuple[int, int]]) -> list[list[int]]:
+    """Union-find over linked index pairs; clusters are ordered by first member."""
+    parent = list(range(count))
 
     def find(x: int) -> int:
         while parent[x] != x:
@@ -170,15 +399,254 @@ def cluster_by_threshold(
         if ra != rb:
             parent[rb] = ra
 
-    for i in range(len(values)):
-        for j in range(i + 1, len(values)):
-            similarity = similarity_fn(values[i], values[j])
-            if similarity >= threshold:
-                union(i, j)
+    for i, j in pairs:
+        union(i, j)
 
     clusters: dict[int, list[int]] = {}
-    for idx in range(len(values)):
+    for idx in range(count):
         root = find(idx)
         clusters.setdefault(root, []).append(idx)
 
     return list(clusters.values())
+
+
+def resolve_worker_count(raw: int | str | None) -> int:
+    """Parse a worker-count option (0 = one worker per CPU core)."""
+    try:
+        value = int(raw) if raw not in (None, "") else 1
+    except (TypeError, ValueError):
+        return 1
+    if value <= 0:
+        return os.cpu_count() or 1
+    return value
+
+
+def _row_range_shards(count: int, shard_count: int) -> list[tuple[int, int]]:
+    """Split rows of the exhaustive pair triangle into ranges with similar pair counts."""
+    total_pairs = count * (count - 1) // 2
+    target = max(math.ceil(total_pairs / max(shard_count, 1)), 1)
+    shards: list[tuple[int, int]] = []
+    start = 0
+    accumulated = 0
+    for row in range(count):
+        accumulated += count - 1 - row
+        if accumulated >= target:
+            shards.append((start, row + 1))
+            start = row + 1
+            accumulated = 0
+    if start < count:
+        shards.append((start, count))
+    return shards
+
+
+def _row_range_pairs(count: int, start: int, end: int) -> Iterator[tuple[int, int]]:
+    for i in range(start, end):
+        for j in range(i + 1, count):
+            yield i, j
+
+
+def _row_range_pair_count(count: int, start: int, end: int) -> int:
+    return sum(count - 1 - row for row in range(start, end))
+
+
+# Per-process state for pool workers, set once by _init_score_worker so the
+# values are pickled once per worker instead of once per shard.
+_score_worker_state: dict = {}
+
+
+def _init_score_worker(
+    values: list,
+    min_similarity: float,
+    similarity_fn: Callable,
+    batch_similarity_fn: BatchSimilarityFn | None,
+) -> None:
+    _score_worker_state.update(
+        values=values,
+        min_similarity=min_similarity,
+        similarity_fn=similarity_fn,
+        batch_similarity_fn=batch_similarity_fn,
+    )
+
+
+def _score_shard(
+    values: list,
+    min_similarity: float,
+    similarity_fn: Callable,
+    batch_similarity_fn: BatchSimilarityFn | None,
+    shard: tuple[int, int] | list[tuple[int, int]],
+) -> tuple[list[tuple[int, int, float]], int]:
+    if isinstance(shard, tuple):
+        pairs: Iterable[tuple[int, int]] = _row_range_pairs(len(values), *shard)
+        pair_count = _row_range_pair_count(len(values), *shard)
+    else:
+        pairs = shard
+        pair_count = len(shard)
+    scored = score_pairs(
+        values,
+        min_similarity,
+        similarity_fn,
+        candidate_pairs=pairs,
+        batch_similarity_fn=batch_similarity_fn,
+    )
+    return scored, pair_count
+
+
+def _score_shard_in_worker(
+    shard: tuple[int, int] | list[tuple[int, int]],
+) -> tuple[list[tuple[int, int, float]], int]:
+    return _score_shard(
+        _score_worker_state["values"],
+        _score_worker_state["min_similarity"],
+        _score_worker_state["similarity_fn"],
+        _score_worker_state["batch_similarity_fn"],
+        shard,
+    )
+
+
+def score_pairs_sharded(
+    values: list[T],
+    min_similarity: float,
+    similarity_fn: Callable[[T, T], float],
+    candidate_pairs: Iterable[tuple[int, int]] | None = None,
+    batch_similarity_fn: BatchSimilarityFn | None = None,
+    workers: int = 1,
+    progress_callback: Callable[[int, int, str | None], None] | None = None,
+    progress_message: str = "Scoring pairs",
+) -> list[tuple[int, int, float]]:
+    """
+    Score pairs in shards, across a process pool when ``workers`` > 1.
+
+    Exhaustive comparison is sharded by row ranges of the pair triangle and
+    candidate lists by contiguous slices. Shard results are concatenated in
+    shard order, so the scored pairs (and the clusters built from them) are
+    identical to a single-process run. ``progress_callback`` receives the
+    number of scored pairs after each shard completes.
+
+    ``similarity_fn`` and ``batch_similarity_fn`` must be picklable
+    (module-level functions or bound methods of picklable objects).
+    """
+    count = len(values)
+    if candidate_pairs is None:
+        total_pairs = count * (count - 1) // 2
+    else:
+        candidate_pairs = list(candidate_pairs)
+        total_pairs = len(candidate_pairs)
+
+    use_pool = workers > 1 and total_pairs >= MIN_PARALLEL_PAIRS
+    shard_count = workers * SHARDS_PER_WORKER if use_pool else SHARDS_PER_WORKER
+    if candidate_pairs is None:
+        shards: list = _row_range_shards(count, shard_count)
+    else:
+        size = max(math.ceil(total_pairs / shard_count), 1)
+        shards = [candidate_pairs[offset:offset + size] for offset in range(0, total_pairs, size)]
+
+    if progress_callback:
+        progress_callback(0, total_pairs, progress_message)
+
+    results: list[list[tuple[int, int, float]]] = [[] for _ in shards]
+    completed = 0
+
+    if not use_pool:
+        for shard_index, shard in enumerate(shards):
+            results[shard_index], pair_count = _score_shard(
+                values,
+                min_similarity,
+                similarity_fn,
+                batch_similarity_fn,
+                shard,
+            )
+            completed += pair_count
+            if progress_callback:
+                progress_callback(completed, total_pairs, progress_message)
+    else:
+        # spawn: the API runs steps from worker threads, where fork is unsafe.
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_score_worker,
+            initargs=(values, min_similarity, similarity_fn, batch_similarity_fn),
+        ) as executor:
+            futures = {executor.submit(_score_shard_in_worker, shard): index for index, shard in enumerate(shards)}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]], pair_count = future.result()
+                    completed += pair_count
+                    if progress_callback:
+                        progress_callback(completed, total_pairs, progress_message)
+            except BaseException:
+                # On cancel (raised by progress_callback) or a failed shard,
+                # drop the queued shards instead of scoring them on exit.
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    return [item for shard_result in results for item in shard_result]
+
+
+def cluster_by_threshold(
+    values: list[T],
+    threshold: float,
+    similarity_fn: Callable[[T, T], float],
+    candidate_pairs: Iterable[tuple[int, int]] | None = None,
+    batch_similarity_fn: BatchSimilarityFn | None = None,
+    workers: int = 1,
+    progress_callback: Callable[[int, int, str | None], None] | None = None,
+) -> list[list[int]]:
+    scored = score_pairs_sharded(
+        values,
+        threshold,
+        similarity_fn,
+        candidate_pairs=candidate_pairs,
+        batch_similarity_fn=batch_similarity_fn,
+        workers=workers,
+        progress_callback=progress_callback,
+    )
+    return cluster_pairs(len(values), ((i, j) for i, j, _ in scored))
+
+
+def blocking_recall(
+    values: list[T],
+    threshold: float,
+    similarity_fn: Callable[[T, T], float],
+    candidate_pairs: Iterable[tuple[int, int]],
+    batch_similarity_fn: BatchSimilarityFn | None = None,
+    max_missed: int = 20,
+    workers: int = 1,
+    progress_callback: Callable[[int, int, str | None], None] | None = None,
+) -> dict:
+    """
+    Compare blocked candidate generation with the exhaustive comparison.
+
+    Recall is measured over pairs whose similarity reaches the threshold.
+    Missed pairs can still end up in the same cluster through other members,
+    so cluster equality is reported separately.
+    """
+    candidate_set = set(candidate_pairs)
+    matched_pairs = score_pairs_sharded(
+        values,
+        threshold,
+        similarity_fn,
+        batch_similarity_fn=batch_similarity_fn,
+        workers=workers,
+        progress_callback=progress_callback,
+        progress_message="Verifying blocking recall",
+    )
+
+    missed = [(i, j, sim) for i, j, sim in matched_pairs if (i, j) not in candidate_set]
+    exhaustive_clusters = cluster_pairs(len(values), ((i, j) for i, j, _ in matched_pairs))
+    blocked_clusters = cluster_pairs(
+        len(values),
+        ((i, j) for i, j, _ in matched_pairs if (i, j) in candidate_set),
+    )
+
+    return {
+        "candidate_pairs": len(candidate_set),
+        "exhaustive_pairs": len(values) * (len(values) - 1) // 2,
+        "matched_pairs": len(matched_pairs),
+        "recalled_pairs": len(matched_pairs) - len(missed),
+        "recall": (len(matched_pairs) - len(missed)) / len(matched_pairs) if matched_pairs else 1.0,
+        "clusters_identical": exhaustive_clusters == blocked_clusters,
+        "missed_pairs": [
+            {"left": i, "right": j, "similarity": sim}
+            for i, j, sim in missed[:max_missed]
+        ],
+    }
@@ -0,0 +1,231 @@
+"""
+Text embeddings for title/abstract and a per-project vector index.
+
+Embedders turn paper texts into L2-normalized float32 vectors:
+
+- "sentence-transformers": a local CPU model (needs the optional
+  sentence-transformers package)
+- "openai-compatible": an /v1/embeddings endpoint, e.g. a local vLLM or
+  Ollama server
+- "hashing": feature hashing of words and word pairs; deterministic and
+  dependency-free (lexical similarity only), used as a stand-in in tests
+
+EmbeddingIndex stores the vectors of one embedder in a memory-mapped NumPy
+matrix under the project's embeddings directory, keyed by a hash of the
+embedded text, so papers shared between steps, reruns and seed sets are only
+embedded once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from llm_clients import llm_client_pool
+from query_search import clean_bib_text
+
+EMBEDDINGS_DIRNAME = "embeddings"
+DEFAULT_HASHING_DIM = 1024
+DEFAULT_SENTENCE_TRANSFORMERS_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Texts per embedding request / encode() batch.
+EMBED_BATCH_SIZE = 64
+# Embedding requests in flight for openai-compatible servers.
+EMBED_CONCURRENCY = 4
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# One lock per index file; steps may run in parallel job workers.
+_index_locks: dict[Path, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+def embedding_text(entry: dict) -> str:
+    """Text embedded for a paper: title and abstract."""
+    title = clean_bib_text(str(entry.get("title", "")))
+    abstract = clean_bib_text(str(entry.get("abstract", "")))
+    return f"{title}\n{abstract}".strip()
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class HashingEmbedder:
+    """Signed feature hashing of word unigrams and bigrams."""
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_PATTERN.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "big")
+                vectors[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        # Sublinear term frequency.
+        np.copyto(vectors, np.sign(vectors) * np.log1p(np.abs(vectors)))
+        return normalize_rows(vectors)
+
+
+@lru_cache(maxsize=2)
+def _load_sentence_transformer(model: str):
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ValueError(
+            "sentence-transformers is not installed; install it or use the hashing / openai-compatible provider"
+        ) from e
+    return SentenceTransformer(model, device="cpu")
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model on CPU (loaded once per process)."""
+
+    def __init__(self, model: str = DEFAULT_SENTENCE_TRANSFORMERS_MODEL):
+        self.model = model
+        self.name = f"st-{model}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        encoder = _load_sentence_transformer(self.model)
+        vectors = encoder.encode(
+            texts,
+            batch_size=EMBED_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OpenAICompatibleEmbedder:
+    """Embeddings from an OpenAI-compatible /v1/embeddings endpoint."""
+
+    def __init__(self, base_url: str, model: str, api_key: str = "dummy"):
+        self.base_url = base_url
+        self.model = model
+        self.api_key = api_key
+        self.name = f"api-{model}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        return llm_client_pool.run(self._embed(texts))
+
+    async def _embed(self, texts: list[str]) -> np.ndarray:
+        client = llm_client_pool.get_client(self.base_url, self.api_key)
+        semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                response = await client.embeddings.create(model=self.model, input=batch)
+            return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+        batches = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        vectors = np.asarray([vector for batch in results for vector in batch], dtype=np.float32)
+        return normalize_rows(vectors)
+
+
+def _index_lock(path: Path) -> threading.Lock:
+    with _index_locks_guard:
+        return _index_locks.setdefault(path, threading.Lock())
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "default"
+
+
+class EmbeddingIndex:
+    """
+    Vectors of one embedder, stored as ``<name>.npy`` (row matrix, opened
+    memory-mapped) and ``<name>.keys.json`` (text key of each row).
+
+    New rows are appended by writing a larger matrix and swapping it in;
+    the keys file is replaced last, so an interrupted write leaves unused
+    rows at worst.
+    """
+
+    def __init__(self, directory: str | Path, embedder):
+        self.directory = Path(directory)
+        self.embedder = embedder
+        slug = _slug(embedder.name)
+        self.matrix_path = self.directory / f"{slug}.npy"
+        self.keys_path = self.directory / f"{slug}.keys.json"
+        self.embedded = 0
+
+    @classmethod
+    def for_project_dir(cls, project_dir: str | Path, embedder) -> EmbeddingIndex:
+        return cls(Path(project_dir) / EMBEDDINGS_DIRNAME, embedder)
+
+    def _load(self) -> tuple[np.ndarray | None, dict[str, int]]:
+        if not self.matrix_path.exists() or not self.keys_path.exists():
+            return None, {}
+        try:
+            with open(self.keys_path, encoding="utf-8") as f:
+                keys = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None, {}
+        if not isinstance(keys, list) or matrix.ndim != 2 or len(keys) > matrix.shape[0]:
+            return None, {}
+        return matrix, {key: row for row, key in enumerate(keys)}
+
+    def _append(self, matrix: np.ndarray | None, rows: dict[str, int], keys: list[str], vectors: np.ndarray) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        old_count = len(rows)
+        if matrix is not None and matrix.shape[1] != vectors.shape[1]:
+            # Different dimension under the same name (e.g. a changed server
+            # model); start over.
+            matrix, old_count, rows = None, 0, {}
+        tmp_matrix = self.matrix_path.with_suffix(".npy.tmp")
+        combined = np.lib.format.open_memmap(
+            tmp_matrix, mode="w+", dtype=np.float32, shape=(old_count + len(keys), vectors.shape[1])
+        )
+        if matrix is not None and old_count:
+            combined[:old_count] = matrix[:old_count]
+        combined[old_count:] = vectors
+        combined.flush()
+        del combined
+        all_keys = [None] * old_count
+        for key, row in rows.items():
+            all_keys[row] = key
+        all_keys.extend(keys)
+        tmp_keys = self.keys_path.with_suffix(".json.tmp")
+        with open(tmp_keys, "w", encoding="utf-8") as f:
+            json.dump(all_keys, f)
+        tmp_matrix.replace(self.matrix_path)
+        tmp_keys.replace(self.keys_path)
+
+    def vectors(self, texts: Iterable[str]) -> np.ndarray:
+        """Normalized vectors for ``texts`` (row i = text i), embedding the missing ones."""
+        texts = list(texts)
+        keys = [text_key(text) for text in texts]
+        with _index_lock(self.matrix_path):
+            matrix, rows = self._load()
+            missing: dict[str, str] = {}
+            for key, text in zip(keys, texts):
+                if key not in rows and key not in missing:
+                    missing[key] = text
+            if missing:
+                new_vectors = self.embedder.embed(list(missing.values()))
+                self.embedded += len(missing)
+                self._append(matrix, rows, list(missing.keys()), new_vectors)
+                matrix, rows = self._load()
+            if matrix is None:
+                return np.zeros((0, 0), dtype=np.float32)
+            return np.asarray(matrix[[rows[key] for key in keys]], dtype=np.float32)
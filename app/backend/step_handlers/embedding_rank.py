@@ -0,0 +1,253 @@
+"""
+Embedding similarity ranking step handler.
+
+Embeds title/abstract of every paper and ranks them by similarity to seed
+papers that were included in earlier human reviews (review.jsonl of AI
+screening steps), optionally plus papers named in the config. Only the top
+ranked papers (and/or those above a similarity threshold) are passed on, so
+a following AI screening step sends far fewer requests to the LLM.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from .base import StepHandler, StepResult, OutputDefinition, Change, ProgressCallback
+from . import register_step_type
+from .ai_screening import LOCAL_LLM_BASE_URL
+from .embedding_index import (
+    DEFAULT_HASHING_DIM,
+    DEFAULT_SENTENCE_TRANSFORMERS_MODEL,
+    EmbeddingIndex,
+    HashingEmbedder,
+    OpenAICompatibleEmbedder,
+    SentenceTransformerEmbedder,
+    embedding_text,
+)
+
+PROVIDERS = ("sentence-transformers", "openai-compatible", "hashing")
+# Works without optional packages or an embedding server.
+DEFAULT_PROVIDER = "hashing"
+SEED_SCOPES = ("project", "all_projects")
+DEFAULT_TOP_K = 200
+# Score = mean similarity to this many closest seeds (less noisy than the max).
+SEED_NEIGHBORS = 3
+# Papers scored per matrix product.
+SCORE_CHUNK_ROWS = 4096
+
+
+def create_embedder(config: dict):
+    provider = str(config.get("provider", DEFAULT_PROVIDER))
+    model = str(config.get("model", "") or "").strip()
+    if provider == "hashing":
+        return HashingEmbedder(DEFAULT_HASHING_DIM)
+    if provider == "openai-compatible":
+        if not model:
+            raise ValueError("Model is required for the openai-compatible provider")
+        base_url = str(config.get("base_url", "") or "").strip() or LOCAL_LLM_BASE_URL
+        return OpenAICompatibleEmbedder(base_url, model)
+    return SentenceTransformerEmbedder(model or DEFAULT_SENTENCE_TRANSFORMERS_MODEL)
+
+
+def load_review_seeds(project_dirs: list[Path]) -> tuple[list[dict], list[str]]:
+    """
+    Entries with a human 'include' decision in review.jsonl files, and the
+    ``project/step`` they came from. The entries are read from the step's
+    input.json.
+    """
+    seeds: dict[str, dict] = {}
+    sources: list[str] = []
+    for project_dir in project_dirs:
+        for review_file in sorted((project_dir / "steps").glob("*/review.jsonl")):
+            included: set[str] = set()
+            with open(review_file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        review = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(review, dict) and review.get("decision") == "include" and review.get("key"):
+                        included.add(review["key"])
+            input_file = review_file.parent / "input.json"
+            if not included or not input_file.exists():
+                continue
+            with open(input_file, encoding="utf-8") as f:
+                entries = json.load(f)
+            found = 0
+            for entry in entries:
+                if entry.get("ID") in included:
+                    text = embedding_text(entry)
+                    if text:
+                        seeds.setdefault(text, entry)
+                        found += 1
+            if found:
+                sources.append(f"{project_dir.name}/{review_file.parent.name}")
+    return list(seeds.values()), sources
+
+
+def seed_scores(vectors: np.ndarray, seed_vectors: np.ndarray) -> np.ndarray:
+    """Mean cosine similarity of each row to its closest seeds."""
+    neighbors = min(SEED_NEIGHBORS, len(seed_vectors))
+    scores = np.zeros(len(vectors), dtype=np.float32)
+    for start in range(0, len(vectors), SCORE_CHUNK_ROWS):
+        similarities = vectors[start:start + SCORE_CHUNK_ROWS] @ seed_vectors.T
+        closest = np.partition(similarities, -neighbors, axis=1)[:, -neighbors:]
+        scores[start:start + SCORE_CHUNK_ROWS] = closest.mean(axis=1)
+    return scores
+
+
+@register_step_type
+class EmbeddingRankHandler(StepHandler):
+    """Rank papers by embedding similarity to previously included papers."""
+
+    step_type = "embedding-rank"
+    name = "Embedding Ranking"
+    description = "Rank papers by similarity to human-included seed papers and pass only the top ones on."
+    icon = "Sparkles"
+    output_definitions = [
+        OutputDefinition(
+            name="passed",
+            description="Most similar papers, in rank order (top-k and/or above the score threshold)",
+            required=True,
+        ),
+        OutputDefinition(
+            name="removed",
+            description="Papers ranked below the cut-off",
+            required=True,
+        ),
+    ]
+
+    @classmethod
+    def get_config_schema(cls) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "provider": {
+                    "type": "string",
+                    "enum": list(PROVIDERS),
+                    "default": DEFAULT_PROVIDER,
+                    "description": "Embedding backend (hashing = lexical, no model; sentence-transformers needs the optional package)",
+                },
+                "model": {
+                    "type": "string",
+                    "default": DEFAULT_SENTENCE_TRANSFORMERS_MODEL,
+                    "description": "Embedding model (sentence-transformers name or server model id; unused for hashing)",
+                },
+                "base_url": {
+                    "type": "string",
+                    "default": LOCAL_LLM_BASE_URL,
+                    "description": "Embedding server base URL (used when provider=openai-compatible)",
+                },
+                "seed_scope": {
+                    "type": "string",
+                    "enum": list(SEED_SCOPES),
+                    "default": "all_projects",
+                    "description": "Where to take human 'include' decisions (review.jsonl) from as seed papers",
+                },
+                "seed_keys": {
+                    "type": "string",
+                    "default": "",
+                    "description": "Additional seed papers: BibTeX keys of input entries, comma-separated",
+                },
+                "top_k": {
+                    "type": "integer",
+                    "default": DEFAULT_TOP_K,
+                    "minimum": 0,
+                    "description": "Number of most similar papers to pass on (0 = no limit)",
+                },
+                "min_score": {
+                    "type": "number",
+                    "minimum": 0.0,
+                    "maximum": 1.0,
+                    "default": 0.0,
+                    "description": "Minimum similarity to pass on (0 = no threshold)",
+                },
+            },
+        }
+
+    def run(
+        self,
+        input_entries: list[dict],
+        config: dict,
+        progress_callback: ProgressCallback | None = None,
+    ) -> StepResult:
+        step_dir = config.get("_step_dir")
+        if not step_dir:
+            raise ValueError("Step directory is required for the embedding index")
+        project_dir = Path(step_dir).parent.parent
+        top_k = max(int(config.get("top_k", DEFAULT_TOP_K) or 0), 0)
+        min_score = float(config.get("min_score", 0.0) or 0.0)
+        seed_scope = str(config.get("seed_scope", "all_projects"))
+        embedder = create_embedder(config)
+        index = EmbeddingIndex.for_project_dir(project_dir, embedder)
+
+        if seed_scope == "project":
+            seed_projects = [project_dir]
+        else:
+            seed_projects = sorted(path for path in project_dir.parent.iterdir() if (path / "steps").is_dir())
+        seeds, seed_sources = load_review_seeds(seed_projects)
+        seed_keys = [key.strip() for key in str(config.get("seed_keys", "") or "").split(",") if key.strip()]
+        if seed_keys:
+            wanted = set(seed_keys)
+            seeds.extend(entry for entry in input_entries if entry.get("ID") in wanted)
+            seed_sources.append("seed_keys")
+        if not seeds:
+            raise ValueError("No seed papers: review papers in an AI screening step or set seed_keys")
+
+        total = len(input_entries)
+        if progress_callback:
+            progress_callback(0, total, "Embedding papers")
+        texts = [embedding_text(entry) for entry in input_entries]
+        vectors = index.vectors(texts)
+        seed_vectors = index.vectors(embedding_text(entry) for entry in seeds)
+        if progress_callback:
+            progress_callback(total, total, "Ranking papers")
+
+        scores = seed_scores(vectors, seed_vectors) if total else np.zeros(0, dtype=np.float32)
+        # Stable sort keeps input order among equal scores.
+        order = np.argsort(-scores, kind="stable")
+        ranks = np.empty(total, dtype=np.int64)
+        ranks[order] = np.arange(1, total + 1)
+
+        selected = scores >= min_score if min_score > 0 else np.ones(total, dtype=bool)
+        if top_k:
+            selected &= ranks <= top_k
+
+        passed = [input_entries[position] for position in order if selected[position]]
+        removed = [input_entries[position] for position in order if not selected[position]]
+        changes = []
+        for position, entry in enumerate(input_entries):
+            changes.append(Change(
+                key=entry.get("ID", "unknown"),
+                action="keep" if selected[position] else "remove",
+                reason="similar_to_seeds" if selected[position] else "low_similarity",
+                details={"score": round(float(scores[position]), 4), "rank": int(ranks[position])},
+            ))
+
+        return StepResult(
+            outputs={
+                "passed": passed,
+                "removed": removed,
+            },
+            changes=changes,
+            details={
+                "total_input": total,
+                "passed_count": len(passed),
+                "removed_count": len(removed),
+                "embedder": embedder.name,
+                "embedded_count": index.embedded,
+                "seed_count": len(seeds),
+                "seed_sources": seed_sources,
+                "top_k": top_k,
+                "min_score": min_score,
+                "cutoff_score": round(float(scores[order[len(passed) - 1]]), 4) if passed else None,
+                "score_stats": {
+                    "min": round(float(scores.min()), 4),
+                    "median": round(float(np.median(scores)), 4),
+                    "max": round(float(scores.max()), 4),
+                } if total else None,
+            },
+        )
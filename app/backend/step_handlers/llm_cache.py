@@ -0,0 +1,131 @@
+"""
+Persistent cache of LLM screening responses.
+
+Responses are stored in a SQLite file shared by all projects, keyed by a
+hash of everything that determines the answer: model, rules text, reason
+code table, prompt version and the paper fields sent to the model. Re-running
+a step (or screening the same paper in another project) with unchanged
+inputs reuses the stored decision instead of calling the model again.
+Least recently used rows are evicted once the store exceeds its size limit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCREENING_DIR = Path(__file__).resolve().parent.parent.parent.parent / "screening"
+DEFAULT_LLM_CACHE_PATH = SCREENING_DIR / ".cache" / "llm_responses.sqlite"
+LLM_CACHE_ENV = "LLM_CACHE_PATH"
+LLM_CACHE_MAX_MB_ENV = "LLM_CACHE_MAX_MB"
+DEFAULT_LLM_CACHE_MAX_MB = 256
+
+
+def get_llm_cache_path() -> Path:
+    env_path = os.getenv(LLM_CACHE_ENV, "").strip()
+    if env_path:
+        return Path(env_path).expanduser().resolve()
+    return DEFAULT_LLM_CACHE_PATH
+
+
+def get_llm_cache_max_bytes() -> int:
+    raw = os.getenv(LLM_CACHE_MAX_MB_ENV, "").strip()
+    try:
+        value = float(raw) if raw else DEFAULT_LLM_CACHE_MAX_MB
+    except ValueError:
+        value = DEFAULT_LLM_CACHE_MAX_MB
+    return max(int(value * 1024 * 1024), 0)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def screening_cache_key(model: str, rules_hash: str, reason_codes_hash: str, prompt_version: int, paper: dict) -> str:
+    """Cache key for one paper screened with the given model and prompt inputs."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "rules": rules_hash,
+            "reason_codes": reason_codes_hash,
+            "prompt_version": prompt_version,
+            "paper": paper,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return content_hash(payload)
+
+
+class LLMResponseCache:
+    """SQLite-backed key -> JSON response store with LRU size eviction."""
+
+    def __init__(self, path: Path | None = None, max_bytes: int | None = None):
+        self.path = path or get_llm_cache_path()
+        self.max_bytes = get_llm_cache_max_bytes() if max_bytes is None else max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        try:
+            value = json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+        return value if isinstance(value, dict) else None
+
+    def put(self, key: str, value: dict) -> None:
+        text = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._lock, self._conn:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        # Other processes may share the file, so recount before evicting.
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # Drop least recently used rows until the store is back under 90% of the limit.
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self._total_bytes = total
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,263 @@
+"""
+Concurrency control and retries for LLM requests.
+
+A fixed number of requests in flight either leaves a local vLLM server idle
+or queues requests on it until they time out. ConcurrencyLimiter replaces the
+plain semaphore used by AI screening: in adaptive mode it starts small, grows
+the limit while request latency stays near the lowest latency seen (slow
+start, then additive increase) and cuts it multiplicatively when latency
+climbs past the target or the server answers 429/5xx. The limit over time is
+kept as a timeline for the step details.
+
+Failed requests are classified (overload, invalid response, fatal); the
+first two are retried with jittered exponential backoff.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+# Requests in flight when an adaptive run starts.
+DEFAULT_INITIAL_CONCURRENCY = 4
+# Latency above this multiple of the lowest smoothed latency counts as congestion.
+DEFAULT_LATENCY_TOLERANCE = 2.0
+# Factor applied to the limit on latency congestion / on 429, 5xx and timeouts.
+LATENCY_BACKOFF = 0.9
+ERROR_BACKOFF = 0.5
+# Smoothing factor for the latency average.
+LATENCY_EWMA_ALPHA = 0.2
+# Timeline points kept (older points are thinned out).
+MAX_TIMELINE_POINTS = 500
+# Minimum seconds between timeline points while the limit only grows.
+TIMELINE_INTERVAL_SEC = 1.0
+# Retries after the first attempt, and the backoff range in seconds.
+DEFAULT_MAX_RETRIES = 4
+RETRY_BASE_DELAY_SEC = 1.0
+RETRY_MAX_DELAY_SEC = 30.0
+# Shortest wait before a retry, so a jitter draw near 0 does not retry at once.
+RETRY_MIN_DELAY_SEC = 0.25
+
+
+def is_overload_error(error: Exception) -> bool:
+    """True for errors that signal an overloaded server (429, 5xx, timeouts)."""
+    if isinstance(error, (APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Error class of a failed request:
+
+    - "overload": 429, 5xx, timeouts and connection errors (retried, and the
+      concurrency limit is reduced)
+    - "invalid_response": the server answered but the content could not be
+      used (empty or unparsable JSON; retried)
+    - "fatal": other API errors such as 400/401/404 (not retried)
+    """
+    if is_overload_error(error):
+        return "overload"
+    if isinstance(error, APIStatusError):
+        return "overload" if error.status_code in (408, 409) else "fatal"
+    if isinstance(error, ValueError):
+        return "invalid_response"
+    return "fatal"
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = DEFAULT_MAX_RETRIES
+    base_delay: float = RETRY_BASE_DELAY_SEC
+    max_delay: float = RETRY_MAX_DELAY_SEC
+    min_delay: float = RETRY_MIN_DELAY_SEC
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (0-based): full
+        jitter over an exponentially growing window, or the server's
+        Retry-After when it sends a positive one. Never less than min_delay.
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                seconds = float(retry_after)
+            except ValueError:
+                seconds = 0.0
+            # "Retry-After: 0" would retry an overloaded server at once; back off instead.
+            if seconds > 0:
+                return min(max(seconds, self.min_delay), self.max_delay)
+        window = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return max(random.uniform(0, window), min(self.min_delay, window))
+
+
+class ConcurrencyLimiter:
+    """
+    Async context manager limiting requests in flight.
+
+    With ``adaptive=False`` it behaves like ``asyncio.Semaphore(max_limit)``.
+    Callers report each request with record_success(latency_sec) or
+    record_failure(error) while holding the slot.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int | None = None,
+        adaptive: bool = True,
+        latency_target_ms: float | None = None,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+    ):
+        self.max_limit = max(int(max_limit), 1)
+        self.min_limit = min(max(int(min_limit), 1), self.max_limit)
+        self.adaptive = adaptive
+        if not adaptive:
+            initial = self.max_limit
+        elif initial_limit is None:
+            initial = DEFAULT_INITIAL_CONCURRENCY
+        else:
+            initial = initial_limit
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.initial_limit = int(self.limit)
+        self.peak_limit = self.initial_limit
+        self.latency_target_ms = latency_target_ms or None
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.slow_start = adaptive
+        self.smoothed_latency: float | None = None
+        self.min_latency: float | None = None
+        self.latency_decreases = 0
+        self.error_decreases = 0
+        self.requests = 0
+        self.failures = 0
+
+        self._condition: asyncio.Condition | None = None
+        self._started = time.monotonic()
+        self._last_decrease = 0.0
+        self._last_point = -math.inf
+        self.timeline: list[dict] = []
+        self._add_point("start")
+
+    @property
+    def current_limit(self) -> int:
+        return max(int(self.limit), self.min_limit)
+
+    async def __aenter__(self) -> ConcurrencyLimiter:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            free = self.current_limit - self.in_flight
+            if free > 0:
+                self._condition.notify(free)
+
+    def latency_target(self) -> float | None:
+        """Latency (seconds) above which the limit is reduced."""
+        if self.latency_target_ms:
+            return self.latency_target_ms / 1000
+        if self.min_latency is None:
+            return None
+        return self.min_latency * self.latency_tolerance
+
+    def record_success(self, latency_sec: float) -> None:
+        self.requests += 1
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency_sec
+        else:
+            self.smoothed_latency += LATENCY_EWMA_ALPHA * (latency_sec - self.smoothed_latency)
+        if self.min_latency is None or self.smoothed_latency < self.min_latency:
+            self.min_latency = self.smoothed_latency
+        if not self.adaptive:
+            return
+
+        target = self.latency_target()
+        if target is not None and self.smoothed_latency > target:
+            if self._decrease(LATENCY_BACKOFF):
+                self.latency_decreases += 1
+                self._add_point("latency")
+            return
+        # Only grow while the current limit is actually used.
+        if self.in_flight < self.current_limit - 1:
+            return
+        if self.slow_start:
+            self.limit += 1
+        else:
+            self.limit += 1 / self.limit
+        self.limit = min(self.limit, float(self.max_limit))
+        self.peak_limit = max(self.peak_limit, self.current_limit)
+        self._add_point()
+
+    def record_failure(self, error: Exception) -> None:
+        self.requests += 1
+        self.failures += 1
+        if self.adaptive and is_overload_error(error) and self._decrease(ERROR_BACKOFF):
+            self.error_decreases += 1
+            self._add_point("error")
+
+    def _decrease(self, factor: float) -> bool:
+        # At most one decrease per round trip, so a burst of slow responses
+        # from the same window counts once.
+        now = time.monotonic()
+        if now - self._last_decrease < max(self.smoothed_latency or 0.0, 0.1):
+            return False
+        self._last_decrease = now
+        self.slow_start = False
+        self.limit = max(self.limit * factor, float(self.min_limit))
+        return True
+
+    def _add_point(self, event: str | None = None) -> None:
+        now = time.monotonic() - self._started
+        if event is None and now - self._last_point < TIMELINE_INTERVAL_SEC:
+            return
+        self._last_point = now
+        point = {
+            "t": round(now, 2),
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.smoothed_latency * 1000) if self.smoothed_latency is not None else None,
+        }
+        if event:
+            point["event"] = event
+        self.timeline.append(point)
+        if len(self.timeline) > MAX_TIMELINE_POINTS:
+            # Keep the first point and every other one after it.
+            self.timeline = self.timeline[:1] + self.timeline[2::2]
+
+    def summary(self) -> dict:
+        """Concurrency statistics for step details."""
+        self._add_point("end")
+        target = self.latency_target()
+        return {
+            "mode": "adaptive" if self.adaptive else "fixed",
+            "initial": self.initial_limit,
+            "min": self.min_limit,
+            "max": self.max_limit,
+            "final": self.current_limit,
+            "peak_limit": self.peak_limit,
+            "peak_in_flight": self.peak_in_flight,
+            "latency_target_ms": round(target * 1000) if target is not None else None,
+            "min_latency_ms": round(self.min_latency * 1000) if self.min_latency is not None else None,
+            "latency_decreases": self.latency_decreases,
+            "error_decreases": self.error_decreases,
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeline": self.timeline,
+        }
@@ -0,0 +1,147 @@
+"""
+Load balancing of LLM requests across several OpenAI-compatible endpoints.
+
+Each request goes to the healthy endpoint with the fewest outstanding
+requests (ties rotate), so faster servers naturally take a larger share.
+An endpoint that fails several requests in a row (overload or connection
+errors) is ejected for a backoff period that doubles on each ejection; once
+it expires the endpoint is probed (see llm_clients.probe_local_server) and
+reinstated if it answers. If every endpoint is ejected the one that comes
+back soonest is used, so requests never wait on the balancer itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from openai import AsyncOpenAI
+
+from llm_clients import probe_local_server
+from .llm_concurrency import is_overload_error
+
+# Consecutive failed requests before an endpoint is ejected.
+EJECT_AFTER_FAILURES = 5
+# Ejection period; doubles with every further ejection of the same endpoint.
+EJECT_BASE_SEC = 10.0
+EJECT_MAX_SEC = 300.0
+
+
+@dataclass
+class Endpoint:
+    base_url: str | None
+    client: AsyncOpenAI
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejected_until: float | None = None
+    probing: bool = field(default=False, repr=False)
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until is not None
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.base_url,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "healthy": not self.ejected,
+        }
+
+
+class EndpointBalancer:
+    """Least-outstanding-requests balancer with failure ejection."""
+
+    def __init__(self, endpoints: list[tuple[str | None, AsyncOpenAI]]):
+        if not endpoints:
+            raise ValueError("At least one endpoint is required")
+        self.endpoints = [Endpoint(base_url=url, client=client) for url, client in endpoints]
+        self._rotation = itertools.count()
+        # The event loop only keeps weak references to tasks.
+        self._probes: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    async def check_health(self) -> None:
+        """Probe all endpoints and eject the ones that do not answer."""
+        results = await asyncio.gather(*(
+            probe_local_server(endpoint.base_url) for endpoint in self.endpoints if endpoint.base_url
+        ))
+        for result in results:
+            if not result["connected"]:
+                endpoint = next(e for e in self.endpoints if e.base_url == result["url"])
+                self._eject(endpoint)
+
+    def acquire(self) -> Endpoint:
+        """Pick an endpoint for one request; pair with release()."""
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            if endpoint.ejected and endpoint.ejected_until <= now and not endpoint.probing:
+                self._start_probe(endpoint)
+
+        healthy = [endpoint for endpoint in self.endpoints if not endpoint.ejected]
+        if healthy:
+            offset = next(self._rotation)
+            rotated = healthy[offset % len(healthy):] + healthy[:offset % len(healthy)]
+            chosen = min(rotated, key=lambda endpoint: endpoint.outstanding)
+        else:
+            chosen = min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)
+        chosen.outstanding += 1
+        chosen.requests += 1
+        return chosen
+
+    def release(self, endpoint: Endpoint, error: Exception | None = None) -> None:
+        endpoint.outstanding -= 1
+        if error is None:
+            endpoint.consecutive_failures = 0
+            if endpoint.ejected:
+                # A request succeeded anyway (all endpoints were ejected).
+                endpoint.ejected_until = None
+            return
+        endpoint.failures += 1
+        if not is_overload_error(error):
+            return
+        endpoint.consecutive_failures += 1
+        if (
+            endpoint.consecutive_failures >= EJECT_AFTER_FAILURES
+            and not endpoint.ejected
+            and len(self.endpoints) > 1
+        ):
+            self._eject(endpoint)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        endpoint.ejections += 1
+        period = min(EJECT_BASE_SEC * 2 ** (endpoint.ejections - 1), EJECT_MAX_SEC)
+        endpoint.ejected_until = time.monotonic() + period
+        endpoint.consecutive_failures = 0
+
+    def _start_probe(self, endpoint: Endpoint) -> None:
+        endpoint.probing = True
+
+        async def probe() -> None:
+            try:
+                result = await probe_local_server(endpoint.base_url)
+            finally:
+                endpoint.probing = False
+            if result["connected"]:
+                endpoint.ejected_until = None
+            else:
+                self._eject(endpoint)
+
+        if endpoint.base_url is None:
+            endpoint.probing = False
+            endpoint.ejected_until = None
+            return
+        task = asyncio.get_running_loop().create_task(probe())
+        self._probes.add(task)
+        task.add_done_callback(self._probes.discard)
+
+    def summary(self) -> list[dict]:
+        return [endpoint.to_dict() for endpoint in self.endpoints]
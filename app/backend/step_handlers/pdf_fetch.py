@@ -2,21 +2,36 @@
 PDF fetch step handler.
 
 This step resolves and caches PDF files in a shared library outside project
-directories, primarily using DOI-based lookup.
+directories, primarily using DOI-based lookup. Web lookups and downloads for
+several entries run in parallel (with per-host rate limits and circuit
+breakers, see host_limiter); results are recorded in input order.
 """
 
 from __future__ import annotations
 
+import itertools
 import os
 import re
+import threading
 import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from html import unescape
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 from urllib.parse import quote, unquote, urljoin, urlparse
 
 import httpx
 
+from host_limiter import (
+    DEFAULT_PER_HOST_BURST,
+    DEFAULT_PER_HOST_CONCURRENCY,
+    DEFAULT_PER_HOST_INTERVAL_SEC,
+    HostLimiter,
+)
+from host_limiter_httpx import HostLimitedTransport
+from metadata_cache import MetadataCache
 from pdf_library import (
     SCREENING_DIR,
     canonical_key_for_entry,
@@ -29,7 +44,7 @@ from pdf_library import (
     save_pdf_index,
     guess_title,
 )
-from .base import StepHandler, StepResult, OutputDefinition, Change, ProgressCallback
+from .base import StreamingStepHandler, StepSink, OutputDefinition, Change, ProgressCallback
 from . import register_step_type
 
 
@@ -48,6 +63,26 @@ META_CITATION_PDF_RE_2 = re.compile(
 HTML_HREF_RE = re.compile(r'href=["\']([^"\']+)["\']', re.IGNORECASE)
 IEEE_HTML_ARNUMBER_RE = re.compile(r'["\']arnumber["\']\s*:\s*["\']?(\d+)', re.IGNORECASE)
 BROWSER_PROFILE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+# Save the PDF library index every N entries so an interrupted run keeps
+# the records of PDFs it already resolved.
+PDF_INDEX_SAVE_INTERVAL = 25
+# Entries resolved from web sources in parallel.
+DEFAULT_PDF_FETCH_CONCURRENCY = 8
+# Entries submitted ahead of the next one to emit, per worker.
+PDF_FETCH_WINDOW_FACTOR = 4
+# Metadata APIs queried per DOI (OpenAlex, Semantic Scholar, Unpaywall).
+PDF_LOOKUP_PROVIDERS = 3
+OPENALEX_API_URL = "https://api.openalex.org"
+SEMANTIC_SCHOLAR_API_URL = "https://api.semanticscholar.org"
+UNPAYWALL_API_URL = "https://api.unpaywall.org"
+# Input entries read ahead whose DOIs are looked up with bulk API requests.
+METADATA_PREFETCH_BLOCK = 200
+# DOIs per OpenAlex filter request (OR-filter value limit) and per Semantic
+# Scholar /paper/batch request.
+OPENALEX_BULK_CHUNK = 50
+SEMANTIC_SCHOLAR_BULK_CHUNK = 500
+# OpenAlex work fields read for PDF candidates (the full work is large).
+OPENALEX_SELECT = "doi,open_access,primary_location,best_oa_location,locations"
 
 
 def is_acm_doi(doi: str | None) -> bool:
@@ -593,8 +628,8 @@ def extract_file_field_candidates(raw: str) -> list[str]:
 def resolve_local_pdf_candidates(entry: dict[str, Any], project_id: str | None) -> list[Path]:
     raw_candidates: list[str] = []
 
-    for field in ("file", "pdf", "fulltext", "local_pdf"):
-        raw_value = entry.get(field)
+    for field_name in ("file", "pdf", "fulltext", "local_pdf"):
+        raw_value = entry.get(field_name)
         if not raw_value:
             continue
         raw_candidates.extend(extract_file_field_candidates(str(raw_value)))
@@ -643,15 +678,13 @@ def resolve_local_pdf_candidates(entry: dict[str, Any], project_id: str | None)
     return resolved
 
 
-def collect_candidate_urls(
-    client: httpx.Client,
+def add_static_candidates(
+    candidates: list[tuple[str, str]],
+    seen: set[str],
     entry: dict[str, Any],
     doi: str | None,
-    unpaywall_email: str | None,
-) -> list[tuple[str, str]]:
-    candidates: list[tuple[str, str]] = []
-    seen: set[str] = set()
-
+) -> None:
+    """Candidates known without any lookup: entry URL/eprint, DOI resolver, publisher PDFs."""
     entry_url = str(entry.get("url") or "").strip()
     if entry_url:
         arxiv_url = arxiv_pdf_url(entry_url)
@@ -668,73 +701,258 @@ def collect_candidate_urls(
             add_url_candidate(candidates, seen, arxiv_url, "entry_eprint")
 
     if not doi:
-        return candidates
+        return
 
     doi_url = f"https://doi.org/{quote(doi, safe='')}"
     add_url_candidate(candidates, seen, doi_url, "doi_resolver")
     add_direct_publisher_candidates(candidates, seen, doi)
 
+
+def lookup_metadata(
+    client: httpx.Client,
+    cache: MetadataCache | None,
+    provider: str,
+    doi: str,
+    url: str,
+    params: dict[str, str] | None = None,
+) -> Any:
+    """JSON body of a metadata API response (None if not found), via the cache."""
+    if cache is not None:
+        cached = cache.get(provider, doi)
+        if cached is not None:
+            return cached.data
+    resp = client.get(url, params=params, timeout=10.0)
+    data = resp.json() if resp.status_code == 200 else None
+    if cache is not None:
+        cache.put(provider, doi, resp.status_code, data)
+    return data
+
+
+def openalex_candidate_urls(
+    client: httpx.Client,
+    doi: str,
+    cache: MetadataCache | None = None,
+) -> list[tuple[str | None, str]]:
+    found: list[tuple[str | None, str]] = []
     try:
-        # OpenAlex
-        resp = client.get(
-            f"https://api.openalex.org/works/https://doi.org/{quote(doi, safe='')}",
-            timeout=10.0,
+        data = lookup_metadata(
+            client,
+            cache,
+            "openalex",
+            doi,
+            f"{OPENALEX_API_URL}/works/https://doi.org/{quote(doi, safe='')}",
+            params={"select": OPENALEX_SELECT},
         )
-        if resp.status_code == 200:
-            data = resp.json()
-            oa = data.get("open_access", {}) if isinstance(data, dict) else {}
-            add_url_candidate(candidates, seen, oa.get("oa_url"), "openalex")
-            primary = data.get("primary_location", {}) if isinstance(data, dict) else {}
-            add_url_candidate(candidates, seen, primary.get("pdf_url"), "openalex")
-            best = data.get("best_oa_location", {}) if isinstance(data, dict) else {}
-            add_url_candidate(candidates, seen, best.get("pdf_url"), "openalex")
-            locations = data.get("locations", []) if isinstance(data, dict) else []
+        if isinstance(data, dict):
+            oa = data.get("open_access", {})
+            found.append((oa.get("oa_url"), "openalex"))
+            primary = data.get("primary_location", {})
+            found.append((primary.get("pdf_url"), "openalex"))
+            best = data.get("best_oa_location", {})
+            found.append((best.get("pdf_url"), "openalex"))
+            locations = data.get("locations", [])
             if isinstance(locations, list):
                 for loc in locations:
                     if not isinstance(loc, dict):
                         continue
-                    add_url_candidate(candidates, seen, loc.get("pdf_url"), "openalex")
+                    found.append((loc.get("pdf_url"), "openalex"))
     except Exception:
         pass
+    return found
+
 
+def semantic_scholar_candidate_urls(
+    client: httpx.Client,
+    doi: str,
+    cache: MetadataCache | None = None,
+) -> list[tuple[str | None, str]]:
+    found: list[tuple[str | None, str]] = []
+    try:
+        # No API key path
+        data = lookup_metadata(
+            client,
+            cache,
+            "semantic_scholar",
+            doi,
+            f"{SEMANTIC_SCHOLAR_API_URL}/graph/v1/paper/DOI:{quote(doi, safe='')}",
+            params={"fields": "openAccessPdf,url"},
+        )
+        if isinstance(data, dict):
+            open_access_pdf = data.get("openAccessPdf") or {}
+            if isinstance(open_access_pdf, dict):
+                found.append((open_access_pdf.get("url"), "semantic_scholar"))
+            found.append((data.get("url"), "semantic_scholar"))
+    except Exception:
+        pass
+    return found
+
+
+def unpaywall_candidate_urls(
+    client: httpx.Client,
+    doi: str,
+    email: str,
+    cache: MetadataCache | None = None,
+) -> list[tuple[str | None, str]]:
+    found: list[tuple[str | None, str]] = []
+    try:
+        data = lookup_metadata(
+            client,
+            cache,
+            "unpaywall",
+            doi,
+            f"{UNPAYWALL_API_URL}/v2/{quote(doi, safe='')}",
+            params={"email": email},
+        )
+        if isinstance(data, dict):
+            best = data.get("best_oa_location") or {}
+            if isinstance(best, dict):
+                found.append((best.get("url_for_pdf"), "unpaywall"))
+            locations = data.get("oa_locations", [])
+            if isinstance(locations, list):
+                for loc in locations:
+                    if isinstance(loc, dict):
+                        found.append((loc.get("url_for_pdf"), "unpaywall"))
+    except Exception:
+        pass
+    return found
+
+
+def openalex_bulk_prefetch(client: httpx.Client, dois: list[str], cache: MetadataCache) -> int:
+    """
+    Look up several DOIs with one OpenAlex filter request and cache the works
+    found. DOIs missing from the result are left to the per-entry lookup,
+    since the filter may not match unusual DOIs. Returns 1 if a request was
+    sent.
+    """
+    # '|' and ',' separate filter values; such DOIs are looked up one by one.
+    dois = [doi for doi in dois if "|" not in doi and "," not in doi]
+    if not dois:
+        return 0
     try:
-        # Semantic Scholar (no API key path)
         resp = client.get(
-            f"https://api.semanticscholar.org/graph/v1/paper/DOI:{quote(doi, safe='')}",
+            f"{OPENALEX_API_URL}/works",
+            params={"filter": "doi:" + "|".join(dois), "per_page": "200", "select": OPENALEX_SELECT},
+            timeout=30.0,
+        )
+        if resp.status_code != 200:
+            return 1
+        data = resp.json()
+        works = data.get("results", []) if isinstance(data, dict) else []
+        wanted = set(dois)
+        for work in works if isinstance(works, list) else []:
+            if not isinstance(work, dict):
+                continue
+            doi = normalize_doi(work.get("doi"))
+            if doi in wanted:
+                cache.prefetched("openalex", doi, 200, work)
+    except Exception:
+        pass
+    return 1
+
+
+def semantic_scholar_bulk_prefetch(client: httpx.Client, dois: list[str], cache: MetadataCache) -> int:
+    """
+    Look up several DOIs with one Semantic Scholar /paper/batch request; the
+    response is aligned with the requested ids (null = not found). Returns 1
+    if a request was sent.
+    """
+    if not dois:
+        return 0
+    try:
+        resp = client.post(
+            f"{SEMANTIC_SCHOLAR_API_URL}/graph/v1/paper/batch",
             params={"fields": "openAccessPdf,url"},
-            timeout=10.0,
+            json={"ids": [f"DOI:{doi}" for doi in dois]},
+            timeout=30.0,
         )
-        if resp.status_code == 200:
-            data = resp.json()
-            if isinstance(data, dict):
-                open_access_pdf = data.get("openAccessPdf") or {}
-                if isinstance(open_access_pdf, dict):
-                    add_url_candidate(candidates, seen, open_access_pdf.get("url"), "semantic_scholar")
-                add_url_candidate(candidates, seen, data.get("url"), "semantic_scholar")
+        if resp.status_code != 200:
+            return 1
+        papers = resp.json()
+        if not isinstance(papers, list) or len(papers) != len(dois):
+            return 1
+        for doi, paper in zip(dois, papers):
+            if isinstance(paper, dict):
+                cache.prefetched("semantic_scholar", doi, 200, paper)
+            elif paper is None:
+                cache.prefetched("semantic_scholar", doi, 404)
     except Exception:
         pass
+    return 1
+
+
+def prefetch_metadata(
+    client: httpx.Client,
+    dois: Iterable[str],
+    cache: MetadataCache,
+    pool: ThreadPoolExecutor,
+) -> int:
+    """
+    Fill the cache for DOIs it does not answer yet, with chunked bulk
+    requests to OpenAlex and Semantic Scholar (run side by side on
+    ``pool``), so the per-entry lookups mostly hit the cache. Unpaywall has
+    no bulk endpoint and is still queried per DOI. Returns the number of
+    requests sent.
+    """
+    dois = list(dict.fromkeys(dois))
+    chunks = []
+    for provider, prefetch, size in (
+        ("openalex", openalex_bulk_prefetch, OPENALEX_BULK_CHUNK),
+        ("semantic_scholar", semantic_scholar_bulk_prefetch, SEMANTIC_SCHOLAR_BULK_CHUNK),
+    ):
+        missing = [doi for doi in dois if not cache.contains(provider, doi)]
+        for start in range(0, len(missing), size):
+            chunks.append((prefetch, missing[start:start + size]))
+    futures = [pool.submit(prefetch, client, chunk, cache) for prefetch, chunk in chunks]
+    return sum(future.result() for future in futures)
+
+
+class ProviderLookups:
+    """
+    OpenAlex / Semantic Scholar / Unpaywall lookups for one DOI.
+
+    With a pool the lookups start at once and run side by side, so an entry
+    waits for the slowest provider instead of all of them in turn; results()
+    merges them in the fixed order above either way.
+    """
+
+    def __init__(
+        self,
+        client: httpx.Client,
+        doi: str | None,
+        unpaywall_email: str | None,
+        pool: ThreadPoolExecutor | None = None,
+        cache: MetadataCache | None = None,
+    ):
+        calls = []
+        if doi:
+            calls.append(lambda: openalex_candidate_urls(client, doi, cache))
+            calls.append(lambda: semantic_scholar_candidate_urls(client, doi, cache))
+            if unpaywall_email:
+                calls.append(lambda: unpaywall_candidate_urls(client, doi, unpaywall_email, cache))
+        self._futures = [pool.submit(call) for call in calls] if pool is not None else None
+        self._results = [call() for call in calls] if pool is None else None
+
+    def results(self) -> list[tuple[str | None, str]]:
+        """Candidates from all providers in priority order (waits for pending lookups)."""
+        if self._results is None:
+            self._results = [future.result() for future in self._futures]
+        return [candidate for result in self._results for candidate in result]
 
-    if unpaywall_email:
-        try:
-            resp = client.get(
-                f"https://api.unpaywall.org/v2/{quote(doi, safe='')}",
-                params={"email": unpaywall_email},
-                timeout=10.0,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if isinstance(data, dict):
-                    best = data.get("best_oa_location") or {}
-                    if isinstance(best, dict):
-                        add_url_candidate(candidates, seen, best.get("url_for_pdf"), "unpaywall")
-                    locations = data.get("oa_locations", [])
-                    if isinstance(locations, list):
-                        for loc in locations:
-                            if isinstance(loc, dict):
-                                add_url_candidate(candidates, seen, loc.get("url_for_pdf"), "unpaywall")
-        except Exception:
-            pass
 
+def collect_candidate_urls(
+    client: httpx.Client,
+    entry: dict[str, Any],
+    doi: str | None,
+    unpaywall_email: str | None,
+    lookup_pool: ThreadPoolExecutor | None = None,
+    metadata_cache: MetadataCache | None = None,
+) -> list[tuple[str, str]]:
+    candidates: list[tuple[str, str]] = []
+    seen: set[str] = set()
+    add_static_candidates(candidates, seen, entry, doi)
+    lookups = ProviderLookups(client, doi, unpaywall_email, lookup_pool, metadata_cache)
+    for url, provider in lookups.results():
+        add_url_candidate(candidates, seen, url, provider)
     return candidates
 
 
@@ -781,12 +999,191 @@ def fetch_pdf_bytes(
     return body, str(resp.url), content_type
 
 
+@dataclass
+class OnlineResolution:
+    """Result of resolving one entry from web sources (worker thread)."""
+
+    candidates: list[tuple[str, str]]
+    attempted_providers: set[str]
+    canonical_key: str | None
+    pdf_path: Path | None = None
+    source_url: str | None = None
+    content_type: str | None = None
+    provider: str | None = None
+
+
+def write_pdf_file(target_path: Path, body: bytes) -> None:
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target_path.with_name(f"{target_path.name}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    tmp_path.replace(target_path)
+
+
+def resolve_pdf_online(
+    client: httpx.Client,
+    entry: dict[str, Any],
+    entry_key: str,
+    doi: str | None,
+    canonical_key: str | None,
+    unpaywall_email: str | None,
+    user_agent: str,
+    max_pdf_mb: int,
+    timeout_sec: float,
+    stop: threading.Event | None = None,
+    lookup_pool: ThreadPoolExecutor | None = None,
+    metadata_cache: MetadataCache | None = None,
+) -> OnlineResolution:
+    """
+    Collect candidate URLs for an entry and try them in order (expanding
+    landing pages) until a PDF downloads. Only touches the network and the
+    managed PDF file, so it can run in a worker thread; the PDF index is
+    updated by the caller.
+
+    With ``lookup_pool`` the metadata API lookups run in the background
+    while the candidates known up front (entry URL, DOI resolver, publisher
+    PDF links) are tried, since those come first in the order anyway.
+    """
+    candidates: list[tuple[str, str]] = []
+    candidate_seen: set[str] = set()
+    add_static_candidates(candidates, candidate_seen, entry, doi)
+    lookups = ProviderLookups(client, doi, unpaywall_email, lookup_pool, metadata_cache)
+    # Landing page links found before the lookup results are merged; they go
+    # after the provider candidates, as if the lookups had finished first.
+    discovered_backlog: list[tuple[str, str]] | None = []
+
+    result = OnlineResolution(candidates=candidates, attempted_providers=set(), canonical_key=canonical_key)
+    expanded_from: set[str] = set()
+    candidate_idx = 0
+
+    while True:
+        if stop is not None and stop.is_set():
+            break
+        if candidate_idx >= len(candidates):
+            if discovered_backlog is None:
+                break
+            for url, provider in lookups.results():
+                add_url_candidate(candidates, candidate_seen, url, provider)
+            for url, provider in discovered_backlog:
+                add_url_candidate(candidates, candidate_seen, url, provider)
+            discovered_backlog = None
+            continue
+        candidate_url, provider = candidates[candidate_idx]
+        result.attempted_providers.add(provider)
+        candidate_idx += 1
+
+        fetched = fetch_pdf_bytes(
+            client=client,
+            url=candidate_url,
+            user_agent=user_agent,
+            max_pdf_mb=max_pdf_mb,
+            timeout_sec=timeout_sec,
+        )
+        if fetched is None:
+            if candidate_url in expanded_from:
+                continue
+            expanded_from.add(candidate_url)
+            discovered = discover_landing_candidates(
+                client=client,
+                seed_url=candidate_url,
+                provider=provider,
+                doi=doi,
+                user_agent=user_agent,
+                timeout_sec=timeout_sec,
+            )
+            for discovered_url, discovered_provider in discovered:
+                if discovered_backlog is not None:
+                    discovered_backlog.append((discovered_url, discovered_provider))
+                    continue
+                add_url_candidate(
+                    candidates,
+                    candidate_seen,
+                    discovered_url,
+                    discovered_provider,
+                )
+            continue
+
+        body, final_url, content_type = fetched
+
+        if not result.canonical_key:
+            normalized_final = normalize_url(final_url)
+            if normalized_final:
+                result.canonical_key = f"url:{normalized_final}"
+            else:
+                result.canonical_key = f"entry:{entry_key}"
+
+        target_path = managed_pdf_path_for_key(result.canonical_key)
+        write_pdf_file(target_path, body)
+        result.pdf_path = target_path
+        result.source_url = final_url
+        result.content_type = content_type
+        result.provider = provider
+        break
+
+    return result
+
+
+@dataclass
+class PendingPdfEntry:
+    """An input entry between submission and in-order emission."""
+
+    index_no: int
+    entry: dict[str, Any]
+    entry_key: str
+    title: str
+    doi: str | None
+    year: str | None
+    database: str | None
+    entry_label: str
+    canonical_key: str | None
+    cached_record: dict[str, Any] | None = None
+    local_paths: list[Path] = field(default_factory=list)
+    online: Future | None = None
+    # Another entry with the same key is still pending; resolve this one
+    # when it is emitted so it can reuse that entry's result from the index.
+    deferred: bool = False
+
+    @property
+    def ready(self) -> bool:
+        return self.online is None or self.online.done()
+
+
+def usable_cached_record(
+    index: dict[str, Any],
+    canonical_key: str | None,
+    doi: str | None,
+    reuse_cache: bool,
+) -> dict[str, Any] | None:
+    """PDF library record of a found PDF that can be reused for the entry."""
+    if not canonical_key or not reuse_cache:
+        return None
+    cached_record = (index.get("records") or {}).get(canonical_key)
+    if not (
+        isinstance(cached_record, dict)
+        and cached_record.get("status") == "found"
+        and cached_record.get("pdf_path")
+    ):
+        return None
+    cached_path = Path(str(cached_record["pdf_path"]))
+    if not cached_path.exists():
+        return None
+    if not is_cached_pdf_likely_for_doi(
+        pdf_path=cached_path,
+        source_url=cached_record.get("source_url"),
+        doi=doi,
+    ):
+        return None
+    return cached_record
+
+
 @register_step_type
-class PdfFetchHandler(StepHandler):
+class PdfFetchHandler(StreamingStepHandler):
     step_type = "pdf-fetch"
     name = "PDF Fetch"
     description = "Resolve and cache PDFs using DOI-first lookup with local/cached reuse."
     icon = "FileDown"
+    extra_outputs = ["mode_all_passed", "mode_pdf_only_passed"]
+    extra_change_files = ["changes_all.jsonl", "changes_pdf_only.jsonl"]
     output_definitions = [
         OutputDefinition(
             name="passed",
@@ -819,7 +1216,7 @@ class PdfFetchHandler(StepHandler):
                 "reuse_cache": {
                     "type": "boolean",
                     "default": True,
-                    "description": "Reuse existing PDF library records before resolving/download",
+                    "description": "Reuse existing PDF library records and cached metadata API responses before resolving/download",
                 },
                 "download_enabled": {
                     "type": "boolean",
@@ -840,6 +1237,39 @@ class PdfFetchHandler(StepHandler):
                     "default": 50,
                     "description": "Maximum accepted PDF size",
                 },
+                "concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 64,
+                    "default": DEFAULT_PDF_FETCH_CONCURRENCY,
+                    "description": "Entries resolved from web sources in parallel",
+                },
+                "per_host_concurrency": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": DEFAULT_PER_HOST_CONCURRENCY,
+                    "description": "Maximum parallel requests to the same host",
+                },
+                "per_host_delay_sec": {
+                    "type": "number",
+                    "minimum": 0,
+                    "maximum": 10,
+                    "default": DEFAULT_PER_HOST_INTERVAL_SEC,
+                    "description": "Minimum delay between requests to the same host (politeness)",
+                },
+                "per_host_burst": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": DEFAULT_PER_HOST_BURST,
+                    "description": "Requests to the same host that may start back to back before the delay applies",
+                },
+                "bulk_prefetch": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Look up DOIs in bulk (OpenAlex filter, Semantic Scholar batch) before resolving entries",
+                },
                 "unpaywall_email": {
                     "type": "string",
                     "default": "",
@@ -871,19 +1301,28 @@ class PdfFetchHandler(StepHandler):
             "required": [],
         }
 
-    def run(
+    def run_stream(
         self,
-        input_entries: list[dict],
+        input_entries: Iterable[dict],
+        total_entries: int,
         config: dict,
+        sink: StepSink,
         progress_callback: ProgressCallback | None = None,
-    ) -> StepResult:
+    ) -> dict:
         pass_mode = str(config.get("pass_mode", "all")).strip()
         if pass_mode not in ("all", "pdf_only"):
             pass_mode = "all"
         reuse_cache = bool(config.get("reuse_cache", True))
+        bulk_prefetch = bool(config.get("bulk_prefetch", True))
         download_enabled = bool(config.get("download_enabled", True))
         timeout_sec = float(config.get("timeout_sec", 20))
         max_pdf_mb = int(config.get("max_pdf_mb", 50))
+        concurrency = max(int(config.get("concurrency", DEFAULT_PDF_FETCH_CONCURRENCY)), 1)
+        limiter = HostLimiter(
+            per_host_concurrency=int(config.get("per_host_concurrency", DEFAULT_PER_HOST_CONCURRENCY)),
+            per_host_interval_sec=float(config.get("per_host_delay_sec", DEFAULT_PER_HOST_INTERVAL_SEC)),
+            per_host_burst=int(config.get("per_host_burst", DEFAULT_PER_HOST_BURST)),
+        )
         browser_assist_enabled = bool(config.get("browser_assist_enabled", True))
         browser_assist_headed = bool(config.get("browser_assist_headed", True))
         browser_assist_wait_sec = float(config.get("browser_assist_wait_sec", 180))
@@ -902,14 +1341,15 @@ class PdfFetchHandler(StepHandler):
         step_id = str(config.get("_step_id", "")).strip() or None
 
         index = load_pdf_index()
+        # Metadata API responses are always stored, but only reused with reuse_cache.
+        metadata_cache = MetadataCache(read=reuse_cache)
 
-        pdf_found: list[dict] = []
-        pdf_missing: list[dict] = []
-        changes_all: list[Change] = []
-        changes_pdf_only: list[Change] = []
+        input_count = 0
+        found_count = 0
 
         cache_hits = 0
         local_hits = 0
+        prefetch_requests = 0
         downloaded_count = 0
         browser_assist_attempted = 0
         browser_assist_resolved = 0
@@ -918,453 +1358,487 @@ class PdfFetchHandler(StepHandler):
         browser_assist_error: str | None = None
         browser_session: BrowserAssistSession | None = None
 
-        total_entries = len(input_entries)
+        # Web lookups and downloads run in worker threads; everything that
+        # touches the PDF index, the sink or the browser runs on this thread
+        # in input order, so outputs and change files stay deterministic and
+        # browser assist handles one entry at a time.
+        pending: deque[PendingPdfEntry] = deque()
+        pending_keys: Counter[str] = Counter()
+        window = concurrency * PDF_FETCH_WINDOW_FACTOR
+        stop = threading.Event()
+
         if progress_callback:
             progress_callback(0, total_entries, "Resolving PDFs")
 
-        try:
-            with httpx.Client(timeout=timeout_sec, follow_redirects=True) as client:
-                for index_no, entry in enumerate(input_entries):
-                    entry_key = str(entry.get("ID") or f"row_{index_no}")
-                    title = guess_title(entry)
-                    doi = normalize_doi(entry.get("doi") or entry.get("DOI"))
-                    year = normalize_entry_year(entry.get("year"))
-                    database = infer_database_from_entry(entry, doi)
-                    entry_label = summarize_entry_label(entry_key=entry_key, doi=doi, title=title)
-                    canonical_key = canonical_key_for_entry(entry)
-                    if doi:
-                        canonical_key = f"doi:{doi}"
-
-                    status = "missing"
-                    resolved_path: str | None = None
-                    resolved_source: str | None = None
-                    resolved_provider: str | None = None
-                    resolved_url: str | None = None
-                    resolved_record_id: str | None = None
-                    missing_reason = "not_found"
-                    entry_browser_assist_used = False
-                    entry_browser_assist_result: str | None = None
-                    attempted_providers: set[str] = set()
-                    browser_assist_candidate_count = 0
-                    browser_assist_tried_count = 0
-                    browser_assist_page_url: str | None = None
+        def resolve_online(client: httpx.Client, item: PendingPdfEntry) -> OnlineResolution:
+            return resolve_pdf_online(
+                client=client,
+                entry=item.entry,
+                entry_key=item.entry_key,
+                doi=item.doi,
+                canonical_key=item.canonical_key,
+                unpaywall_email=unpaywall_email,
+                user_agent=user_agent,
+                max_pdf_mb=max_pdf_mb,
+                timeout_sec=timeout_sec,
+                stop=stop,
+                lookup_pool=lookup_pool,
+                metadata_cache=metadata_cache,
+            )
 
+        def prefetch_doi(entry: dict) -> str | None:
+            """DOI of an entry that will likely be looked up online."""
+            doi = normalize_doi(entry.get("doi") or entry.get("DOI"))
+            if not doi:
+                return None
+            record = (index.get("records") or {}).get(f"doi:{doi}")
+            if reuse_cache and isinstance(record, dict) and record.get("status") == "found":
+                return None
+            return doi
+
+        def submit(client: httpx.Client, pool: ThreadPoolExecutor, index_no: int, entry: dict) -> None:
+            entry_key = str(entry.get("ID") or f"row_{index_no}")
+            title = guess_title(entry)
+            doi = normalize_doi(entry.get("doi") or entry.get("DOI"))
+            canonical_key = canonical_key_for_entry(entry)
+            if doi:
+                canonical_key = f"doi:{doi}"
+            item = PendingPdfEntry(
+                index_no=index_no,
+                entry=entry,
+                entry_key=entry_key,
+                title=title,
+                doi=doi,
+                year=normalize_entry_year(entry.get("year")),
+                database=infer_database_from_entry(entry, doi),
+                entry_label=summarize_entry_label(entry_key=entry_key, doi=doi, title=title),
+                canonical_key=canonical_key,
+            )
+            if canonical_key and pending_keys[canonical_key]:
+                item.deferred = True
+            else:
+                item.cached_record = usable_cached_record(index, canonical_key, doi, reuse_cache)
+                if item.cached_record is None:
+                    item.local_paths = resolve_local_pdf_candidates(entry, project_id=project_id)
+                    if not item.local_paths and download_enabled:
+                        item.online = pool.submit(resolve_online, client, item)
+            if canonical_key:
+                pending_keys[canonical_key] += 1
+            pending.append(item)
+
+        def emit(client: httpx.Client, item: PendingPdfEntry) -> None:
+            nonlocal found_count, cache_hits, local_hits, downloaded_count
+            nonlocal browser_assist_attempted, browser_assist_resolved, browser_assist_errors
+            nonlocal browser_assist_available, browser_assist_error, browser_assist_enabled, browser_session
+
+            index_no = item.index_no
+            entry = item.entry
+            entry_key = item.entry_key
+            title = item.title
+            doi = item.doi
+            year = item.year
+            database = item.database
+            entry_label = item.entry_label
+            canonical_key = item.canonical_key
+
+            status = "missing"
+            resolved_path: str | None = None
+            resolved_source: str | None = None
+            resolved_provider: str | None = None
+            resolved_url: str | None = None
+            resolved_record_id: str | None = None
+            missing_reason = "not_found"
+            entry_browser_assist_used = False
+            entry_browser_assist_result: str | None = None
+            attempted_providers: set[str] = set()
+            browser_assist_candidate_count = 0
+            browser_assist_tried_count = 0
+            browser_assist_page_url: str | None = None
+
+            if item.deferred:
+                item.cached_record = usable_cached_record(index, canonical_key, doi, reuse_cache)
+                if item.cached_record is None:
+                    item.local_paths = resolve_local_pdf_candidates(entry, project_id=project_id)
+
+            cached_record = item.cached_record
+            if cached_record is not None:
+                cached_path = Path(str(cached_record["pdf_path"]))
+                status = "found"
+                resolved_path = str(cached_path)
+                resolved_source = "cache"
+                resolved_provider = cached_record.get("provider")
+                resolved_url = cached_record.get("source_url")
+                resolved_record_id = str(cached_record.get("id") or "") or None
+                cache_hits += 1
+                found_record = mark_record_found(
+                    index,
+                    key=canonical_key,
+                    title=title,
+                    year=year,
+                    database=database,
+                    pdf_path=cached_path,
+                    managed_file=bool(cached_record.get("managed_file")),
+                    source="cache",
+                    source_url=resolved_url,
+                    provider=resolved_provider,
+                    content_type=cached_record.get("content_type"),
+                    project_id=project_id,
+                    step_id=step_id,
+                    entry_key=entry_key,
+                )
+                resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
+
+            if status != "found" and item.local_paths:
+                local_path = item.local_paths[0]
+                status = "found"
+                resolved_path = str(local_path.resolve())
+                resolved_source = "local_file"
+                resolved_provider = "local"
+                local_hits += 1
+                if canonical_key:
+                    found_record = mark_record_found(
+                        index,
+                        key=canonical_key,
+                        title=title,
+                        year=year,
+                        database=database,
+                        pdf_path=local_path,
+                        managed_file=False,
+                        source="local_file",
+                        source_url=None,
+                        provider="local",
+                        content_type="application/pdf",
+                        project_id=project_id,
+                        step_id=step_id,
+                        entry_key=entry_key,
+                    )
+                    resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
+
+            candidates_for_entry: list[tuple[str, str]] = []
+            if status != "found" and download_enabled:
+                if item.online is not None:
+                    online = item.online.result()
+                else:
                     if progress_callback:
                         progress_callback(
                             index_no,
                             total_entries,
-                            f"[{index_no + 1}/{total_entries}] {entry_label}: checking cache and local files",
+                            f"[{index_no + 1}/{total_entries}] {entry_label}: trying web sources",
                         )
-
-                    cached_record = None
-                    if canonical_key and reuse_cache:
-                        cached_record = (index.get("records") or {}).get(canonical_key)
-
-                    if (
-                        isinstance(cached_record, dict)
-                        and cached_record.get("status") == "found"
-                        and cached_record.get("pdf_path")
-                    ):
-                        cached_path = Path(str(cached_record["pdf_path"]))
-                        if cached_path.exists():
-                            cached_source_url = cached_record.get("source_url")
-                            if is_cached_pdf_likely_for_doi(
-                                pdf_path=cached_path,
-                                source_url=cached_source_url,
-                                doi=doi,
-                            ):
-                                status = "found"
-                                resolved_path = str(cached_path)
-                                resolved_source = "cache"
-                                resolved_provider = cached_record.get("provider")
-                                resolved_url = cached_source_url
-                                resolved_record_id = str(cached_record.get("id") or "") or None
-                                cache_hits += 1
-                                found_record = mark_record_found(
-                                    index,
-                                    key=canonical_key,
-                                    title=title,
-                                    year=year,
-                                    database=database,
-                                    pdf_path=cached_path,
-                                    managed_file=bool(cached_record.get("managed_file")),
-                                    source="cache",
-                                    source_url=resolved_url,
-                                    provider=resolved_provider,
-                                    content_type=cached_record.get("content_type"),
-                                    project_id=project_id,
-                                    step_id=step_id,
-                                    entry_key=entry_key,
-                                )
-                                resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
-
-                    if status != "found":
-                        local_paths = resolve_local_pdf_candidates(entry, project_id=project_id)
-                        if local_paths:
-                            local_path = local_paths[0]
-                            status = "found"
-                            resolved_path = str(local_path.resolve())
-                            resolved_source = "local_file"
-                            resolved_provider = "local"
-                            local_hits += 1
-                            if canonical_key:
-                                found_record = mark_record_found(
-                                    index,
-                                    key=canonical_key,
-                                    title=title,
-                                    year=year,
-                                    database=database,
-                                    pdf_path=local_path,
-                                    managed_file=False,
-                                    source="local_file",
-                                    source_url=None,
-                                    provider="local",
-                                    content_type="application/pdf",
-                                    project_id=project_id,
-                                    step_id=step_id,
-                                    entry_key=entry_key,
-                                )
-                                resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
-
-                    candidates_for_entry: list[tuple[str, str]] = []
-                    if status != "found" and download_enabled:
-                        candidates_for_entry = collect_candidate_urls(
-                            client=client,
-                            entry=entry,
+                    online = resolve_online(client, item)
+                candidates_for_entry = online.candidates
+                attempted_providers = online.attempted_providers
+                canonical_key = online.canonical_key
+                if online.pdf_path is not None:
+                    found_record = mark_record_found(
+                        index,
+                        key=canonical_key,
+                        title=title,
+                        year=year,
+                        database=database,
+                        pdf_path=online.pdf_path,
+                        managed_file=True,
+                        source="download",
+                        source_url=online.source_url,
+                        provider=online.provider,
+                        content_type=online.content_type,
+                        project_id=project_id,
+                        step_id=step_id,
+                        entry_key=entry_key,
+                    )
+                    status = "found"
+                    resolved_path = str(online.pdf_path.resolve())
+                    resolved_source = "download"
+                    resolved_provider = online.provider
+                    resolved_url = online.source_url
+                    resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
+                    downloaded_count += 1
+
+            entry_url = str(entry.get("url") or "").strip()
+            if (
+                status != "found"
+                and download_enabled
+                and browser_assist_enabled
+                and (doi or entry_url)
+            ):
+                browser_assist_attempted += 1
+                entry_browser_assist_used = True
+                if progress_callback:
+                    progress_callback(
+                        index_no,
+                        total_entries,
+                        (
+                            f"[{index_no + 1}/{total_entries}] Browser assist: "
+                            f"complete login/challenge in opened browser window for {entry_label}"
+                        ),
+                    )
+                if browser_session is None:
+                    try:
+                        browser_session = BrowserAssistSession(
+                            profile_name=browser_assist_profile,
+                            headed=browser_assist_headed,
+                            user_agent=user_agent,
+                            timeout_sec=timeout_sec,
+                        )
+                        browser_assist_available = True
+                    except Exception as e:
+                        browser_assist_errors += 1
+                        browser_assist_error = str(e)
+                        browser_assist_enabled = False
+                        missing_reason = "browser_assist_unavailable"
+                        entry_browser_assist_result = "unavailable"
+                        print(f"[pdf-fetch] Browser assist unavailable: {e}")
+
+                if browser_session is not None and status != "found":
+                    # Keep full assist window for every unresolved entry.
+                    # A 10s cap after the first entry is too short for real
+                    # login/challenge flows (ACM/IEEE institutional access).
+                    wait_window = max(browser_assist_wait_sec, 10.0)
+                    try:
+                        assisted = browser_session.resolve_pdf(
                             doi=doi,
-                            unpaywall_email=unpaywall_email,
+                            entry_url=entry_url,
+                            initial_candidates=candidates_for_entry,
+                            wait_sec=wait_window,
+                            timeout_sec=timeout_sec,
+                            max_pdf_mb=max_pdf_mb,
                         )
-                        if progress_callback:
-                            progress_callback(
-                                index_no,
-                                total_entries,
-                                f"[{index_no + 1}/{total_entries}] {entry_label}: trying web sources ({len(candidates_for_entry)} candidates)",
-                            )
-                        candidate_seen = {url for url, _ in candidates_for_entry}
-                        expanded_from: set[str] = set()
-                        candidate_idx = 0
-
-                        while candidate_idx < len(candidates_for_entry):
-                            candidate_url, provider = candidates_for_entry[candidate_idx]
-                            attempted_providers.add(provider)
-                            candidate_idx += 1
-
-                            fetched = fetch_pdf_bytes(
-                                client=client,
-                                url=candidate_url,
-                                user_agent=user_agent,
-                                max_pdf_mb=max_pdf_mb,
-                                timeout_sec=timeout_sec,
-                            )
-                            if fetched is None:
-                                if candidate_url in expanded_from:
-                                    continue
-                                expanded_from.add(candidate_url)
-                                discovered = discover_landing_candidates(
-                                    client=client,
-                                    seed_url=candidate_url,
-                                    provider=provider,
-                                    doi=doi,
-                                    user_agent=user_agent,
-                                    timeout_sec=timeout_sec,
-                                )
-                                for discovered_url, discovered_provider in discovered:
-                                    add_url_candidate(
-                                        candidates_for_entry,
-                                        candidate_seen,
-                                        discovered_url,
-                                        discovered_provider,
-                                    )
-                                continue
-
-                            body, final_url, content_type = fetched
-
-                            if not canonical_key:
-                                normalized_final = normalize_url(final_url)
-                                if normalized_final:
-                                    canonical_key = f"url:{normalized_final}"
-                                else:
-                                    canonical_key = f"entry:{entry_key}"
-
-                            target_path = managed_pdf_path_for_key(canonical_key)
-                            target_path.parent.mkdir(parents=True, exist_ok=True)
-                            with open(target_path, "wb") as f:
-                                f.write(body)
-
-                            found_record = mark_record_found(
-                                index,
-                                key=canonical_key,
-                                title=title,
-                                year=year,
-                                database=database,
-                                pdf_path=target_path,
-                                managed_file=True,
-                                source="download",
-                                source_url=final_url,
-                                provider=provider,
-                                content_type=content_type,
-                                project_id=project_id,
-                                step_id=step_id,
-                                entry_key=entry_key,
-                            )
-                            status = "found"
-                            resolved_path = str(target_path.resolve())
-                            resolved_source = "download"
-                            resolved_provider = provider
-                            resolved_url = final_url
-                            resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
-                            downloaded_count += 1
-                            break
-
-                    entry_url = str(entry.get("url") or "").strip()
-                    if (
-                        status != "found"
-                        and download_enabled
-                        and browser_assist_enabled
-                        and (doi or entry_url)
-                    ):
-                        browser_assist_attempted += 1
-                        entry_browser_assist_used = True
-                        if progress_callback:
-                            progress_callback(
-                                index_no,
-                                total_entries,
-                                (
-                                    f"[{index_no + 1}/{total_entries}] Browser assist: "
-                                    f"complete login/challenge in opened browser window for {entry_label}"
-                                ),
-                            )
-                        if browser_session is None:
-                            try:
-                                browser_session = BrowserAssistSession(
-                                    profile_name=browser_assist_profile,
-                                    headed=browser_assist_headed,
-                                    user_agent=user_agent,
-                                    timeout_sec=timeout_sec,
-                                )
-                                browser_assist_available = True
-                            except Exception as e:
-                                browser_assist_errors += 1
-                                browser_assist_error = str(e)
-                                browser_assist_enabled = False
-                                missing_reason = "browser_assist_unavailable"
-                                entry_browser_assist_result = "unavailable"
-                                print(f"[pdf-fetch] Browser assist unavailable: {e}")
-
-                        if browser_session is not None and status != "found":
-                            # Keep full assist window for every unresolved entry.
-                            # A 10s cap after the first entry is too short for real
-                            # login/challenge flows (ACM/IEEE institutional access).
-                            wait_window = max(browser_assist_wait_sec, 10.0)
-                            try:
-                                assisted = browser_session.resolve_pdf(
-                                    doi=doi,
-                                    entry_url=entry_url,
-                                    initial_candidates=candidates_for_entry,
-                                    wait_sec=wait_window,
-                                    timeout_sec=timeout_sec,
-                                    max_pdf_mb=max_pdf_mb,
-                                )
-                            except Exception as e:
-                                browser_assist_errors += 1
-                                browser_assist_error = str(e)
-                                missing_reason = "browser_assist_error"
-                                entry_browser_assist_result = "error"
-                                assisted = None
-                                print(f"[pdf-fetch] Browser assist failed: {e}")
-                            finally:
-                                browser_assist_candidate_count = browser_session.last_candidate_count
-                                browser_assist_tried_count = browser_session.last_tried_count
-                                browser_assist_page_url = browser_session.last_page_url
-
-                            if assisted is not None:
-                                body, final_url, content_type, provider = assisted
-                                if not canonical_key:
-                                    normalized_final = normalize_url(final_url)
-                                    if normalized_final:
-                                        canonical_key = f"url:{normalized_final}"
-                                    else:
-                                        canonical_key = f"entry:{entry_key}"
-
-                                target_path = managed_pdf_path_for_key(canonical_key)
-                                target_path.parent.mkdir(parents=True, exist_ok=True)
-                                with open(target_path, "wb") as f:
-                                    f.write(body)
-
-                                found_record = mark_record_found(
-                                    index,
-                                    key=canonical_key,
-                                    title=title,
-                                    year=year,
-                                    database=database,
-                                    pdf_path=target_path,
-                                    managed_file=True,
-                                    source="browser_assist",
-                                    source_url=final_url,
-                                    provider=provider,
-                                    content_type=content_type,
-                                    project_id=project_id,
-                                    step_id=step_id,
-                                    entry_key=entry_key,
-                                )
-                                status = "found"
-                                resolved_path = str(target_path.resolve())
-                                resolved_source = "browser_assist"
-                                resolved_provider = provider
-                                resolved_url = final_url
-                                resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
-                                downloaded_count += 1
-                                browser_assist_resolved += 1
-                                entry_browser_assist_result = "resolved"
+                    except Exception as e:
+                        browser_assist_errors += 1
+                        browser_assist_error = str(e)
+                        missing_reason = "browser_assist_error"
+                        entry_browser_assist_result = "error"
+                        assisted = None
+                        print(f"[pdf-fetch] Browser assist failed: {e}")
+                    finally:
+                        browser_assist_candidate_count = browser_session.last_candidate_count
+                        browser_assist_tried_count = browser_session.last_tried_count
+                        browser_assist_page_url = browser_session.last_page_url
+
+                    if assisted is not None:
+                        body, final_url, content_type, provider = assisted
+                        if not canonical_key:
+                            normalized_final = normalize_url(final_url)
+                            if normalized_final:
+                                canonical_key = f"url:{normalized_final}"
                             else:
-                                if missing_reason == "not_found":
-                                    missing_reason = "browser_assist_unresolved"
-                                if entry_browser_assist_result is None:
-                                    entry_browser_assist_result = "unresolved"
-
-                    if status != "found":
-                        if missing_reason == "not_found":
-                            missing_reason = "pdf_not_resolved"
-                        if canonical_key:
-                            mark_record_missing(
-                                index,
-                                key=canonical_key,
-                                title=title,
-                                year=year,
-                                database=database,
-                                reason=missing_reason,
-                                project_id=project_id,
-                                step_id=step_id,
-                                entry_key=entry_key,
-                            )
-
-                    details = {
-                        "pdf_status": status,
-                        "pdf_path": resolved_path,
-                        "source": resolved_source,
-                        "provider": resolved_provider,
-                        "source_url": resolved_url,
-                        "pdf_record_id": resolved_record_id,
-                        "doi": doi,
-                        "cache_key": canonical_key,
-                        "browser_assist_used": entry_browser_assist_used,
-                        "browser_assist_result": entry_browser_assist_result,
-                        "missing_reason": None if status == "found" else missing_reason,
-                        "missing_reason_label": (
-                            None if status == "found" else missing_reason_label(missing_reason)
-                        ),
-                        "missing_reason_hint": (
-                            None if status == "found" else missing_reason_hint(missing_reason)
-                        ),
-                        "attempted_providers": sorted(attempted_providers),
-                        "candidate_count": len(candidates_for_entry),
-                        "browser_assist_candidates": (
-                            browser_assist_candidate_count if entry_browser_assist_used else None
-                        ),
-                        "browser_assist_tried": (
-                            browser_assist_tried_count if entry_browser_assist_used else None
-                        ),
-                        "browser_assist_page_url": (
-                            browser_assist_page_url if entry_browser_assist_used else None
-                        ),
-                    }
-
-                    if status == "found":
-                        pdf_found.append(entry)
-                        changes_all.append(
-                            Change(
-                                key=entry_key,
-                                action="keep",
-                                reason="pdf_available",
-                                details=details,
-                            )
-                        )
-                        changes_pdf_only.append(
-                            Change(
-                                key=entry_key,
-                                action="keep",
-                                reason="pdf_available",
-                                details=details,
-                            )
+                                canonical_key = f"entry:{entry_key}"
+
+                        target_path = managed_pdf_path_for_key(canonical_key)
+                        write_pdf_file(target_path, body)
+
+                        found_record = mark_record_found(
+                            index,
+                            key=canonical_key,
+                            title=title,
+                            year=year,
+                            database=database,
+                            pdf_path=target_path,
+                            managed_file=True,
+                            source="browser_assist",
+                            source_url=final_url,
+                            provider=provider,
+                            content_type=content_type,
+                            project_id=project_id,
+                            step_id=step_id,
+                            entry_key=entry_key,
                         )
+                        status = "found"
+                        resolved_path = str(target_path.resolve())
+                        resolved_source = "browser_assist"
+                        resolved_provider = provider
+                        resolved_url = final_url
+                        resolved_record_id = str(found_record.get("id") or "") or resolved_record_id
+                        downloaded_count += 1
+                        browser_assist_resolved += 1
+                        entry_browser_assist_result = "resolved"
                     else:
-                        pdf_missing.append(entry)
-                        changes_all.append(
-                            Change(
-                                key=entry_key,
-                                action="keep",
-                                reason="pdf_missing_passed",
-                                details=details,
-                            )
-                        )
-                        changes_pdf_only.append(
-                            Change(
-                                key=entry_key,
-                                action="remove",
-                                reason="pdf_missing",
-                                details=details,
-                            )
+                        if missing_reason == "not_found":
+                            missing_reason = "browser_assist_unresolved"
+                        if entry_browser_assist_result is None:
+                            entry_browser_assist_result = "unresolved"
+
+            if status != "found":
+                if missing_reason == "not_found":
+                    missing_reason = "pdf_not_resolved"
+                if canonical_key:
+                    mark_record_missing(
+                        index,
+                        key=canonical_key,
+                        title=title,
+                        year=year,
+                        database=database,
+                        reason=missing_reason,
+                        project_id=project_id,
+                        step_id=step_id,
+                        entry_key=entry_key,
+                    )
+
+            details = {
+                "pdf_status": status,
+                "pdf_path": resolved_path,
+                "source": resolved_source,
+                "provider": resolved_provider,
+                "source_url": resolved_url,
+                "pdf_record_id": resolved_record_id,
+                "doi": doi,
+                "cache_key": canonical_key,
+                "browser_assist_used": entry_browser_assist_used,
+                "browser_assist_result": entry_browser_assist_result,
+                "missing_reason": None if status == "found" else missing_reason,
+                "missing_reason_label": (
+                    None if status == "found" else missing_reason_label(missing_reason)
+                ),
+                "missing_reason_hint": (
+                    None if status == "found" else missing_reason_hint(missing_reason)
+                ),
+                "attempted_providers": sorted(attempted_providers),
+                "candidate_count": len(candidates_for_entry),
+                "browser_assist_candidates": (
+                    browser_assist_candidate_count if entry_browser_assist_used else None
+                ),
+                "browser_assist_tried": (
+                    browser_assist_tried_count if entry_browser_assist_used else None
+                ),
+                "browser_assist_page_url": (
+                    browser_assist_page_url if entry_browser_assist_used else None
+                ),
+            }
+
+            if status == "found":
+                found_count += 1
+                change_all = Change(
+                    key=entry_key,
+                    action="keep",
+                    reason="pdf_available",
+                    details=details,
+                )
+                change_pdf_only = Change(
+                    key=entry_key,
+                    action="keep",
+                    reason="pdf_available",
+                    details=details,
+                )
+                sink.write_entry("pdf_found", entry)
+                sink.write_entry("mode_pdf_only_passed", entry)
+            else:
+                change_all = Change(
+                    key=entry_key,
+                    action="keep",
+                    reason="pdf_missing_passed",
+                    details=details,
+                )
+                change_pdf_only = Change(
+                    key=entry_key,
+                    action="remove",
+                    reason="pdf_missing",
+                    details=details,
+                )
+                sink.write_entry("pdf_missing", entry)
+            sink.write_entry("mode_all_passed", entry)
+            sink.write_change(change_all, filename="changes_all.jsonl")
+            sink.write_change(change_pdf_only, filename="changes_pdf_only.jsonl")
+            if pass_mode == "all":
+                sink.write_entry("passed", entry)
+                sink.write_change(change_all)
+            else:
+                if status == "found":
+                    sink.write_entry("passed", entry)
+                sink.write_change(change_pdf_only)
+            sink.commit()
+
+            if item.canonical_key:
+                pending_keys[item.canonical_key] -= 1
+
+            if (index_no + 1) % PDF_INDEX_SAVE_INTERVAL == 0:
+                save_pdf_index(index)
+
+            if progress_callback:
+                if status == "found":
+                    source_label = resolved_source or "resolved"
+                    message = (
+                        f"[{index_no + 1}/{total_entries}] {entry_label}: "
+                        f"resolved ({source_label})"
+                    )
+                else:
+                    reason_label = missing_reason_label(missing_reason) or missing_reason
+                    message = (
+                        f"[{index_no + 1}/{total_entries}] {entry_label}: "
+                        f"missing ({reason_label})"
+                    )
+                progress_callback(index_no + 1, total_entries, message)
+
+        pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pdf-fetch")
+        # Metadata API lookups of the entries being resolved.
+        lookup_pool = ThreadPoolExecutor(
+            max_workers=concurrency * PDF_LOOKUP_PROVIDERS,
+            thread_name_prefix="pdf-lookup",
+        )
+        try:
+            with httpx.Client(
+                timeout=timeout_sec,
+                follow_redirects=True,
+                transport=HostLimitedTransport(
+                    limiter,
+                    httpx.HTTPTransport(limits=httpx.Limits(max_connections=concurrency * 4)),
+                ),
+            ) as client:
+                numbered_entries = enumerate(input_entries)
+                while True:
+                    block = list(itertools.islice(numbered_entries, METADATA_PREFETCH_BLOCK))
+                    if not block:
+                        break
+                    if bulk_prefetch and download_enabled:
+                        block_dois = [prefetch_doi(entry) for _, entry in block]
+                        prefetch_requests += prefetch_metadata(
+                            client,
+                            [doi for doi in block_dois if doi],
+                            metadata_cache,
+                            lookup_pool,
                         )
-
-                    if progress_callback:
-                        if status == "found":
-                            source_label = resolved_source or "resolved"
-                            message = (
-                                f"[{index_no + 1}/{total_entries}] {entry_label}: "
-                                f"resolved ({source_label})"
-                            )
-                        else:
-                            reason_label = missing_reason_label(missing_reason) or missing_reason
-                            message = (
-                                f"[{index_no + 1}/{total_entries}] {entry_label}: "
-                                f"missing ({reason_label})"
-                            )
-                        progress_callback(index_no + 1, total_entries, message)
+                    for index_no, entry in block:
+                        input_count += 1
+                        submit(client, pool, index_no, entry)
+                        while pending and (len(pending) >= window or pending[0].ready):
+                            emit(client, pending.popleft())
+                while pending:
+                    emit(client, pending.popleft())
         finally:
+            # On failure or cancel, stop workers after their current request.
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+            lookup_pool.shutdown(wait=False, cancel_futures=True)
             if browser_session is not None:
                 browser_session.close()
 
-        save_pdf_index(index)
+            save_pdf_index(index)
 
-        passed = input_entries if pass_mode == "all" else pdf_found
-        chosen_changes = changes_all if pass_mode == "all" else changes_pdf_only
-        removed_count = len(input_entries) - len(passed)
+        passed_count = input_count if pass_mode == "all" else found_count
+        removed_count = input_count - passed_count
 
         if progress_callback:
             progress_callback(total_entries, total_entries, "PDF fetch completed")
 
-        return StepResult(
-            outputs={
-                "passed": passed,
-                "pdf_found": pdf_found,
-                "pdf_missing": pdf_missing,
+        return {
+            "pass_mode": pass_mode,
+            "stats": {
+                "input_count": input_count,
+                "passed_count": passed_count,
+                "removed_count": removed_count,
+                "metadata_cache": metadata_cache.summary(),
+                "metadata_prefetch_requests": prefetch_requests,
             },
-            changes=chosen_changes,
-            details={
-                "pass_mode": pass_mode,
-                "mode_outputs": {
-                    "all": input_entries,
-                    "pdf_only": pdf_found,
-                },
-                "mode_changes": {
-                    "all": changes_all,
-                    "pdf_only": changes_pdf_only,
-                },
-                "stats": {
-                    "input_count": len(input_entries),
-                    "passed_count": len(passed),
-                    "removed_count": removed_count,
-                },
-                "cache_hits": cache_hits,
-                "local_hits": local_hits,
-                "downloaded_count": downloaded_count,
-                "browser_assist": {
-                    "enabled": bool(config.get("browser_assist_enabled", False)),
-                    "available": browser_assist_available,
-                    "attempted_entries": browser_assist_attempted,
-                    "resolved_entries": browser_assist_resolved,
-                    "errors": browser_assist_errors,
-                    "last_error": browser_assist_error,
-                },
+            "cache_hits": cache_hits,
+            "local_hits": local_hits,
+            "downloaded_count": downloaded_count,
+            "concurrency": concurrency,
+            "host_limits": limiter.summary(),
+            "browser_assist": {
+                "enabled": bool(config.get("browser_assist_enabled", False)),
+                "available": browser_assist_available,
+                "attempted_entries": browser_assist_attempted,
+                "resolved_entries": browser_assist_resolved,
+                "errors": browser_assist_errors,
+                "last_error": browser_assist_error,
             },
-        )
+        }
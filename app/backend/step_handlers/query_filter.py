@@ -0,0 +1,225 @@
+"""
+Keyword pre-filter step handler.
+
+Evaluates a boolean query (query_search syntax) over title/abstract and
+routes papers that do not match away before the more expensive AI
+screening. A small, deterministic audit sample of the non-matching papers
+is still passed on, so the screening decisions on it can be used to
+estimate how many relevant papers the query would have dropped.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+from query_search import QuerySyntaxError, clean_bib_text, evaluate, normalize_query, parse_query
+from .base import StreamingStepHandler, StepSink, OutputDefinition, Change, ProgressCallback
+from . import register_step_type
+
+DEFAULT_AUDIT_PERCENT = 5
+SEARCH_FIELDS = ("any", "title", "abstract")
+
+
+def is_audit_sample(entry_key: str, percent: float, seed: int = 0) -> bool:
+    """
+    Whether a non-matching entry is kept for auditing.
+
+    Derived from a hash of the entry key rather than a random draw, so the
+    same entries are sampled on every run regardless of input order.
+    """
+    if percent <= 0:
+        return False
+    digest = hashlib.sha256(f"{seed}:{entry_key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 < percent / 100
+
+
+def estimate_recall(filter_changes: list[dict], screening_changes: list[dict]) -> dict:
+    """
+    Estimate the recall of a query filter from a downstream screening run.
+
+    Papers the query matched and the audit sample of the non-matching ones
+    are both screened; included papers in the audit sample are scaled up to
+    all non-matching papers to estimate how many includes the query drops.
+    """
+    decisions = {
+        change.get("key"): (change.get("details") or {}).get("decision")
+        for change in screening_changes
+    }
+    groups = {"query_match": [], "audit_sample": [], "query_no_match": []}
+    for change in filter_changes:
+        if change.get("reason") in groups:
+            groups[change["reason"]].append(change.get("key"))
+
+    def count(keys: list[str]) -> dict:
+        counts = {"screened": 0, "include": 0, "exclude": 0, "uncertain": 0}
+        for key in keys:
+            decision = decisions.get(key)
+            if decision in counts:
+                counts["screened"] += 1
+                counts[decision] += 1
+        return counts
+
+    matched = count(groups["query_match"])
+    audit = count(groups["audit_sample"])
+    non_matching = len(groups["audit_sample"]) + len(groups["query_no_match"])
+
+    estimated_missed = None
+    recall = None
+    if audit["screened"]:
+        estimated_missed = round(audit["include"] * non_matching / audit["screened"], 1)
+        found = matched["include"] + estimated_missed
+        recall = round(matched["include"] / found, 4) if found else None
+
+    return {
+        "matched_count": len(groups["query_match"]),
+        "non_matching_count": non_matching,
+        "audit_sample_count": len(groups["audit_sample"]),
+        "matched": matched,
+        "audit": audit,
+        "estimated_missed_includes": estimated_missed,
+        "estimated_recall": recall,
+    }
+
+
+@register_step_type
+class QueryFilterHandler(StreamingStepHandler):
+    """Exclude papers that do not match a boolean keyword query."""
+
+    step_type = "query-filter"
+    name = "Query Filter"
+    description = "Exclude papers whose title/abstract do not match a boolean keyword query (before AI screening)."
+    icon = "Filter"
+    extra_outputs = ["audit_sample"]
+    output_definitions = [
+        OutputDefinition(
+            name="passed",
+            description="Papers matching the query (plus the audit sample and, optionally, papers without abstract)",
+            required=True,
+        ),
+        OutputDefinition(
+            name="removed",
+            description="Papers not matching the query",
+            required=True,
+        ),
+    ]
+
+    @classmethod
+    def get_config_schema(cls) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "default": "",
+                    "description": "Boolean query, e.g. (decompil* OR binary) AND NOT survey. title:/abstract: scope terms",
+                },
+                "search_field": {
+                    "type": "string",
+                    "enum": list(SEARCH_FIELDS),
+                    "default": "any",
+                    "description": "Field searched by terms without a title:/abstract: prefix",
+                },
+                "normalize_external_syntax": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Convert database query syntax (ACM/IEEE/WoS/arXiv) to the local syntax",
+                },
+                "keep_no_abstract": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Pass papers without abstract on instead of judging them by title alone",
+                },
+                "audit_percent": {
+                    "type": "integer",
+                    "default": DEFAULT_AUDIT_PERCENT,
+                    "minimum": 0,
+                    "maximum": 100,
+                    "description": "Percentage of non-matching papers still passed on to estimate the filter's recall",
+                },
+                "audit_seed": {
+                    "type": "integer",
+                    "default": 0,
+                    "description": "Seed for choosing the audit sample (same seed = same papers)",
+                },
+            },
+        }
+
+    def run_stream(
+        self,
+        input_entries: Iterable[dict],
+        total_entries: int,
+        config: dict,
+        sink: StepSink,
+        progress_callback: ProgressCallback | None = None,
+    ) -> dict:
+        raw_query = str(config.get("query", "")).strip()
+        if not raw_query:
+            raise ValueError("Query is required")
+        normalize = bool(config.get("normalize_external_syntax", True))
+        query = normalize_query(raw_query) if normalize else raw_query
+        try:
+            query_ast = parse_query(query)
+        except QuerySyntaxError as e:
+            raise ValueError(f"Query parse error: {e}") from e
+        search_field = str(config.get("search_field", "any"))
+        if search_field not in SEARCH_FIELDS:
+            search_field = "any"
+        default_field = None if search_field == "any" else search_field
+        keep_no_abstract = bool(config.get("keep_no_abstract", True))
+        audit_percent = min(max(float(config.get("audit_percent", DEFAULT_AUDIT_PERCENT) or 0), 0.0), 100.0)
+        audit_seed = int(config.get("audit_seed", 0) or 0)
+
+        counts = {"query_match": 0, "audit_sample": 0, "query_no_match": 0, "no_abstract": 0}
+        if progress_callback:
+            progress_callback(0, total_entries, "Filtering by query")
+
+        for index, entry in enumerate(input_entries, start=1):
+            entry_key = entry.get("ID", "unknown")
+            title = clean_bib_text(str(entry.get("title", "")))
+            abstract = clean_bib_text(str(entry.get("abstract", "")))
+
+            if not abstract and keep_no_abstract:
+                reason = "no_abstract"
+            elif evaluate(query_ast, title=title, abstract=abstract, default_field=default_field):
+                reason = "query_match"
+            elif is_audit_sample(entry_key, audit_percent, audit_seed):
+                reason = "audit_sample"
+            else:
+                reason = "query_no_match"
+            counts[reason] += 1
+
+            if reason == "query_no_match":
+                sink.write_entry("removed", entry)
+                sink.write_change(Change(
+                    key=entry_key,
+                    action="remove",
+                    reason=reason,
+                    details={"message": "No query match"},
+                ))
+            else:
+                sink.write_entry("passed", entry)
+                if reason == "audit_sample":
+                    sink.write_entry("audit_sample", entry)
+                sink.write_change(Change(
+                    key=entry_key,
+                    action="keep",
+                    reason=reason,
+                    details={"matched": reason == "query_match", "audit": reason == "audit_sample"},
+                ))
+            sink.commit()
+
+            if progress_callback:
+                progress_callback(index, total_entries, "Filtering by query")
+
+        return {
+            "query": raw_query,
+            "normalized_query": query,
+            "search_field": search_field,
+            "audit_percent": audit_percent,
+            "audit_seed": audit_seed,
+            "matched_count": counts["query_match"],
+            "audit_sample_count": counts["audit_sample"],
+            "removed_count": counts["query_no_match"],
+            "no_abstract_count": counts["no_abstract"],
+        }
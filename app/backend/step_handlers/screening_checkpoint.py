@@ -0,0 +1,68 @@
+"""
+Append-only checkpoint of completed AI screening decisions.
+
+Decisions are appended to a JSONL file in the step directory as soon as each
+response arrives (in completion order, not input order). A rerun after a
+crash or cancel reads the file back and only sends papers without a stored
+decision to the model. Lines are keyed like the LLM response cache (model,
+rules, prompt version and paper fields), so decisions from a different
+configuration are ignored. Failed requests are never recorded.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+
+SCREENING_CHECKPOINT_FILENAME = "screening_checkpoint.jsonl"
+
+
+class ScreeningCheckpoint:
+    def __init__(self, path: Path):
+        self.path = path
+        self._results: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path, "rb+") as f:
+                end = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # Torn last line after a crash.
+                        break
+                    end += len(line)
+                    try:
+                        record = json.loads(line.decode("utf-8"))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+                    if isinstance(record, dict) and isinstance(record.get("result"), dict):
+                        self._results[record.get("cache_key", "")] = record["result"]
+                # Cut the torn line so the next append starts on a line of its own.
+                f.truncate(end)
+        self.loaded = len(self._results)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def for_step_dir(cls, step_dir: str | Path) -> ScreeningCheckpoint:
+        return cls(Path(step_dir) / SCREENING_CHECKPOINT_FILENAME)
+
+    def get(self, cache_key: str) -> dict | None:
+        with self._lock:
+            return self._results.get(cache_key)
+
+    def add(self, cache_key: str, entry_key: str, result: dict) -> None:
+        line = json.dumps({"cache_key": cache_key, "key": entry_key, "result": result}, ensure_ascii=False)
+        with self._lock:
+            self._results[cache_key] = result
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def remove(self) -> None:
+        """Close and delete the file (after a run completed without errors)."""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,192 @@
+"""
+Request telemetry for AI screening runs.
+
+Every model request is recorded with the time it waited for a concurrency
+slot (client side), the time the server took, its tokens and its outcome.
+summary() aggregates them into latency percentiles, throughput, error rates
+by class and a per-interval timeline; the handler stores the result as
+metrics.json in the step directory. Comparing queue wait with server time
+shows whether a run was held back by our concurrency limit or by the model
+server.
+
+The raw samples are kept next to it (metrics_samples.json) so a resumed
+run can report on the whole step instead of only its own requests.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from dataclasses import astuple, dataclass
+from pathlib import Path
+
+METRICS_FILENAME = "metrics.json"
+METRICS_SAMPLES_FILENAME = "metrics_samples.json"
+# Timeline points kept; the bucket width grows with the run duration.
+MAX_TIMELINE_BUCKETS = 300
+ERROR_CLASSES = ("overload", "invalid_response", "fatal")
+
+
+@dataclass
+class RequestSample:
+    started: float
+    queue_wait: float
+    server_time: float
+    tokens: int
+    prompt_tokens: int
+    cached_tokens: int
+    error_class: str | None
+
+
+def percentiles(values: list[float], scale: float = 1000.0) -> dict:
+    """p50/p95/p99, mean and max (nearest rank) of ``values`` times ``scale``."""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[min(max(math.ceil(p / 100 * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+    return {
+        "p50": round(rank(50) * scale, 1),
+        "p95": round(rank(95) * scale, 1),
+        "p99": round(rank(99) * scale, 1),
+        "mean": round(sum(ordered) / len(ordered) * scale, 1),
+        "max": round(ordered[-1] * scale, 1),
+    }
+
+
+class ScreeningMetrics:
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.samples: list[RequestSample] = []
+        # Duration and sample count taken over from an interrupted run.
+        self.previous_duration = 0.0
+        self.restored = 0
+
+    @property
+    def new_requests(self) -> int:
+        """Requests recorded by this run (restored samples excluded)."""
+        return len(self.samples) - self.restored
+
+    def restore(self, step_dir: str | Path) -> None:
+        """
+        Continue the samples saved by an interrupted run in ``step_dir``;
+        this run's requests are placed after that run's duration.
+        """
+        path = Path(step_dir) / METRICS_SAMPLES_FILENAME
+        if not path.exists():
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            samples = [RequestSample(*values) for values in data["samples"]]
+            duration = float(data["duration_sec"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self.samples = samples + self.samples
+        self.previous_duration = duration
+        self.restored = len(samples)
+
+    def record(
+        self,
+        started: float,
+        queue_wait: float,
+        server_time: float,
+        usage: tuple[int, int, int] = (0, 0, 0),
+        error_class: str | None = None,
+    ) -> None:
+        """Record one request (times from time.monotonic(), in seconds)."""
+        tokens, prompt_tokens, cached_tokens = usage
+        self.samples.append(RequestSample(
+            started=started - self.started + self.previous_duration,
+            queue_wait=queue_wait,
+            server_time=server_time,
+            tokens=tokens,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            error_class=error_class,
+        ))
+
+    def duration(self) -> float:
+        return time.monotonic() - self.started + self.previous_duration
+
+    def summary(self) -> dict:
+        duration = self.duration()
+        samples = self.samples
+        requests = len(samples)
+        ok = [sample for sample in samples if sample.error_class is None]
+        tokens = sum(sample.tokens for sample in samples)
+        errors = {name: 0 for name in ERROR_CLASSES}
+        for sample in samples:
+            if sample.error_class is not None:
+                errors[sample.error_class] = errors.get(sample.error_class, 0) + 1
+
+        queue_wait = percentiles([sample.queue_wait for sample in samples])
+        server_time = percentiles([sample.server_time for sample in ok])
+        bottleneck = None
+        if queue_wait["p50"] is not None and server_time["p50"] is not None:
+            # Requests that mostly wait for a slot are limited by our own
+            # concurrency; otherwise the server is the limiting factor.
+            bottleneck = "client_concurrency" if queue_wait["p50"] > server_time["p50"] else "model_server"
+
+        return {
+            "duration_sec": round(duration, 2),
+            "requests": requests,
+            "requests_per_sec": round(requests / duration, 3) if duration > 0 else 0,
+            "tokens": {
+                "total": tokens,
+                "prompt": sum(sample.prompt_tokens for sample in samples),
+                "cached_prompt": sum(sample.cached_tokens for sample in samples),
+            },
+            "tokens_per_sec": round(tokens / duration, 1) if duration > 0 else 0,
+            "latency_ms": server_time,
+            "queue_wait_ms": queue_wait,
+            "errors": errors,
+            "error_rate": {
+                name: round(count / requests, 4) if requests else 0 for name, count in errors.items()
+            },
+            "bottleneck": bottleneck,
+            "timeline": self._timeline(duration),
+        }
+
+    def _timeline(self, duration: float) -> dict:
+        width = max(1, math.ceil(duration / MAX_TIMELINE_BUCKETS))
+        buckets: dict[int, dict] = {}
+        for sample in self.samples:
+            index = int(sample.started // width)
+            bucket = buckets.setdefault(index, {"requests": 0, "errors": 0, "tokens": 0, "server_time": 0.0})
+            bucket["requests"] += 1
+            bucket["tokens"] += sample.tokens
+            bucket["server_time"] += sample.server_time
+            if sample.error_class is not None:
+                bucket["errors"] += 1
+        points = []
+        for index in sorted(buckets):
+            bucket = buckets[index]
+            points.append({
+                "t": index * width,
+                "requests_per_sec": round(bucket["requests"] / width, 3),
+                "tokens_per_sec": round(bucket["tokens"] / width, 1),
+                "errors": bucket["errors"],
+                "mean_latency_ms": round(bucket["server_time"] / bucket["requests"] * 1000, 1),
+            })
+        return {"bucket_sec": width, "points": points}
+
+    def save(self, step_dir: str | Path, summary: dict | None = None) -> dict:
+        """Write the summary to metrics.json (and the samples) in ``step_dir`` and return it."""
+        summary = summary or self.summary()
+        _write_json(Path(step_dir) / METRICS_FILENAME, summary, indent=2)
+        _write_json(
+            Path(step_dir) / METRICS_SAMPLES_FILENAME,
+            {"duration_sec": self.duration(), "samples": [astuple(sample) for sample in self.samples]},
+        )
+        return summary
+
+
+def _write_json(path: Path, data: dict, indent: int | None = None) -> None:
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    tmp_path.replace(path)
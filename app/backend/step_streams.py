@@ -0,0 +1,372 @@
+"""
+Incremental step output files.
+
+Step outputs are JSON arrays written one entry per line:
+
+    [
+    {"ID": "a", ...},
+    {"ID": "b", ...}
+    ]
+
+The files stay valid JSON for every existing reader, but can also be read
+and appended entry by entry. This lets streaming handlers append outputs and
+changes as results arrive and lets the next step iterate its input without
+loading the whole array.
+
+Streaming runs also append a line to stream_checkpoint.jsonl per processed
+input entry, recording how many entries / change lines each file held at
+that point. An interrupted run is resumed by cutting every file back to the
+last checkpoint and continuing with the next input entry.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from bibtexparser.bibdatabase import BibDatabase
+from bibtexparser.bwriter import BibTexWriter
+
+from step_handlers.base import Change, StepSink
+
+STREAM_CHECKPOINT_FILENAME = "stream_checkpoint.jsonl"
+# Entries formatted per BibTexWriter.write() call when writing .bib files.
+BIBTEX_WRITE_BATCH = 500
+
+
+def _entry_line(entry: dict) -> str:
+    return json.dumps(entry, ensure_ascii=False)
+
+
+def _is_line_array(f) -> bool:
+    """Whether an open file is a one-entry-per-line JSON array (rewinds it)."""
+    first = f.readline()
+    second = f.readline()
+    f.seek(0)
+    if first.strip() not in ("[", b"["):
+        return False
+    text = second.strip()
+    if text in ("]", b"]", "", b""):
+        return True
+    if isinstance(text, bytes):
+        text = text.decode("utf-8")
+    try:
+        return isinstance(json.loads(text.rstrip(",")), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+def write_json_array(path: Path, entries: Iterable[dict]) -> int:
+    """Write entries as a one-entry-per-line JSON array; returns the count."""
+    with JsonArrayWriter(path) as writer:
+        for entry in entries:
+            writer.append(entry)
+        return writer.count
+
+
+def iter_json_array(path: Path) -> Iterator[dict]:
+    """
+    Iterate entries of a JSON array file.
+
+    One-entry-per-line files are read lazily. Other layouts (e.g. indented
+    files written by older versions) are loaded with json.load. A missing
+    closing bracket (file of an interrupted run) is tolerated.
+    """
+    with open(path, encoding="utf-8") as f:
+        if not _is_line_array(f):
+            yield from json.load(f)
+            return
+        f.readline()
+        for line in f:
+            text = line.strip()
+            if not text or text == "]":
+                continue
+            try:
+                yield json.loads(text.rstrip(","))
+            except json.JSONDecodeError:
+                # Truncated last line of an interrupted run.
+                break
+
+
+def count_json_array(path: Path) -> int:
+    """Count entries in a JSON array file without parsing each entry when possible."""
+    with open(path, encoding="utf-8") as f:
+        if not _is_line_array(f):
+            return len(json.load(f))
+        f.readline()
+        return sum(1 for line in f if line.strip() not in ("", "]"))
+
+
+def _truncate_json_array(path: Path, keep: int) -> int:
+    """
+    Cut a one-entry-per-line JSON array file back to its first ``keep``
+    entries, leaving it open-ended (no closing bracket) for appending.
+    Returns the number of entries kept.
+    """
+    with open(path, "rb+") as f:
+        if not _is_line_array(f):
+            raise ValueError(f"Not a one-entry-per-line JSON array: {path.name}")
+        f.readline()
+        end = f.tell()
+        kept = 0
+        while kept < keep:
+            offset = f.tell()
+            line = f.readline()
+            text = line.rstrip(b"\r\n")
+            if not line or text.strip() in (b"", b"]"):
+                break
+            try:
+                json.loads(text.rstrip(b",").decode("utf-8"))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                break
+            end = offset + len(text.rstrip(b","))
+            kept += 1
+        f.truncate(end)
+    return kept
+
+
+def _truncate_lines(path: Path, keep: int) -> list[str]:
+    """Cut a JSON-lines file back to its first ``keep`` lines; returns them."""
+    kept: list[str] = []
+    end = 0
+    with open(path, "rb+") as f:
+        while len(kept) < keep:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break
+            kept.append(line.decode("utf-8"))
+            end = f.tell()
+        f.truncate(end)
+    return kept
+
+
+class JsonArrayWriter:
+    """
+    Append entries to a one-entry-per-line JSON array file.
+
+    With ``keep`` the existing file is continued after its first ``keep``
+    entries (used when resuming an interrupted run).
+    """
+
+    def __init__(self, path: Path, keep: int = 0):
+        self.path = path
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if keep and path.exists():
+            self.count = _truncate_json_array(path, keep)
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._file.write("[\n")
+        self._file.flush()
+
+    def append(self, entry: dict) -> None:
+        if self.count:
+            self._file.write(",\n")
+        self._file.write(_entry_line(entry))
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.write("\n]\n" if self.count else "]\n")
+        self._file.close()
+
+    def __enter__(self) -> JsonArrayWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _bibtex_sort_key(entry: dict) -> tuple[str]:
+    # BibTexWriter's default order (order_entries_by=("ID",), compared as lowercase strings).
+    return (str(entry.get("ID", "")).lower(),)
+
+
+def write_bibtex_from_json(json_path: Path, bib_path: Path) -> None:
+    """
+    Write the BibTeX view of a JSON output file.
+
+    Produces the same text as BibTexWriter over the full list (entries
+    ordered by ID, internal "_" fields dropped) while only keeping entry IDs
+    and file offsets in memory. Entries are formatted in batches through the
+    public BibTexWriter.write().
+    """
+
+    def make_writer() -> BibTexWriter:
+        writer = BibTexWriter()
+        writer.indent = "  "
+        return writer
+
+    offsets: list[tuple[tuple, int, int]] = []
+    with open(json_path, "rb") as f:
+        if not _is_line_array(f):
+            entries = json.loads(f.read().decode("utf-8"))
+            db = BibDatabase()
+            db.entries = [{k: v for k, v in entry.items() if not k.startswith("_")} for entry in entries]
+            with open(bib_path, "w", encoding="utf-8") as out:
+                out.write(make_writer().write(db))
+            return
+        f.readline()
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            text = line.strip()
+            if not text or text == b"]":
+                continue
+            entry = json.loads(text.rstrip(b",").decode("utf-8"))
+            offsets.append((_bibtex_sort_key(entry), len(offsets), offset))
+
+    offsets.sort()
+    # Entries are already sorted; keep each batch in that order.
+    writer = make_writer()
+    writer.order_entries_by = None
+    with open(json_path, "rb") as f, open(bib_path, "w", encoding="utf-8") as out:
+        for start in range(0, len(offsets), BIBTEX_WRITE_BATCH):
+            db = BibDatabase()
+            for _, _, offset in offsets[start:start + BIBTEX_WRITE_BATCH]:
+                f.seek(offset)
+                entry = json.loads(f.readline().strip().rstrip(b",").decode("utf-8"))
+                db.entries.append({k: v for k, v in entry.items() if not k.startswith("_")})
+            if start:
+                out.write(writer.entry_separator)
+            out.write(writer.write(db))
+
+
+def load_stream_checkpoint(step_dir: Path) -> dict | None:
+    """Return the last complete checkpoint of an interrupted streaming run."""
+    path = step_dir / STREAM_CHECKPOINT_FILENAME
+    if not path.exists():
+        return None
+    checkpoint = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            try:
+                checkpoint = json.loads(line)
+            except json.JSONDecodeError:
+                break
+    return checkpoint
+
+
+def _count_change(payload: dict, change_counts: dict[str, int], decision_counts: dict[str, int]) -> None:
+    action = payload.get("action")
+    decision = (payload.get("details") or {}).get("decision")
+    if action in change_counts:
+        change_counts[action] += 1
+    if decision in decision_counts:
+        decision_counts[decision] += 1
+
+
+class FileStepSink(StepSink):
+    """
+    Appends streamed outputs and changes to a step directory.
+
+    Each output goes to outputs/<name>.json (flushed per entry); the .bib
+    files are written from the JSON files in close(). ``output_copies`` and
+    ``change_copies`` mirror an output / change file under extra names
+    (e.g. ai_passed for passed). With ``resume_from`` (a checkpoint from
+    load_stream_checkpoint) existing files are cut back to that checkpoint
+    and appended to instead of being recreated.
+    """
+
+    def __init__(
+        self,
+        step_dir: Path,
+        output_copies: dict[str, list[str]] | None = None,
+        change_copies: dict[str, list[str]] | None = None,
+        resume_from: dict | None = None,
+    ):
+        self.step_dir = step_dir
+        self.outputs_dir = step_dir / "outputs"
+        self.output_copies = output_copies or {}
+        self.change_copies = change_copies or {}
+        self.resume_from = resume_from or {}
+        self.committed = int(self.resume_from.get("entries", 0))
+        self._writers: dict[str, JsonArrayWriter] = {}
+        self._change_files: dict[str, object] = {}
+        self._change_lines: dict[str, int] = {}
+        self.change_counts: dict[str, dict[str, int]] = {}
+        self.decision_counts: dict[str, dict[str, int]] = {}
+        step_dir.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = step_dir / STREAM_CHECKPOINT_FILENAME
+        if resume_from:
+            _truncate_lines(checkpoint_path, self.committed)
+            self._checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+        else:
+            self._checkpoint = open(checkpoint_path, "w", encoding="utf-8")
+
+    def open_output(self, output_name: str) -> None:
+        """Create an (empty) output file so it exists even if nothing is emitted."""
+        for name in [output_name, *self.output_copies.get(output_name, [])]:
+            if name not in self._writers:
+                keep = int((self.resume_from.get("outputs") or {}).get(name, 0))
+                self._writers[name] = JsonArrayWriter(self.outputs_dir / f"{name}.json", keep=keep)
+
+    def open_changes(self, filename: str = "changes.jsonl") -> None:
+        for name in [filename, *self.change_copies.get(filename, [])]:
+            if name in self._change_files:
+                continue
+            path = self.step_dir / name
+            change_counts = {"keep": 0, "remove": 0, "modify": 0}
+            decision_counts = {"include": 0, "exclude": 0, "uncertain": 0}
+            keep = int((self.resume_from.get("changes") or {}).get(name, 0))
+            kept_lines = _truncate_lines(path, keep) if keep and path.exists() else []
+            for line in kept_lines:
+                _count_change(json.loads(line), change_counts, decision_counts)
+            self._change_files[name] = open(path, "a" if kept_lines else "w", encoding="utf-8")
+            self._change_lines[name] = len(kept_lines)
+            self.change_counts[name] = change_counts
+            self.decision_counts[name] = decision_counts
+
+    def output_count(self, output_name: str) -> int:
+        writer = self._writers.get(output_name)
+        return writer.count if writer else 0
+
+    def write_entry(self, output_name: str, entry: dict) -> None:
+        self.open_output(output_name)
+        for name in [output_name, *self.output_copies.get(output_name, [])]:
+            self._writers[name].append(entry)
+
+    def write_change(self, change: Change, filename: str = "changes.jsonl") -> None:
+        self.open_changes(filename)
+        payload = change if isinstance(change, dict) else asdict(change)
+        line = json.dumps(payload, ensure_ascii=False) + "\n"
+        for name in [filename, *self.change_copies.get(filename, [])]:
+            handle = self._change_files[name]
+            handle.write(line)
+            handle.flush()
+            self._change_lines[name] += 1
+            _count_change(payload, self.change_counts[name], self.decision_counts[name])
+
+    def commit(self) -> None:
+        self.committed += 1
+        checkpoint = {
+            "entries": self.committed,
+            "outputs": {name: writer.count for name, writer in self._writers.items()},
+            "changes": dict(self._change_lines),
+        }
+        self._checkpoint.write(json.dumps(checkpoint) + "\n")
+        self._checkpoint.flush()
+
+    def close(self, write_bibtex: bool = True) -> None:
+        """
+        Close all files; with ``write_bibtex`` (successful run) also write
+        each output's .bib and drop the resume checkpoint.
+        """
+        for name, writer in self._writers.items():
+            writer.close()
+            if write_bibtex:
+                write_bibtex_from_json(writer.path, self.outputs_dir / f"{name}.bib")
+        for handle in self._change_files.values():
+            handle.close()
+        self._checkpoint.close()
+        if write_bibtex:
+            (self.step_dir / STREAM_CHECKPOINT_FILENAME).unlink(missing_ok=True)
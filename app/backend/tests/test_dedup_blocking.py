@@ -0,0 +1,73 @@
+"""Token blocking for dedup clustering against the exhaustive comparison."""
+
+from __future__ import annotations
+
+from step_handlers.dedup_title import DedupTitleHandler
+from step_handlers.dedup_utils import (
+    DEFAULT_MAX_POSTINGS,
+    blocking_recall,
+    normalize_title,
+    parse_max_postings,
+    title_similarity,
+    token_blocking_pairs,
+)
+
+MAX_POSTINGS = 4
+TOPICS = [
+    "recovering variable names", "malware family detection", "firmware image unpacking",
+    "java bytecode lifting", "control flow obfuscation", "debug symbol inference",
+    "struct type recovery", "loop structure analysis", "pointer alias tracking",
+    "call graph construction", "binary patch diffing", "compiler provenance",
+]
+
+
+def make_titles() -> list[str]:
+    # The framing words appear in far more than MAX_POSTINGS titles and are
+    # therefore capped.
+    titles = [f"a study of {topic} in the wild" for topic in TOPICS]
+    titles += [f"learning {topic} from programs" for topic in TOPICS]
+    # Near-duplicates that share rare words plus common words.
+    titles += [
+        "a study of recovering variable names in the wild again",
+        "learning malware family detection from the programs",
+    ]
+    # Near-duplicates made only of common (capped) words.
+    titles += ["a study of the learning of programs", "a study of the learning of the programs"]
+    return titles
+
+
+def test_token_blocking_matches_exhaustive_clusters():
+    titles = [normalize_title(title) for title in make_titles()]
+    candidate_pairs = token_blocking_pairs([title.split() for title in titles], max_postings=MAX_POSTINGS)
+    exhaustive_pairs = len(titles) * (len(titles) - 1) // 2
+    assert len(candidate_pairs) < exhaustive_pairs
+
+    report = blocking_recall(titles, 0.9, title_similarity, candidate_pairs)
+
+    assert report["matched_pairs"] == 3
+    assert report["recall"] == 1.0
+    assert report["missed_pairs"] == []
+    assert report["clusters_identical"] is True
+
+
+def test_dedup_title_keeps_the_same_entries_with_token_blocking():
+    entries = [
+        {"ID": f"e{number}", "ENTRYTYPE": "article", "title": title, "year": "2020"}
+        for number, title in enumerate(make_titles())
+    ]
+
+    def passed_ids(blocking: str) -> list[str]:
+        config = {"similarity_threshold": 0.9, "blocking": blocking, "blocking_max_postings": MAX_POSTINGS}
+        result = DedupTitleHandler().run([dict(entry) for entry in entries], config)
+        return sorted(entry["ID"] for entry in result.outputs["passed"])
+
+    exhaustive = passed_ids("none")
+    assert len(exhaustive) == len(entries) - 3
+    assert passed_ids("token") == exhaustive
+
+
+def test_max_postings_has_no_uncapped_value():
+    assert parse_max_postings(50) == 50
+    assert parse_max_postings(0) == DEFAULT_MAX_POSTINGS
+    assert parse_max_postings(-1) == DEFAULT_MAX_POSTINGS
+    assert parse_max_postings("x") == DEFAULT_MAX_POSTINGS
@@ -0,0 +1,44 @@
+"""Stored scored pairs for threshold re-clustering."""
+
+from __future__ import annotations
+
+from step_handlers import dedup_title
+from step_handlers.dedup_pair_cache import load_scored_pairs, save_scored_pairs
+from step_handlers.dedup_title import DedupTitleHandler
+
+ENTRIES = [
+    {"ID": "a", "ENTRYTYPE": "article", "title": "Neural decompilation of optimized binaries"},
+    {"ID": "b", "ENTRYTYPE": "article", "title": "Neural decompilation of optimised binaries"},
+    {"ID": "c", "ENTRYTYPE": "article", "title": "Type recovery for stripped executables"},
+]
+
+
+def test_stored_pairs_require_matching_key_and_floor(tmp_path):
+    key = {"input": "abc", "similarity_version": 1}
+    save_scored_pairs(tmp_path, key, 0.7, [(0, 1, 0.95), (0, 2, 0.75)], info={"candidate_pairs": 3})
+
+    scored, info = load_scored_pairs(tmp_path, key, 0.8)
+    assert scored == [(0, 1, 0.95)]
+    assert info == {"candidate_pairs": 3}
+    assert load_scored_pairs(tmp_path, key, 0.6) is None
+    assert load_scored_pairs(tmp_path, {**key, "similarity_version": 2}, 0.8) is None
+
+
+def test_similarity_version_change_rescores(tmp_path, monkeypatch):
+    calls = []
+    real_score = dedup_title.score_pairs_sharded
+
+    def counting_score(*args, **kwargs):
+        calls.append(1)
+        return real_score(*args, **kwargs)
+
+    monkeypatch.setattr(dedup_title, "score_pairs_sharded", counting_score)
+    config = {"similarity_threshold": 0.9, "_step_dir": str(tmp_path)}
+
+    DedupTitleHandler().run([dict(entry) for entry in ENTRIES], config)
+    DedupTitleHandler().run([dict(entry) for entry in ENTRIES], {**config, "similarity_threshold": 0.95})
+    assert len(calls) == 1
+
+    monkeypatch.setattr(dedup_title, "SIMILARITY_VERSION", dedup_title.SIMILARITY_VERSION + 1)
+    DedupTitleHandler().run([dict(entry) for entry in ENTRIES], config)
+    assert len(calls) == 2
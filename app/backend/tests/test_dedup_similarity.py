@@ -0,0 +1,55 @@
+"""Batched title similarity and its comparison with SequenceMatcher."""
+
+from __future__ import annotations
+
+from step_handlers.dedup_similarity import NgramTitleSimilarity, compare_with_sequence_matcher
+from step_handlers.dedup_utils import normalize_title
+
+TITLES = [
+    "Neural decompilation of optimized binaries",
+    "Neural decompilation of optimised binaries",
+    "A survey of binary decompilers",
+    "Type recovery for stripped executables",
+    "Type recovery for stripped executable files",
+    "Control flow structuring in decompilers",
+]
+
+
+def test_comparison_reports_pairs_missed_below_the_floor():
+    titles = [normalize_title(title) for title in TITLES]
+    entries = [{"ID": f"e{number}", "title": title} for number, title in enumerate(TITLES)]
+    threshold = 0.9
+
+    # A backend that scores every pair 0 keeps nothing above the floor, so
+    # every near-duplicate SequenceMatcher finds is a false negative.
+    report = compare_with_sequence_matcher(
+        titles,
+        [],
+        threshold,
+        entries,
+        batch_similarity_fn=lambda pairs: [0.0] * len(pairs),
+    )
+
+    below_floor = report["below_floor"]
+    assert below_floor["candidate_pairs"] == 15
+    assert below_floor["sampled_pairs"] == 15
+    missed = {(item["left_id"], item["right_id"]) for item in below_floor["false_negative_examples"]}
+    assert missed == {("e0", "e1"), ("e3", "e4")}
+    assert below_floor["false_negatives"] == 2
+
+    # Pairs the backend kept are not sampled again.
+    scorer = NgramTitleSimilarity(titles)
+    pairs = [(i, j) for i in range(len(titles)) for j in range(i + 1, len(titles))]
+    scored = [(i, j, float(score)) for (i, j), score in zip(pairs, scorer.score_pairs(pairs)) if score >= 0.8]
+    report = compare_with_sequence_matcher(
+        titles,
+        scored,
+        threshold,
+        entries,
+        batch_similarity_fn=scorer.score_pairs,
+        candidate_pairs=pairs,
+        sample_size=4,
+    )
+    assert report["below_floor"]["candidate_pairs"] == len(pairs) - len(scored)
+    assert report["below_floor"]["sampled_pairs"] == min(4, len(pairs) - len(scored))
+    assert report["below_floor"]["false_negatives"] == 0
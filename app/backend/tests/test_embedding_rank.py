@@ -0,0 +1,64 @@
+"""Embedding ranking against seed papers, with the hashing embedder."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from step_handlers.embedding_rank import EmbeddingRankHandler
+
+ENTRIES = [
+    {"ID": "far", "ENTRYTYPE": "article", "title": "Soil moisture retrieval from satellite radar"},
+    {"ID": "near", "ENTRYTYPE": "article", "title": "Neural decompilation of optimized binaries with transformers"},
+    {"ID": "mid", "ENTRYTYPE": "article", "title": "Recovering variable types in stripped binaries"},
+    {"ID": "seed", "ENTRYTYPE": "article", "title": "Neural decompilation of optimized binaries"},
+]
+
+
+def run_rank(tmp_path, entries=ENTRIES, **config):
+    step_dir = tmp_path / "project" / "steps" / "rank"
+    step_dir.mkdir(parents=True, exist_ok=True)
+    config = {"provider": "hashing", "seed_scope": "project", "seed_keys": "seed", "top_k": 0, **config}
+    return EmbeddingRankHandler().run(entries, {**config, "_step_dir": str(step_dir)})
+
+
+def test_ranks_by_similarity_and_reuses_index(tmp_path):
+    result = run_rank(tmp_path)
+    assert [entry["ID"] for entry in result.outputs["passed"]] == ["seed", "near", "mid", "far"]
+    assert result.details["embedded_count"] == len(ENTRIES)
+    ranks = {change.key: change.details["rank"] for change in result.changes}
+    assert ranks == {"seed": 1, "near": 2, "mid": 3, "far": 4}
+
+    rerun = run_rank(tmp_path)
+    assert rerun.details["embedded_count"] == 0
+    assert [entry["ID"] for entry in rerun.outputs["passed"]] == ["seed", "near", "mid", "far"]
+
+
+def test_top_k_and_min_score_cut(tmp_path):
+    result = run_rank(tmp_path, top_k=2)
+    assert [entry["ID"] for entry in result.outputs["passed"]] == ["seed", "near"]
+    assert [entry["ID"] for entry in result.outputs["removed"]] == ["mid", "far"]
+
+    scores = {change.key: change.details["score"] for change in result.changes}
+    result = run_rank(tmp_path, min_score=(scores["mid"] + scores["far"]) / 2)
+    assert [entry["ID"] for entry in result.outputs["passed"]] == ["seed", "near", "mid"]
+    assert result.details["cutoff_score"] == scores["mid"]
+
+
+def test_review_includes_are_seeds(tmp_path):
+    screen_dir = tmp_path / "project" / "steps" / "screen"
+    screen_dir.mkdir(parents=True)
+    (screen_dir / "input.json").write_text(json.dumps(ENTRIES), encoding="utf-8")
+    with open(screen_dir / "review.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps({"key": "far", "decision": "include"}) + "\n")
+        f.write(json.dumps({"key": "near", "decision": "exclude"}) + "\n")
+
+    result = run_rank(tmp_path, seed_keys="")
+    assert result.details["seed_count"] == 1
+    assert result.outputs["passed"][0]["ID"] == "far"
+
+
+def test_no_seeds_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match="No seed papers"):
+        run_rank(tmp_path, seed_keys="")
@@ -0,0 +1,139 @@
+"""PDF fetch metadata lookups are answered from the on-disk cache on reruns."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from metadata_cache import MetadataCache
+from step_handlers import pdf_fetch
+from step_handlers.base import MemoryStepSink
+from step_handlers.pdf_fetch import PdfFetchHandler
+
+FOUND = {"10.1000/a", "10.1000/b"}
+DOIS = ["10.1000/a", "10.1000/b", "10.1000/c", "10.1000/d"]
+
+
+class MetadataApiStub(BaseHTTPRequestHandler):
+    """
+    OpenAlex, Semantic Scholar and Unpaywall in one server. Works in FOUND
+    exist without open-access PDFs; the OpenAlex filter only matches FOUND,
+    so the other DOIs fall through to per-DOI lookups (404).
+    """
+
+    requests: list[str] = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        path = unquote(url.path)
+        self.requests.append(f"GET {path}")
+        if path == "/openalex/works":
+            dois = parse_qs(url.query)["filter"][0].removeprefix("doi:").split("|")
+            works = [{"doi": f"https://doi.org/{doi}", "open_access": {}} for doi in dois if doi in FOUND]
+            self._send(200, {"results": works})
+            return
+        for prefix in ("/openalex/works/https://doi.org/", "/s2/graph/v1/paper/DOI:", "/unpaywall/v2/"):
+            if path.startswith(prefix):
+                doi = path.removeprefix(prefix)
+                if doi in FOUND:
+                    self._send(200, {"doi": doi})
+                else:
+                    self._send(404, {"error": "not found"})
+                return
+        self._send(404, {})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        self.requests.append(f"POST {url.path}")
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        dois = [paper_id.removeprefix("DOI:") for paper_id in payload["ids"]]
+        self._send(200, [{"url": None} if doi in FOUND else None for doi in dois])
+
+
+@pytest.fixture
+def metadata_api(monkeypatch, tmp_path):
+    MetadataApiStub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MetadataApiStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(pdf_fetch, "OPENALEX_API_URL", f"{base_url}/openalex")
+    monkeypatch.setattr(pdf_fetch, "SEMANTIC_SCHOLAR_API_URL", f"{base_url}/s2")
+    monkeypatch.setattr(pdf_fetch, "UNPAYWALL_API_URL", f"{base_url}/unpaywall")
+    # Only the metadata APIs: no DOI resolver or publisher candidates.
+    monkeypatch.setattr(pdf_fetch, "add_static_candidates", lambda *args: None)
+    monkeypatch.setenv("PDF_LIBRARY_DIR", str(tmp_path / "pdf_library"))
+    yield MetadataApiStub.requests
+    server.shutdown()
+    server.server_close()
+
+
+def run_pdf_fetch() -> dict:
+    entries = [{"ID": f"paper{number}", "ENTRYTYPE": "article", "doi": doi} for number, doi in enumerate(DOIS)]
+    config = {
+        "unpaywall_email": "test@example.com",
+        "per_host_delay_sec": 0,
+        "browser_assist_enabled": False,
+    }
+    sink = MemoryStepSink()
+    details = PdfFetchHandler().run_stream(entries, len(entries), config, sink)
+    assert len(sink.outputs["passed"]) == len(entries)
+    return details["stats"]
+
+
+def test_rerun_answers_metadata_lookups_from_cache(metadata_api):
+    first = run_pdf_fetch()
+    # Bulk OpenAlex + Semantic Scholar batch, OpenAlex for the two DOIs the
+    # filter did not return, Unpaywall per DOI.
+    assert sorted(metadata_api) == sorted(
+        ["GET /openalex/works", "POST /s2/graph/v1/paper/batch"]
+        + [f"GET /openalex/works/https://doi.org/{doi}" for doi in ("10.1000/c", "10.1000/d")]
+        + [f"GET /unpaywall/v2/{doi}" for doi in DOIS]
+    )
+    assert first["metadata_prefetch_requests"] == 2
+    assert first["metadata_cache"]["lookups"] == 12
+    assert first["metadata_cache"]["hits"] == 0
+    assert first["metadata_cache"]["prefetched"] == 6
+
+    metadata_api.clear()
+    second = run_pdf_fetch()
+    assert metadata_api == []
+    assert second["metadata_prefetch_requests"] == 0
+    cache_stats = second["metadata_cache"]
+    assert cache_stats["lookups"] == 12
+    assert cache_stats["hits"] == 12
+    assert cache_stats["hit_rate"] == 1.0
+    for provider in ("openalex", "semantic_scholar", "unpaywall"):
+        assert cache_stats["providers"][provider]["misses"] == 0
+    # 404s are cached as negative entries.
+    assert cache_stats["providers"]["unpaywall"] == {"hits": 2, "negative_hits": 2, "prefetched": 0, "misses": 0}
+
+
+def test_expired_entries_are_not_reused(tmp_path):
+    cache = MetadataCache(tmp_path, ttls={"openalex": -1.0}, negative_ttl=-1.0)
+    cache.put("openalex", "10.1000/a", 200, {"doi": "10.1000/a"})
+    cache.put("openalex", "10.1000/c", 404)
+    cache.put("openalex", "10.1000/x", 500)
+
+    assert cache.get("openalex", "10.1000/a") is None
+    assert cache.get("openalex", "10.1000/c") is None
+    fresh = MetadataCache(tmp_path)
+    assert fresh.get("openalex", "10.1000/a").data == {"doi": "10.1000/a"}
+    assert fresh.get("openalex", "10.1000/c").found is False
+    # Errors other than 404 are never stored.
+    assert fresh.get("openalex", "10.1000/x") is None
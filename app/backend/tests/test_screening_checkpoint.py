@@ -0,0 +1,25 @@
+"""AI screening checkpoint file."""
+
+from __future__ import annotations
+
+from step_handlers.screening_checkpoint import ScreeningCheckpoint
+
+
+def test_torn_last_line_is_dropped_before_appending(tmp_path):
+    checkpoint = ScreeningCheckpoint.for_step_dir(tmp_path)
+    checkpoint.add("k1", "paper1", {"decision": "include"})
+    checkpoint.close()
+    # Crash while writing the second decision.
+    with open(checkpoint.path, "a", encoding="utf-8") as f:
+        f.write('{"cache_key": "k2", "key": "paper2", "res')
+
+    resumed = ScreeningCheckpoint.for_step_dir(tmp_path)
+    assert resumed.loaded == 1
+    resumed.add("k3", "paper3", {"decision": "exclude"})
+    resumed.close()
+
+    reloaded = ScreeningCheckpoint.for_step_dir(tmp_path)
+    assert reloaded.get("k1") == {"decision": "include"}
+    assert reloaded.get("k2") is None
+    assert reloaded.get("k3") == {"decision": "exclude"}
+    reloaded.close()
@@ -0,0 +1,57 @@
+"""Incremental step output files."""
+
+from __future__ import annotations
+
+import json
+
+from bibtexparser.bibdatabase import BibDatabase
+from bibtexparser.bwriter import BibTexWriter
+
+import step_streams
+from step_streams import write_bibtex_from_json, write_json_array
+
+
+def bibtex_of(entries: list[dict]) -> str:
+    writer = BibTexWriter()
+    writer.indent = "  "
+    db = BibDatabase()
+    db.entries = [{k: v for k, v in entry.items() if not k.startswith("_")} for entry in entries]
+    return writer.write(db)
+
+
+def make_entries(count: int) -> list[dict]:
+    # IDs out of order and in mixed case, with internal fields to drop.
+    return [
+        {
+            "ID": f"{'Key' if number % 3 else 'key'}{(number * 7) % count:03d}",
+            "ENTRYTYPE": "article",
+            "title": f"Paper {number}",
+            "year": str(2000 + number % 20),
+            "_source_import": "import-a",
+        }
+        for number in range(count)
+    ]
+
+
+def test_bibtex_matches_full_writer_across_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(step_streams, "BIBTEX_WRITE_BATCH", 4)
+    entries = make_entries(11)
+    json_path = tmp_path / "passed.json"
+    bib_path = tmp_path / "passed.bib"
+    write_json_array(json_path, entries)
+
+    write_bibtex_from_json(json_path, bib_path)
+
+    assert bib_path.read_text(encoding="utf-8") == bibtex_of(entries)
+
+
+def test_bibtex_from_indented_json_and_empty_output(tmp_path):
+    entries = make_entries(3)
+    json_path = tmp_path / "passed.json"
+    json_path.write_text(json.dumps(entries, indent=2), encoding="utf-8")
+    write_bibtex_from_json(json_path, tmp_path / "passed.bib")
+    assert (tmp_path / "passed.bib").read_text(encoding="utf-8") == bibtex_of(entries)
+
+    write_json_array(json_path, [])
+    write_bibtex_from_json(json_path, tmp_path / "empty.bib")
+    assert (tmp_path / "empty.bib").read_text(encoding="utf-8") == bibtex_of([])
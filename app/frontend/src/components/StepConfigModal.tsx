@@ -566,7 +566,9 @@ export function StepConfigModal({
                 }
               >
                 {localCheckResult.connected
-                  ? '接続OK'
+                  ? (localCheckResult.endpoints?.length ?? 0) > 1
+                    ? `接続OK（${localCheckResult.endpoints?.length}台）`
+                    : '接続OK'
                   : `失敗: ${localCheckResult.error ?? 'unknown error'}`}
               </span>
             )}
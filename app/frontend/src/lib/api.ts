@@ -84,6 +84,23 @@ export interface StepExecution {
     message: string | null;
     updated_at: string | null;
   } | null;
+  job_id: string | null;
+  resumable: boolean;
+}
+
+export type StepJobStatus = 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+
+export interface StepJob {
+  job_id: string;
+  project_id: string;
+  step_id: string;
+  resume: boolean;
+  status: StepJobStatus;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  error: string | null;
+  cancel_requested: boolean;
 }
 
 export interface StepMeta {
@@ -229,6 +246,20 @@ export const stepsApi = {
       method: 'POST',
     }),
 
+  // Server-sent events with the step meta on every execution update
+  eventsUrl: (projectId: string, stepId: string) =>
+    `${API_BASE}/projects/${projectId}/steps/${stepId}/events`,
+
+  resume: (projectId: string, stepId: string) =>
+    fetchApi<StepMeta>(`/projects/${projectId}/steps/${stepId}/resume`, {
+      method: 'POST',
+    }),
+
+  cancel: (projectId: string, stepId: string) =>
+    fetchApi<StepJob>(`/projects/${projectId}/steps/${stepId}/cancel`, {
+      method: 'POST',
+    }),
+
   reset: (projectId: string, stepId: string) =>
     fetchApi<StepMeta>(`/projects/${projectId}/steps/${stepId}/reset`, {
       method: 'POST',
@@ -255,6 +286,9 @@ export const stepsApi = {
   getAiChanges: (projectId: string, stepId: string) =>
     fetchApi<Record<string, unknown>[]>(`/projects/${projectId}/steps/${stepId}/changes/ai`),
 
+  getDetails: (projectId: string, stepId: string) =>
+    fetchApi<Record<string, unknown>>(`/projects/${projectId}/steps/${stepId}/details`),
+
   getClusters: (projectId: string, stepId: string) =>
     fetchApi<{ clusters: Record<string, unknown>[] }>(`/projects/${projectId}/steps/${stepId}/clusters`),
 
@@ -543,13 +577,18 @@ export const rulesApi = {
 };
 
 // LLM
-export interface LocalLLMCheckResponse {
+export interface LocalLLMEndpointCheck {
   connected: boolean;
   url: string;
   models: { id: string; owned_by: string }[];
   error: string | null;
 }
 
+export interface LocalLLMCheckResponse extends LocalLLMEndpointCheck {
+  // One result per server when several are listed (comma separated)
+  endpoints?: LocalLLMEndpointCheck[];
+}
+
 export const llmApi = {
   checkLocal: (baseUrl: string) =>
     fetchApi<LocalLLMCheckResponse>('/llm/check-local', {
@@ -713,6 +752,19 @@ export const pdfLibraryApi = {
     ),
 };
 
+// Jobs
+export const jobsApi = {
+  list: (projectId?: string) =>
+    fetchApi<StepJob[]>(projectId ? `/jobs?project_id=${encodeURIComponent(projectId)}` : '/jobs'),
+
+  get: (jobId: string) => fetchApi<StepJob>(`/jobs/${jobId}`),
+
+  cancel: (jobId: string) =>
+    fetchApi<StepJob>(`/jobs/${jobId}/cancel`, {
+      method: 'POST',
+    }),
+};
+
 // Health
 export const healthApi = {
   check: () => fetchApi<{ status: string; version: string }>('/health'),
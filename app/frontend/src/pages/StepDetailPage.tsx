@@ -19,6 +19,8 @@ import {
   ScrollText,
   Copy,
   Check,
+  Square,
+  FastForward,
 } from 'lucide-react';
 import { stepsApi, pipelineApi, rulesApi, StepMeta, PipelineStep } from '../lib/api';
 import { StepOutputViewer, ChangeRecord, HumanReviewViewer } from '../components/papers';
@@ -120,7 +122,7 @@ export function StepDetailPage() {
   const queryClient = useQueryClient();
   const [isConfigModalOpen, setIsConfigModalOpen] = useState(false);
   const [isResetDialogOpen, setIsResetDialogOpen] = useState(false);
-  const [isStepPolling, setIsStepPolling] = useState(false);
+  const [isRunRequested, setIsRunRequested] = useState(false);
   const [showRunNotice, setShowRunNotice] = useState(false);
   const [aiOutputMode, setAiOutputMode] = useState<'ai' | 'human'>('ai');
   const [pdfPassMode, setPdfPassMode] = useState<'all' | 'pdf_only'>('all');
@@ -135,14 +137,22 @@ export function StepDetailPage() {
     queryKey: ['step', projectId, stepId],
     queryFn: () => stepsApi.get(projectId!, stepId!),
     enabled: !!projectId && !!stepId,
-    refetchInterval: (query) => {
-      const current = (query.state.data as StepMeta | undefined)?.execution.status;
-      if (isStepPolling || current === 'running') return 1000;
-      return false;
-    },
-    refetchIntervalInBackground: true,
   });
 
+  // Follow execution updates over server-sent events while the step runs
+  const isStepActive = isRunRequested || stepMeta?.execution.status === 'running';
+  useEffect(() => {
+    if (!projectId || !stepId || !isStepActive) return;
+    const source = new EventSource(stepsApi.eventsUrl(projectId, stepId));
+    source.onmessage = (event) => {
+      const meta = JSON.parse(event.data) as StepMeta;
+      queryClient.setQueryData<StepMeta>(['step', projectId, stepId], (current) =>
+        current ? { ...current, ...meta, is_latest: current.is_latest } : current
+      );
+    };
+    return () => source.close();
+  }, [projectId, stepId, isStepActive, queryClient]);
+
   // Fetch pipeline to get step config
   const { data: pipeline } = useQuery({
     queryKey: ['pipeline', projectId],
@@ -622,29 +632,58 @@ export function StepDetailPage() {
     }
   };
 
-  // Run step mutation
+  // Run step mutation (the run is queued as a background job; progress
+  // arrives over the step's event stream)
   const runMutation = useMutation({
     mutationFn: () => stepsApi.run(projectId!, stepId!),
     onMutate: () => {
-      setIsStepPolling(true);
+      setIsRunRequested(true);
     },
     onSuccess: () => {
       setIsConfigModalOpen(false);
-      if (isDuplicateGroupStep) {
-        setShowRunNotice(true);
-      }
       queryClient.invalidateQueries({ queryKey: ['step', projectId, stepId] });
-      queryClient.invalidateQueries({ queryKey: ['step-output', projectId, stepId] });
-      queryClient.invalidateQueries({ queryKey: ['step-changes', projectId, stepId] });
-      queryClient.invalidateQueries({ queryKey: ['step-clusters', projectId, stepId] });
-      queryClient.invalidateQueries({ queryKey: ['step-input', projectId, stepId] });
       queryClient.invalidateQueries({ queryKey: ['steps', projectId] });
     },
     onSettled: () => {
-      setIsStepPolling(false);
+      setIsRunRequested(false);
     },
   });
 
+  // Resume an interrupted streaming run from its last checkpoint
+  const resumeMutation = useMutation({
+    mutationFn: () => stepsApi.resume(projectId!, stepId!),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['step', projectId, stepId] });
+      queryClient.invalidateQueries({ queryKey: ['steps', projectId] });
+    },
+  });
+
+  // Cancel the queued or running job
+  const cancelMutation = useMutation({
+    mutationFn: () => stepsApi.cancel(projectId!, stepId!),
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: ['step', projectId, stepId] });
+    },
+  });
+
+  // Refresh step data once a background run finishes
+  const executionStatus = stepMeta?.execution.status;
+  const previousStatusRef = useRef(executionStatus);
+  useEffect(() => {
+    const previous = previousStatusRef.current;
+    previousStatusRef.current = executionStatus;
+    if (previous !== 'running' || executionStatus === 'running' || executionStatus === undefined) return;
+    if (executionStatus === 'completed' && isDuplicateGroupStep) {
+      setShowRunNotice(true);
+    }
+    queryClient.invalidateQueries({ queryKey: ['step', projectId, stepId] });
+    queryClient.invalidateQueries({ queryKey: ['step-output', projectId, stepId] });
+    queryClient.invalidateQueries({ queryKey: ['step-changes', projectId, stepId] });
+    queryClient.invalidateQueries({ queryKey: ['step-clusters', projectId, stepId] });
+    queryClient.invalidateQueries({ queryKey: ['step-input', projectId, stepId] });
+    queryClient.invalidateQueries({ queryKey: ['steps', projectId] });
+  }, [executionStatus, isDuplicateGroupStep, projectId, stepId, queryClient]);
+
   // Reset step mutation
   const resetMutation = useMutation({
     mutationFn: () => stepsApi.reset(projectId!, stepId!),
@@ -798,6 +837,7 @@ export function StepDetailPage() {
   const isPending = stepMeta.execution.status === 'pending';
   const isFailed = stepMeta.execution.status === 'failed';
   const canRun = isPending || isFailed;
+  const canResume = isFailed && stepMeta.execution.resumable;
   const isLatest = stepMeta.is_latest;
   const passedCount = stepMeta.stats.passed_count;
   const removedCount = stepMeta.stats.removed_count;
@@ -850,6 +890,36 @@ export function StepDetailPage() {
         <div className="flex items-center gap-3">
           <StepStatusBadge status={stepMeta.execution.status} />
 
+          {isRunning && (
+            <button
+              onClick={() => cancelMutation.mutate()}
+              disabled={cancelMutation.isPending}
+              className="flex items-center gap-2 px-4 py-2 border border-[hsl(var(--border))] rounded-lg hover:bg-[hsl(var(--muted))] disabled:opacity-50"
+            >
+              {cancelMutation.isPending ? (
+                <Loader2 className="w-4 h-4 animate-spin" />
+              ) : (
+                <Square className="w-4 h-4" />
+              )}
+              Cancel
+            </button>
+          )}
+
+          {canResume && (
+            <button
+              onClick={() => resumeMutation.mutate()}
+              disabled={resumeMutation.isPending || runMutation.isPending}
+              className="flex items-center gap-2 px-4 py-2 bg-[hsl(var(--primary))] text-[hsl(var(--primary-foreground))] rounded-lg hover:opacity-90 disabled:opacity-50"
+            >
+              {resumeMutation.isPending ? (
+                <Loader2 className="w-4 h-4 animate-spin" />
+              ) : (
+                <FastForward className="w-4 h-4" />
+              )}
+              Resume
+            </button>
+          )}
+
           {canRun && (
             <button
               onClick={() => setIsConfigModalOpen(true)}
@@ -48,6 +48,8 @@ export function StepTypesPage() {
                 'dedup-title': 11,
                 'dedup-author': 12,
                 'pdf-fetch': 20,
+                'query-filter': 25,
+                'embedding-rank': 26,
                 'ai-screening': 30,
               };
               const aRank = order[a.id] ?? 100;
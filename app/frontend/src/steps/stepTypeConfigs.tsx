@@ -1,6 +1,6 @@
 import type { ReactNode } from 'react';
 import type { ColumnDefinition, BibEntry } from '../components/papers';
-import { Fingerprint, Brain, Type, Users, FileDown } from 'lucide-react';
+import { Fingerprint, Brain, Type, Users, FileDown, Filter, Sparkles } from 'lucide-react';
 import { normalizeBibtexText } from '../components/BibtexText';
 
 // Step type specific configuration
@@ -96,6 +96,48 @@ const dedupAuthorColumns = buildDedupColumns({
   duplicate_author_representative: 'Representative',
 });
 
+const queryFilterColumns = buildDedupColumns({
+  query_match: 'Query match',
+  audit_sample: 'Audit sample',
+  no_abstract: 'No abstract (kept)',
+  query_no_match: 'No match',
+});
+
+const embeddingRankColumns: ColumnDefinition<BibEntry>[] = [
+  {
+    id: 'rank',
+    header: 'Rank',
+    width: 'w-14 text-center',
+    render: (_, change) => (change?.details?.rank as number | undefined) ?? '-',
+  },
+  {
+    id: 'title',
+    header: 'Title',
+    width: 'flex-1 min-w-0',
+    render: (entry) => (
+      <span className="line-clamp-2" title={normalizeBibtexText(entry.title) || ''}>
+        {normalizeBibtexText(entry.title) || '(No title)'}
+      </span>
+    ),
+  },
+  {
+    id: 'year',
+    header: 'Year',
+    width: 'w-16 text-center',
+    render: (entry) => entry.year || '-',
+  },
+  {
+    id: 'score',
+    header: 'Similarity',
+    width: 'w-20 text-center',
+    render: (_, change) => {
+      const score = change?.details?.score as number | undefined;
+      if (score === undefined) return '-';
+      return <span className="text-xs">{score.toFixed(3)}</span>;
+    },
+  },
+];
+
 const PDF_MISSING_REASON_LABELS: Record<string, string> = {
   pdf_not_resolved: 'No downloadable PDF found',
   browser_assist_unresolved: 'Browser assist timed out',
@@ -417,6 +459,14 @@ export const stepTypeConfigs: Record<string, StepTypeConfig> = {
     icon: <FileDown className="w-5 h-5" />,
     columns: pdfFetchColumns,
   },
+  'query-filter': {
+    icon: <Filter className="w-5 h-5" />,
+    columns: queryFilterColumns,
+  },
+  'embedding-rank': {
+    icon: <Sparkles className="w-5 h-5" />,
+    columns: embeddingRankColumns,
+  },
 };
 
 function formatAuthors(authors: string): string {
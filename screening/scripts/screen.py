@@ -26,6 +26,10 @@ script_dir = Path(__file__).parent
 repo_root = script_dir.parent.parent
 load_dotenv(repo_root / ".env")
 
+# アプリと共通のLLMクライアントプール（イベントループと接続を共有）
+sys.path.insert(0, str(repo_root / "app" / "backend"))
+from llm_clients import llm_client_pool  # noqa: E402
+
 # 並列実行数（API rate limitに注意）
 DEFAULT_CONCURRENCY = 10
 
@@ -148,18 +152,15 @@ async def async_main():
     # クライアントの設定
     if args.provider == "local":
         # ローカルLLMサーバー（api_keyはダミーでOK）
-        client = AsyncOpenAI(
-            base_url=LOCAL_LLM_BASE_URL,
-            api_key="dummy"
-        )
+        client = llm_client_pool.get_client(LOCAL_LLM_BASE_URL, "dummy")
         print(f"Using local LLM server: {LOCAL_LLM_BASE_URL}")
     else:
         # OpenAI API
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             print("Error: OPENAI_API_KEY not set in .env file", file=sys.stderr)
-            sys.exit(1)
-        client = AsyncOpenAI(api_key=api_key)
+            return 1
+        client = llm_client_pool.get_client(None, api_key)
         print("Using OpenAI API")
 
     # ルールを読み込む
@@ -268,10 +269,16 @@ async def async_main():
     print(f"  Included:  {len(included)}")
     print(f"  Excluded:  {len(excluded)}")
     print(f"  Uncertain: {len(uncertain)}")
+    return 0
 
 
 def main():
-    asyncio.run(async_main())
+    # 共有イベントループ上で実行し、終了時にクライアントを閉じる
+    try:
+        status = llm_client_pool.run(async_main())
+    finally:
+        llm_client_pool.close()
+    sys.exit(status)
 
 
 if __name__ == "__main__":
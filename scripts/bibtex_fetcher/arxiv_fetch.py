@@ -6,13 +6,16 @@ from __future__ import annotations
 import argparse
 import re
 import sys
-import time
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from pathlib import Path
 
+# アプリと共通のホスト別レート制限（Retry-After対応・サーキットブレーカー付き）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "app" / "backend"))
+from host_limiter import HostLimiter, limited_urlopen  # noqa: E402
+
 ATOM_NS = "http://www.w3.org/2005/Atom"
 ARXIV_NS = "http://arxiv.org/schemas/atom"
 OPENSEARCH_NS = "http://a9.com/-/spec/opensearch/1.1/"
@@ -32,14 +35,14 @@ def build_url(query: str, start: int, max_results: int) -> str:
     return "http://export.arxiv.org/api/query?" + urllib.parse.urlencode(params)
 
 
-def fetch_xml(url: str, timeout: int) -> bytes:
+def fetch_xml(url: str, timeout: int, limiter: HostLimiter) -> bytes:
     req = urllib.request.Request(
         url,
         headers={
             "User-Agent": "decompile-survey/0.1 (+https://arxiv.org/help/api/)"
         },
     )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
+    with limited_urlopen(limiter, req, timeout) as resp:
         return resp.read()
 
 
@@ -210,7 +213,12 @@ def main() -> int:
     parser.add_argument(
         "--max-pages", type=int, default=1, help="Number of pages to fetch"
     )
-    parser.add_argument("--sleep", type=float, default=2.0, help="Delay between requests")
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=2.0,
+        help="Minimum delay between requests (export.arxiv.org: at least 3s)",
+    )
     parser.add_argument("--timeout", type=int, default=30, help="HTTP timeout in seconds")
     parser.add_argument("--output", help="Output BibTeX path (default: auto)")
     parser.add_argument(
@@ -226,6 +234,7 @@ def main() -> int:
     args = parser.parse_args()
 
     query = load_query(args)
+    limiter = HostLimiter(per_host_concurrency=1, per_host_interval_sec=args.sleep, wait_when_open=True)
 
     output = sys.stdout
     output_path = None
@@ -245,7 +254,7 @@ def main() -> int:
         for page in range(args.max_pages):
             start = args.start + page * args.page_size
             url = build_url(query, start, args.page_size)
-            xml_bytes = fetch_xml(url, args.timeout)
+            xml_bytes = fetch_xml(url, args.timeout, limiter)
             root = ET.fromstring(xml_bytes)
             entries = root.findall("atom:entry", namespaces=NS)
             if not entries:
@@ -262,9 +271,6 @@ def main() -> int:
                 if start + len(entries) >= total_results:
                     break
 
-            if page < args.max_pages - 1:
-                time.sleep(args.sleep)
-
         if total_written == 0:
             sys.stderr.write("No entries found.\n")
     finally:
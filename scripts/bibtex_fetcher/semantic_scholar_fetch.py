@@ -24,12 +24,16 @@ import argparse
 import json
 import re
 import sys
-import time
+import urllib.error
 import urllib.parse
 import urllib.request
 from datetime import datetime
 from pathlib import Path
 
+# アプリと共通のホスト別レート制限（Retry-After対応・サーキットブレーカー付き）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "app" / "backend"))
+from host_limiter import HostLimiter, limited_urlopen  # noqa: E402
+
 # ---------------------------------------------------------------------------
 # Venue definitions
 # ---------------------------------------------------------------------------
@@ -92,26 +96,29 @@ FIELDS = "title,abstract,year,venue,externalIds,authors,publicationTypes,openAcc
 USER_AGENT = "decompile-survey/0.1 (academic research; https://github.com/)"
 
 
-def api_request(url: str, api_key: str | None = None, timeout: int = 30) -> dict:
+def api_request(url: str, limiter: HostLimiter, api_key: str | None = None, timeout: int = 30) -> dict:
     """Make a GET request to the Semantic Scholar API."""
     headers = {"User-Agent": USER_AGENT}
     if api_key:
         headers["x-api-key"] = api_key
 
     req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
+    with limited_urlopen(limiter, req, timeout) as resp:
         return json.loads(resp.read())
 
 
 def bulk_search(
     query: str,
+    limiter: HostLimiter,
     api_key: str | None = None,
     timeout: int = 30,
-    sleep: float = 3.0,
     max_pages: int = 5,
 ) -> list[dict]:
     """Fetch results using the bulk search endpoint with pagination.
 
+    Requests are spaced and, after a 429, delayed (Retry-After) by the
+    limiter, which waits out its cooldown when the API keeps refusing.
+
     Args:
         max_pages: Stop after this many pages (each ~1000 results). 0 = no limit.
     """
@@ -129,12 +136,10 @@ def bulk_search(
         sys.stderr.write(f"  Bulk search page {page}: {url[:120]}...\n")
 
         try:
-            data = api_request(url, api_key, timeout)
+            data = api_request(url, limiter, api_key, timeout)
         except urllib.error.HTTPError as e:
             if e.code == 429:
-                wait = sleep * 3
-                sys.stderr.write(f"  Rate limited. Waiting {wait}s...\n")
-                time.sleep(wait)
+                sys.stderr.write("  Rate limited. Retrying after backoff...\n")
                 continue
             raise
 
@@ -149,7 +154,6 @@ def bulk_search(
         # Next page
         params_next = {"query": query, "fields": FIELDS, "token": token}
         url = f"{API_BASE}/paper/search/bulk?" + urllib.parse.urlencode(params_next)
-        time.sleep(sleep)
 
     return all_papers
 
@@ -308,7 +312,7 @@ def main() -> int:
         "--sleep",
         type=float,
         default=3.0,
-        help="Delay between API requests in seconds (default: 3.0)",
+        help="Minimum delay between API requests in seconds (default: 3.0)",
     )
     parser.add_argument(
         "--timeout",
@@ -369,15 +373,15 @@ def main() -> int:
         ])
 
     sys.stderr.write(f"Fetching papers for {len(search_queries)} search terms...\n")
+    limiter = HostLimiter(per_host_concurrency=1, per_host_interval_sec=args.sleep, wait_when_open=True)
     all_papers: dict[str, dict] = {}  # paperId -> paper (dedup)
 
     for sq in search_queries:
         sys.stderr.write(f"\nSearching: '{sq}'\n")
         try:
-            papers = bulk_search(sq, args.api_key, args.timeout, args.sleep, args.max_pages)
+            papers = bulk_search(sq, limiter, args.api_key, args.timeout, args.max_pages)
         except Exception as e:
             sys.stderr.write(f"  Error: {e}\n")
-            time.sleep(args.sleep)
             continue
 
         for p in papers:
@@ -386,7 +390,6 @@ def main() -> int:
                 all_papers[pid] = p
 
         sys.stderr.write(f"  Unique papers so far: {len(all_papers)}\n")
-        time.sleep(args.sleep)
 
     sys.stderr.write(f"\nTotal unique papers fetched: {len(all_papers)}\n")
 
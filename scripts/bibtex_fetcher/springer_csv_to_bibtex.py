@@ -9,7 +9,6 @@ import html
 import json
 import re
 import sys
-import time
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -17,6 +16,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
+# アプリと共通のホスト別レート制限（Retry-After対応・サーキットブレーカー付き）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "app" / "backend"))
+from host_limiter import HostLimiter, limited_urlopen  # noqa: E402
+
 
 def normalize_whitespace(value: str) -> str:
     return " ".join(value.split())
@@ -102,27 +105,26 @@ def fetch_crossref_record(
     timeout: int,
     user_agent: str,
     max_retries: int,
-    retry_backoff: float,
+    limiter: HostLimiter,
 ) -> dict | None:
     url = doi_to_url(doi)
     headers = {
         "User-Agent": user_agent,
         "Accept": "application/json",
     }
+    # Retries wait in limiter.acquire() (Retry-After or exponential backoff).
     for attempt in range(max_retries + 1):
         req = urllib.request.Request(url, headers=headers)
         try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
+            with limited_urlopen(limiter, req, timeout) as resp:
                 payload = json.loads(resp.read().decode("utf-8"))
                 return payload.get("message")
         except urllib.error.HTTPError as exc:
             if exc.code in {429, 500, 502, 503, 504} and attempt < max_retries:
-                time.sleep(retry_backoff * (2 ** attempt))
                 continue
             return None
         except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
             if attempt < max_retries:
-                time.sleep(retry_backoff * (2 ** attempt))
                 continue
             return None
     return None
@@ -133,7 +135,7 @@ def fetch_html_page(
     timeout: int,
     user_agent: str,
     max_retries: int,
-    retry_backoff: float,
+    limiter: HostLimiter,
 ) -> str | None:
     headers = {
         "User-Agent": user_agent,
@@ -142,18 +144,16 @@ def fetch_html_page(
     for attempt in range(max_retries + 1):
         req = urllib.request.Request(url, headers=headers)
         try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
+            with limited_urlopen(limiter, req, timeout) as resp:
                 raw = resp.read()
                 charset = resp.headers.get_content_charset() or "utf-8"
                 return raw.decode(charset, errors="replace")
         except urllib.error.HTTPError as exc:
             if exc.code in {429, 500, 502, 503, 504} and attempt < max_retries:
-                time.sleep(retry_backoff * (2 ** attempt))
                 continue
             return None
         except (urllib.error.URLError, TimeoutError):
             if attempt < max_retries:
-                time.sleep(retry_backoff * (2 ** attempt))
                 continue
             return None
     return None
@@ -199,14 +199,14 @@ def fetch_springer_abstract(
     timeout: int,
     user_agent: str,
     max_retries: int,
-    retry_backoff: float,
+    limiter: HostLimiter,
 ) -> str:
     html_text = fetch_html_page(
         url=url,
         timeout=timeout,
         user_agent=user_agent,
         max_retries=max_retries,
-        retry_backoff=retry_backoff,
+        limiter=limiter,
     )
     if not html_text:
         return ""
@@ -404,7 +404,7 @@ def fetch_crossref_metadata(
     user_agent: str,
     workers: int,
     max_retries: int,
-    retry_backoff: float,
+    limiter: HostLimiter,
 ) -> dict[str, dict]:
     dois = sorted({row.get("Item DOI", "") for row in rows if row.get("Item DOI", "")})
     if not dois:
@@ -418,7 +418,7 @@ def fetch_crossref_metadata(
                 timeout=timeout,
                 user_agent=user_agent,
                 max_retries=max_retries,
-                retry_backoff=retry_backoff,
+                limiter=limiter,
             )
             if message:
                 results[doi] = message
@@ -432,7 +432,7 @@ def fetch_crossref_metadata(
                 timeout,
                 user_agent,
                 max_retries,
-                retry_backoff,
+                limiter,
             ): doi
             for doi in dois
         }
@@ -453,7 +453,7 @@ def fetch_springer_abstracts(
     user_agent: str,
     workers: int,
     max_retries: int,
-    retry_backoff: float,
+    limiter: HostLimiter,
 ) -> dict[str, str]:
     unique_urls = sorted({url for url in urls if is_springer_url(url)})
     if not unique_urls:
@@ -467,7 +467,7 @@ def fetch_springer_abstracts(
                 timeout=timeout,
                 user_agent=user_agent,
                 max_retries=max_retries,
-                retry_backoff=retry_backoff,
+                limiter=limiter,
             )
             if abstract:
                 results[url] = abstract
@@ -481,7 +481,7 @@ def fetch_springer_abstracts(
                 timeout,
                 user_agent,
                 max_retries,
-                retry_backoff,
+                limiter,
             ): url
             for url in unique_urls
         }
@@ -536,7 +536,7 @@ def parse_args() -> argparse.Namespace:
         "--retry-backoff",
         type=float,
         default=1.0,
-        help="Base retry backoff in seconds (default: 1.0)",
+        help="Base retry backoff in seconds, unless the server sends Retry-After (default: 1.0)",
     )
     parser.add_argument(
         "--mailto",
@@ -583,6 +583,14 @@ def main() -> int:
         return 1
 
     user_agent = build_user_agent(args.mailto)
+    # No fixed delay (Crossref allows parallel requests); backs off per host
+    # on 429/5xx and pauses a host that keeps failing until its cooldown ends.
+    limiter = HostLimiter(
+        per_host_concurrency=max(1, args.workers),
+        per_host_interval_sec=0.0,
+        backoff_base_sec=max(0.1, args.retry_backoff),
+        wait_when_open=True,
+    )
 
     crossref_map: dict[str, dict] = {}
     if not args.no_crossref:
@@ -592,7 +600,7 @@ def main() -> int:
             user_agent=user_agent,
             workers=max(1, args.workers),
             max_retries=max(0, args.max_retries),
-            retry_backoff=max(0.1, args.retry_backoff),
+            limiter=limiter,
         )
 
     scrape_candidates: list[str] = []
@@ -614,7 +622,7 @@ def main() -> int:
             user_agent=user_agent,
             workers=max(1, args.workers),
             max_retries=max(0, args.max_retries),
-            retry_backoff=max(0.1, args.retry_backoff),
+            limiter=limiter,
         )
 
     entries: list[str] = []